@@ -0,0 +1,50 @@
+"""
+Benchmark: MicroEnterpriseCA.step, loop engine vs vectorized engine.
+
+Usage (from Final_Project/):
+    python -m benchmarks.bench_ca_step --sizes 50 100 200 1000 --steps 5
+"""
+import argparse
+import time
+
+from src.cellular_automata import MicroEnterpriseCA
+
+def time_engine(engine, grid_size, steps, density=0.1):
+    """
+    Returns (seconds per step, final active fraction) for one engine.
+    """
+    ca = MicroEnterpriseCA(grid_size=grid_size, engine=engine)
+    ca.initialize_random(density=density)
+
+    start = time.perf_counter()
+    for _ in range(steps):
+        ca.step()
+    elapsed = time.perf_counter() - start
+
+    return elapsed / steps, float(ca.grid.mean())
+
+def main(sizes, steps, max_loop_size):
+    print(f"{'grid':>8} {'loop s/step':>12} {'vec s/step':>12} {'speedup':>9} {'loop active':>12} {'vec active':>11}")
+    for size in sizes:
+        vec_time, vec_active = time_engine('vectorized', size, steps)
+
+        if size <= max_loop_size:
+            loop_time, loop_active = time_engine('loop', size, steps)
+            speedup = f"{loop_time / vec_time:8.1f}x"
+            loop_cols = f"{loop_time:12.5f} "
+            loop_active_col = f"{loop_active:12.4f}"
+        else:
+            speedup = f"{'-':>9}"
+            loop_cols = f"{'skipped':>12} "
+            loop_active_col = f"{'-':>12}"
+
+        print(f"{size:>8} {loop_cols}{vec_time:12.5f} {speedup} {loop_active_col} {vec_active:11.4f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[50, 100, 200, 400, 1000])
+    parser.add_argument('--steps', type=int, default=5)
+    parser.add_argument('--max-loop-size', type=int, default=400,
+                        help="Skip the loop engine above this grid size (it takes minutes per step).")
+    args = parser.parse_args()
+    main(args.sizes, args.steps, args.max_loop_size)
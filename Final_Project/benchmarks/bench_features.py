@@ -0,0 +1,42 @@
+"""
+Benchmark: create_lag_features + create_rolling_features vs compute_panel_features.
+
+Usage (from Final_Project/):
+    python -m benchmarks.bench_features --counties 3135 --months 40
+"""
+import argparse
+import time
+import numpy as np
+
+from src.feature_engineering import create_lag_features, create_rolling_features, compute_panel_features, ROLLING_STATS
+from benchmarks.synthetic import make_panel
+
+def best_of(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+def main(n_counties, n_months, repeats):
+    panel = make_panel(n_counties, n_months).sort_values(['cfips', 'first_day_of_month'])
+    print(f"Panel: {n_counties} counties x {n_months} months = {len(panel)} rows")
+
+    legacy_time, legacy = best_of(lambda: create_rolling_features(create_lag_features(panel)), repeats)
+    kernel_time, kernel = best_of(lambda: compute_panel_features(panel), repeats)
+    all_time, _ = best_of(lambda: compute_panel_features(panel, windows=(3, 6, 12), stats=ROLLING_STATS), repeats)
+
+    match = np.allclose(kernel.to_numpy(), legacy[kernel.columns].to_numpy(), equal_nan=True)
+
+    print(f"{'legacy lag + rolling mean':<40} {legacy_time:8.4f} s")
+    print(f"{'kernel (same features)':<40} {kernel_time:8.4f} s  ({legacy_time / kernel_time:.1f}x, match={match})")
+    print(f"{'kernel (3 windows x 5 stats + lags)':<40} {all_time:8.4f} s")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--counties', type=int, default=3135)
+    parser.add_argument('--months', type=int, default=40)
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+    main(args.counties, args.months, args.repeats)
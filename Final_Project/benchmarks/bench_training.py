@@ -0,0 +1,71 @@
+"""
+Benchmark: learning curve of ModelTrainer fit time and SMAPE against training rows and threads.
+
+Trains 'rf', 'xgb' and 'xgb_hist' on lag/rolling features of a synthetic panel
+(counties subsampled to reach each row count) and scores the held-out final months.
+
+Usage (from Final_Project/):
+    python -m benchmarks.bench_training --counties 3135 --months 40 --rows 20000 50000 100000 --threads 1 4
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+
+from src.evaluation import smape
+from src.feature_engineering import compute_panel_features
+from src.model_training import ModelTrainer
+from benchmarks.synthetic import make_panel
+
+MODEL_TYPES = ('rf', 'xgb', 'xgb_hist')
+
+def make_dataset(n_counties, n_months, n_test_months, seed=0):
+    """
+    (train, test) frames of features, target and date; test holds the last n_test_months months.
+    """
+    panel = make_panel(n_counties, n_months, seed).sort_values(['cfips', 'first_day_of_month'], ignore_index=True)
+    features = compute_panel_features(panel, windows=(3, 6))
+    data = pd.concat([panel[['cfips', 'first_day_of_month', 'microbusiness_density']], features], axis=1)
+    data = data.dropna(subset=['mbd_lag_1'])
+    cutoff = np.sort(data['first_day_of_month'].unique())[-n_test_months]
+    return data[data['first_day_of_month'] < cutoff], data[data['first_day_of_month'] >= cutoff]
+
+def main(n_counties, n_months, rows, threads, model_types, n_test_months, output):
+    train, test = make_dataset(n_counties, n_months, n_test_months)
+    feature_cols = [c for c in train.columns if c.startswith('mbd_')]
+    X_test, y_test = test[feature_cols], test['microbusiness_density']
+    print(f"Training pool: {len(train)} rows, test: {len(test)} rows, {len(feature_cols)} features")
+
+    counties = np.random.default_rng(0).permutation(train['cfips'].unique())
+    rows_per_county = len(train) / len(counties)
+    results = []
+    for n_rows in rows:
+        subset = train[train['cfips'].isin(counties[:max(1, int(n_rows / rows_per_county))])]
+        X, y = subset[feature_cols], subset['microbusiness_density']
+        for nthread in threads:
+            for model_type in model_types:
+                trainer = ModelTrainer(model_type=model_type, nthread=nthread)
+                start = time.perf_counter()
+                trainer.train(X, y, dates=subset['first_day_of_month'])
+                fit_time = time.perf_counter() - start
+                results.append({'model_type': model_type, 'rows': len(subset), 'threads': nthread,
+                                'fit_seconds': fit_time, 'SMAPE': smape(y_test, trainer.predict(X_test)),
+                                'trees': trainer.best_iteration + 1 if trainer.best_iteration is not None else None})
+
+    results = pd.DataFrame(results)
+    print(results.to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+    if output:
+        results.to_csv(output, index=False)
+        print(f"Saved to {output}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--counties', type=int, default=3135)
+    parser.add_argument('--months', type=int, default=40)
+    parser.add_argument('--rows', type=int, nargs='+', default=[20_000, 50_000, 100_000])
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 4])
+    parser.add_argument('--models', nargs='+', default=list(MODEL_TYPES), choices=MODEL_TYPES)
+    parser.add_argument('--test-months', type=int, default=3)
+    parser.add_argument('--output', type=str, default=None, help="Optional CSV path for the results")
+    args = parser.parse_args()
+    main(args.counties, args.months, args.rows, args.threads, args.models, args.test_months, args.output)
@@ -0,0 +1,127 @@
+"""
+Load generator for src.inference_server: concurrent keep-alive clients POST /predict
+and the script reports p50/p99 latency, throughput and the server's average batch size.
+
+Usage (from Final_Project/):
+    # Against a running server (feature count is read from /health)
+    python -m benchmarks.load_generator --port 8080 --concurrency 32 --requests 5000
+    # Self-contained: trains a small RF on a synthetic panel, registers it in a
+    # temporary registry and starts the server in a subprocess
+    python -m benchmarks.load_generator --demo
+"""
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+
+async def _request(reader, writer, method, path, payload=None):
+    body = json.dumps(payload).encode() if payload is not None else b''
+    writer.write((f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                  f"Content-Length: {len(body)}\r\n\r\n").encode() + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while (line := await reader.readline()) not in (b'\r\n', b''):
+        key, _, value = line.decode().partition(':')
+        if key.lower() == 'content-length':
+            length = int(value)
+    response = json.loads(await reader.readexactly(length))
+    if status != 200:
+        raise RuntimeError(f"HTTP {status}: {response}")
+    return response
+
+async def _client(host, port, n_requests, rows, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    rng = np.random.default_rng(len(latencies))
+    try:
+        for _ in range(n_requests):
+            payload = {'rows': rng.random(rows.shape).tolist()}
+            start = time.perf_counter()
+            await _request(reader, writer, 'POST', '/predict', payload)
+            latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+
+async def run_load(host, port, concurrency, n_requests, rows_per_request):
+    reader, writer = await asyncio.open_connection(host, port)
+    health = await _request(reader, writer, 'GET', '/health')
+    writer.close()
+    n_features = len(health['model']['feature_names'])
+    rows = np.zeros((rows_per_request, n_features))
+
+    latencies = []
+    per_client = [n_requests // concurrency + (i < n_requests % concurrency) for i in range(concurrency)]
+    start = time.perf_counter()
+    await asyncio.gather(*[_client(host, port, n, rows, latencies) for n in per_client if n])
+    elapsed = time.perf_counter() - start
+
+    reader, writer = await asyncio.open_connection(host, port)
+    after = await _request(reader, writer, 'GET', '/health')
+    writer.close()
+    batches = after['batches'] - health['batches']
+    latencies_ms = np.array(latencies) * 1000
+    print(f"Model: {health['model']['name']} v{health['model']['version']} ({n_features} features)")
+    print(f"{len(latencies)} requests x {rows_per_request} rows, concurrency {concurrency}: "
+          f"{len(latencies) / elapsed:.0f} req/s")
+    print(f"latency p50 {np.percentile(latencies_ms, 50):.2f} ms, p99 {np.percentile(latencies_ms, 99):.2f} ms, "
+          f"max {latencies_ms.max():.2f} ms")
+    print(f"server: {batches} predict calls, {(after['rows'] - health['rows']) / max(batches, 1):.1f} rows per call")
+
+def start_demo_server(registry_dir, port, max_batch_rows, max_wait_ms):
+    """
+    Trains and registers a small RF on a synthetic panel, then starts the server in a subprocess.
+    """
+    from benchmarks.bench_training import make_dataset
+    from src.model_registry import ModelRegistry
+    from src.model_training import ModelTrainer
+
+    train, _ = make_dataset(n_counties=500, n_months=30, n_test_months=3)
+    feature_cols = [c for c in train.columns if c.startswith('mbd_')]
+    trainer = ModelTrainer('rf', params={'n_estimators': 50})
+    trainer.train(train[feature_cols], train['microbusiness_density'])
+    ModelRegistry(registry_dir).save(trainer, 'demo_rf', metadata={'source': 'benchmarks.load_generator'})
+
+    server = subprocess.Popen([sys.executable, '-m', 'src.inference_server', '--registry', registry_dir,
+                               '--name', 'demo_rf', '--port', str(port), '--max-batch-rows', str(max_batch_rows),
+                               '--max-wait-ms', str(max_wait_ms)])
+    return server
+
+async def wait_for_server(host, port, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"Inference server on {host}:{port} did not start within {timeout}s.")
+
+def main(args):
+    server = None
+    with tempfile.TemporaryDirectory() as registry_dir:
+        try:
+            if args.demo:
+                server = start_demo_server(registry_dir, args.port, args.max_batch_rows, args.max_wait_ms)
+            asyncio.run(wait_for_server(args.host, args.port))
+            asyncio.run(run_load(args.host, args.port, args.concurrency, args.requests, args.rows_per_request))
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--host', type=str, default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--rows-per-request', type=int, default=1)
+    parser.add_argument('--demo', action='store_true', help="Train, register and serve a demo model first")
+    parser.add_argument('--max-batch-rows', type=int, default=4096, help="Server setting (--demo only)")
+    parser.add_argument('--max-wait-ms', type=float, default=2.0, help="Server setting (--demo only)")
+    main(parser.parse_args())
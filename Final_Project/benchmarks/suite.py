@@ -0,0 +1,279 @@
+"""
+Benchmark suite: times the CA, feature, training, evaluation and drift hot paths
+across input sizes on synthetic data, saves the results as JSON with machine
+metadata, and compares them with a saved baseline.
+
+Usage (from Final_Project/):
+    python -m benchmarks.suite --profile quick --output outputs/benchmarks/latest.json
+    python -m benchmarks.suite --only ca_step workshop_ca_step --baseline benchmarks/baseline.json
+    python -m benchmarks.suite --compare outputs/benchmarks/latest.json --baseline benchmarks/baseline.json
+
+With --baseline, benchmarks whose fastest time grew by more than --threshold (default 20%)
+are flagged as regressions and the exit code is 1. Timings are only comparable between
+runs on the same machine; the metadata block records which one produced them.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+
+from src.cellular_automata import MicroEnterpriseCA
+from src.drift_detection import detect_drift
+from src.evaluation import calculate_metrics
+from src.feature_engineering import create_lag_features, create_rolling_features
+from src.model_training import ModelTrainer
+from src.workshop import workshop_module
+from benchmarks.bench_training import make_dataset
+from benchmarks.synthetic import make_grid, make_panel
+
+def load_workshop_ca():
+    """
+    Workshop_4_Simulation's CellularAutomata (imported as workshop_src, see src.workshop).
+    """
+    return workshop_module('ca_sim').CellularAutomata
+
+# Setup functions build the inputs for one size (untimed) and return the callable to time
+
+def setup_ca_step(grid_size, seed):
+    ca = MicroEnterpriseCA(grid_size=grid_size)
+    ca.grid = make_grid(grid_size, seed=seed)
+    return ca.step
+
+def setup_workshop_ca_step(grid_size, seed):
+    CellularAutomata = load_workshop_ca()
+    ca = CellularAutomata((grid_size, grid_size), {}, rng=np.random.default_rng(seed))
+    ca.grid = make_grid(grid_size, density=0.5, seed=seed, dtype=np.float64)
+
+    def step():
+        ca.step()
+        ca.history.clear()  # step() keeps every frame; do not let repeats pile them up
+    return step
+
+def _sorted_panel(n_counties, seed, n_months=40):
+    return make_panel(n_counties, n_months, seed).sort_values(['cfips', 'first_day_of_month'], ignore_index=True)
+
+def setup_lag_features(n_counties, seed):
+    panel = _sorted_panel(n_counties, seed)
+    return lambda: create_lag_features(panel)
+
+def setup_rolling_features(n_counties, seed):
+    panel = _sorted_panel(n_counties, seed)
+    return lambda: create_rolling_features(panel)
+
+def _training_data(n_counties, seed):
+    train, test = make_dataset(n_counties, 40, 3, seed)
+    feature_cols = [c for c in train.columns if c.startswith('mbd_')]
+    return train, test, feature_cols
+
+def setup_train(n_counties, seed, model_type='rf'):
+    train, _, feature_cols = _training_data(n_counties, seed)
+    trainer = ModelTrainer(model_type=model_type)
+    return lambda: trainer.train(train[feature_cols], train['microbusiness_density'], dates=train['first_day_of_month'])
+
+def setup_predict(n_counties, seed, model_type='rf'):
+    train, test, feature_cols = _training_data(n_counties, seed)
+    trainer = ModelTrainer(model_type=model_type)
+    trainer.train(train[feature_cols], train['microbusiness_density'], dates=train['first_day_of_month'])
+    # Predict on the whole panel so the batch grows with the size, not just the test months
+    X = pd.concat([train, test])[feature_cols]
+    return lambda: trainer.predict(X)
+
+def setup_metrics(n_rows, seed):
+    rng = np.random.default_rng(seed)
+    y_true = rng.lognormal(1.0, 0.8, n_rows)
+    y_pred = y_true * rng.normal(1.0, 0.05, n_rows)
+    return lambda: calculate_metrics(y_true, y_pred)
+
+def setup_drift(n_rows, seed):
+    rng = np.random.default_rng(seed)
+    reference, current = rng.normal(0, 1, n_rows), rng.normal(0.05, 1, n_rows)
+    return lambda: detect_drift(reference, current)
+
+# name: (setup, what the size means, sizes per profile)
+BENCHMARKS = {
+    'ca_step': (setup_ca_step, 'grid side', {'quick': [50, 200, 1000], 'full': [50, 200, 1000, 2000, 4000]}),
+    'workshop_ca_step': (setup_workshop_ca_step, 'grid side',
+                         {'quick': [50, 200, 1000], 'full': [50, 200, 1000, 2000, 4000]}),
+    'lag_features': (setup_lag_features, 'counties x 40 months', {'quick': [300, 3135], 'full': [300, 3135, 12000]}),
+    'rolling_features': (setup_rolling_features, 'counties x 40 months',
+                         {'quick': [300, 3135], 'full': [300, 3135, 12000]}),
+    'train': (setup_train, 'counties x 40 months', {'quick': [100, 500], 'full': [100, 1000, 3135]}),
+    'predict': (setup_predict, 'counties x 40 months', {'quick': [100, 500], 'full': [100, 1000, 3135]}),
+    'calculate_metrics': (setup_metrics, 'rows', {'quick': [10_000, 1_000_000], 'full': [10_000, 1_000_000, 10_000_000]}),
+    'detect_drift': (setup_drift, 'rows per sample', {'quick': [10_000, 1_000_000], 'full': [10_000, 1_000_000, 10_000_000]}),
+}
+
+MODEL_BENCHMARKS = ('train', 'predict')
+
+def time_call(fn, repeats, min_sample_seconds=0.05):
+    """
+    Seconds per call of fn for `repeats` timed samples, after one untimed warm-up call.
+    Fast calls are batched (like timeit's autorange) so each sample lasts at least
+    min_sample_seconds and timer resolution and scheduling noise average out.
+    """
+    start = time.perf_counter()
+    fn()
+    first = time.perf_counter() - start
+    number = max(1, int(min_sample_seconds / first)) if first > 0 else 1
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        times.append((time.perf_counter() - start) / number)
+    return times, number
+
+def machine_metadata():
+    """
+    Where and with what the timings were taken.
+    """
+    import sklearn
+    import xgboost
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, timeout=10,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'hostname': platform.node(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'sklearn': sklearn.__version__,
+        'xgboost': xgboost.__version__,
+        'git_commit': commit,
+    }
+
+def run_suite(names=None, profile='quick', repeats=5, seed=0, model_type='rf', sizes=None):
+    """
+    Runs the selected benchmarks (default: all) at their sizes for `profile`
+    (or at `sizes` for every benchmark). Returns the result document.
+    """
+    names = names or list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        raise ValueError(f"Unknown benchmarks: {unknown}. Choose from {list(BENCHMARKS)}.")
+
+    results = []
+    for name in names:
+        setup, size_unit, profile_sizes = BENCHMARKS[name]
+        kwargs = {'model_type': model_type} if name in MODEL_BENCHMARKS else {}
+        # Model fits are slow and barely noisy; a few repeats are enough
+        n_repeats = min(repeats, 3) if name in MODEL_BENCHMARKS else repeats
+        for size in sizes or profile_sizes[profile]:
+            fn = setup(size, seed, **kwargs)
+            times, number = time_call(fn, n_repeats)
+            result = {'benchmark': name, 'size': size, 'size_unit': size_unit, 'repeats': n_repeats,
+                      'calls_per_repeat': number,
+                      'median_seconds': statistics.median(times), 'min_seconds': min(times),
+                      'mean_seconds': statistics.fmean(times),
+                      'stdev_seconds': statistics.stdev(times) if len(times) > 1 else 0.0, **kwargs}
+            results.append(result)
+            print(f"{name:<20} {size:>10}  median {result['median_seconds']:10.5f} s  min {result['min_seconds']:10.5f} s")
+
+    return {
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'profile': profile,
+        'seed': seed,
+        'machine': machine_metadata(),
+        'results': results,
+    }
+
+def compare(current, baseline, threshold=0.2):
+    """
+    Time ratio (current / baseline) per benchmark and size present in both runs, on the
+    fastest sample: interference from other processes only ever adds time, so the minimum
+    is the most repeatable statistic. Rows with ratio > 1 + threshold are regressions.
+    Returns a DataFrame.
+    """
+    def key(result):
+        return (result['benchmark'], result['size'], result.get('model_type'))
+
+    baseline_results = {key(r): r for r in baseline['results']}
+    rows = []
+    for result in current['results']:
+        base = baseline_results.get(key(result))
+        if base is None:
+            continue
+        ratio = result['min_seconds'] / base['min_seconds']
+        rows.append({'benchmark': result['benchmark'], 'size': result['size'],
+                     'baseline_seconds': base['min_seconds'], 'current_seconds': result['min_seconds'],
+                     'ratio': ratio, 'regression': ratio > 1 + threshold})
+    return pd.DataFrame(rows, columns=['benchmark', 'size', 'baseline_seconds', 'current_seconds', 'ratio', 'regression'])
+
+def save_results(document, path):
+    dirname = os.path.dirname(path)
+    if dirname:
+        os.makedirs(dirname, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(document, f, indent=2)
+    print(f"Saved to {path}")
+
+def load_results(path):
+    with open(path) as f:
+        return json.load(f)
+
+def report_comparison(current, baseline, threshold):
+    """
+    Prints the comparison table; returns the number of regressions.
+    """
+    if baseline['machine'].get('hostname') != current['machine'].get('hostname'):
+        print(f"Warning: baseline was taken on {baseline['machine'].get('hostname')}, "
+              f"this run on {current['machine'].get('hostname')}; timings may not be comparable.")
+    comparison = compare(current, baseline, threshold)
+    if comparison.empty:
+        print("No benchmarks in common with the baseline.")
+        return 0
+    print(comparison.to_string(index=False, float_format=lambda v: f"{v:.5f}"))
+    regressions = comparison[comparison['regression']]
+    for _, row in regressions.iterrows():
+        print(f"REGRESSION: {row['benchmark']} at size {row['size']} is {row['ratio']:.2f}x the baseline "
+              f"(threshold {1 + threshold:.2f}x)")
+    if regressions.empty:
+        print(f"No regressions beyond {threshold:.0%}.")
+    return len(regressions)
+
+def main(args):
+    # Keep per-call INFO logging (console and project.log) out of the timings
+    logging.disable(logging.INFO)
+    if args.compare:
+        current = load_results(args.compare)
+    else:
+        current = run_suite(args.only, args.profile, args.repeats, args.seed, args.model_type, args.sizes)
+        save_results(current, args.output or os.path.join(
+            'outputs', 'benchmarks', f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"))
+        if args.save_baseline:
+            save_results(current, args.save_baseline)
+
+    if args.baseline:
+        return 1 if report_comparison(current, load_results(args.baseline), args.threshold) else 0
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--only', nargs='+', default=None, choices=list(BENCHMARKS))
+    parser.add_argument('--profile', choices=['quick', 'full'], default='quick',
+                        help="Size set: 'quick' for routine checks, 'full' goes up to 4000x4000 grids.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=None, help="Override the sizes of every benchmark.")
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--model-type', default='rf', choices=['rf', 'xgb', 'xgb_hist'])
+    parser.add_argument('--output', type=str, default=None,
+                        help="Result JSON path (default: outputs/benchmarks/<timestamp>.json)")
+    parser.add_argument('--save-baseline', type=str, default=None, help="Also save this run as the baseline here.")
+    parser.add_argument('--baseline', type=str, default=None, help="Baseline JSON to compare against.")
+    parser.add_argument('--compare', type=str, default=None, help="Compare a saved result JSON instead of running.")
+    parser.add_argument('--threshold', type=float, default=0.2, help="Relative slowdown flagged as a regression.")
+    sys.exit(main(parser.parse_args()))
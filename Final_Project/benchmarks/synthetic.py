@@ -0,0 +1,68 @@
+"""
+Synthetic data shaped like the GoDaddy microbusiness panel and census_starter.csv,
+plus random CA grids.
+"""
+import numpy as np
+import pandas as pd
+
+def make_census(n_counties=3135, seed=0):
+    """
+    Census table with the census_starter.csv columns for n_counties random cfips.
+    Beyond the real cfips range (56k codes) the codes continue upwards, so any size works.
+    """
+    rng = np.random.default_rng(seed)
+    cfips = np.sort(rng.choice(np.arange(1001, max(57000, 1001 + n_counties)), n_counties, replace=False))
+    census = {}
+    for year in range(2017, 2022):
+        census[f'pct_bb_{year}'] = np.round(rng.uniform(50, 95, n_counties), 1)
+    census['cfips'] = cfips
+    for prefix, low, high in [('pct_college', 5, 45), ('pct_foreign_born', 0, 30), ('pct_it_workers', 0, 5)]:
+        for year in range(2017, 2022):
+            census[f'{prefix}_{year}'] = np.round(rng.uniform(low, high, n_counties), 1)
+    for year in range(2017, 2022):
+        census[f'median_hh_inc_{year}'] = np.round(rng.uniform(25000, 120000, n_counties))
+    return pd.DataFrame(census)
+
+def make_panel(n_counties=3135, n_months=40, seed=0, cfips=None):
+    """
+    County x month panel with the train.csv columns:
+    row_id, cfips, county, state, first_day_of_month, microbusiness_density, active.
+    Densities follow a noisy multiplicative random walk per county.
+    """
+    rng = np.random.default_rng(seed)
+    if cfips is None:
+        cfips = make_census(n_counties, seed)['cfips'].to_numpy()
+    n_counties = len(cfips)
+    dates = pd.date_range('2019-08-01', periods=n_months, freq='MS')
+
+    start = rng.lognormal(1.0, 0.8, n_counties)
+    growth = np.cumprod(1 + rng.normal(0.002, 0.02, (n_counties, n_months)), axis=1)
+    density = start[:, None] * growth
+
+    panel = pd.DataFrame({
+        'cfips': np.repeat(cfips, n_months),
+        'first_day_of_month': np.tile(dates, n_counties),
+        'microbusiness_density': density.ravel(),
+    })
+    panel['row_id'] = panel['cfips'].astype(str) + '_' + panel['first_day_of_month'].dt.strftime('%Y-%m-%d')
+    panel['county'] = 'County ' + panel['cfips'].astype(str)
+    panel['state'] = 'State ' + (panel['cfips'] // 1000).astype(str)
+    panel['active'] = np.round(panel['microbusiness_density'] * rng.uniform(50, 5000, len(panel))).astype(int)
+    return panel[['row_id', 'cfips', 'county', 'state', 'first_day_of_month', 'microbusiness_density', 'active']]
+
+def split_panel(panel, n_test_months=8):
+    """
+    Splits a panel into train and a test frame (row_id, cfips, first_day_of_month)
+    holding the last n_test_months, like the Kaggle files.
+    """
+    cutoff = panel['first_day_of_month'].sort_values().unique()[-n_test_months]
+    train = panel[panel['first_day_of_month'] < cutoff].reset_index(drop=True)
+    test = panel[panel['first_day_of_month'] >= cutoff][['row_id', 'cfips', 'first_day_of_month']].reset_index(drop=True)
+    return train, test
+
+def make_grid(grid_size, density=0.1, seed=0, dtype=np.uint8):
+    """
+    Square 0/1 grid with about `density` active cells, like MicroEnterpriseCA.initialize_random.
+    """
+    rng = np.random.default_rng(seed)
+    return (rng.random((grid_size, grid_size)) < density).astype(dtype)
@@ -1,128 +1,433 @@
 import pandas as pd
+import numpy as np
 import os
-from .utils import setup_logger, load_config
-from .preprocessing import preprocess_pipeline
-from .feature_engineering import feature_engineering_pipeline
+from functools import partial
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from .utils import setup_logger, load_config, project_path
+from .preprocessing import clean_data, iter_clean_chunks
+from .ingestion import load_table
+from .feature_engineering import feature_engineering_chunked
+from .feature_store import LagFeatureStore
 from .model_training import ModelTrainer
 from .evaluation import calculate_metrics
-from .drift_detection import detect_drift
+from .cross_validation import cross_validate
+from .sharding import ShardedTrainer, shard_map, predict_with
+from .model_registry import ModelRegistry
+from .drift_detection import detect_drift, DriftMonitor
 from .submission_generator import generate_submission_file
+from .stage_cache import StageCache, code_digest
+from .workshop import workshop_module
+from .dag import DAGExecutor
+from .profiling import Profiler, activated, profile_stage
+from . import (preprocessing, feature_engineering, ingestion, model_training, evaluation, cross_validation, sharding,
+               drift_detection, cellular_automata, county_ca, event_simulation)
 
 from .cellular_automata import MicroEnterpriseCA
-from .event_simulation import simulate_future_scenario, apply_shock
+from .county_ca import CountyCA
+from .event_simulation import simulate_future_scenario, apply_shock, simulate_paths, last_density_by_county, scenario_fan_bands
 
 logger = setup_logger("api_connector")
 
+def initial_density(census_data):
+    """
+    Initial CA density: census density proxy (e.g. mean of normalized population) or 0.1.
+    """
+    density = 0.1
+    if census_data is not None and 'pct_bb_2021' in census_data.columns:
+         # Example proxy: use mean broadband access as proxy for initial density * 0.01
+         density = census_data['pct_bb_2021'].mean() / 1000.0 
+         density = max(0.05, min(0.3, density)) # Clip
+    return density
+
+def write_ca_grid(output_path, census_data):
+    """
+    Grid Cellular Automata: 30 steps, final state saved as ca_simulation_final.png.
+    """
+    logger.info("Running Cellular Automata Simulation...")
+    ca = MicroEnterpriseCA(grid_size=50)
+    ca.initialize_random(density=initial_density(census_data))
+    ca.run_simulation(steps=30)
+    
+    ca_output_path = os.path.join(output_path, 'ca_simulation_final.png')
+    ca.visualize_step(step_idx=30, output_path=ca_output_path)
+    return [ca_output_path]
+
+def write_county_ca(output_path, census_data, adjacency_path=None):
+    """
+    County-level Cellular Automata (one cell per census county), saved as county_ca_activity.csv.
+    """
+    if census_data is None or 'cfips' not in census_data.columns:
+        return []
+    logger.info("Running County-level Cellular Automata...")
+    county_model = CountyCA(census_data, adjacency_path=adjacency_path, n_replicates=100)
+    county_model.initialize_random(density=initial_density(census_data))
+    county_model.run_simulation(steps=30)
+    county_output_path = os.path.join(output_path, 'county_ca_activity.csv')
+    county_model.county_activity().to_csv(county_output_path, index=False)
+    logger.info(f"County CA activity saved to {county_output_path}")
+    return [county_output_path]
+
+def write_event_trajectory(output_path):
+    """
+    Hypothetical county trajectory with shocks and its Monte Carlo fan band,
+    saved as event_simulation_trajectory.png.
+    """
+    logger.info("Running Event Simulation...")
+    # Simulating a hypothetical county trajectory
+    future_traj = simulate_future_scenario(model=None, current_data=None, steps=24)
+    # Monte Carlo fan band around the same hypothetical county
+    paths = simulate_paths(1.0, n_paths=1000, steps=24)
+    low, high = np.quantile(paths, [0.05, 0.95], axis=0)
+    
+    # Save event sim plot (Figure API: no pyplot global state, safe from worker threads)
+    with profile_stage('plot'):
+        fig = Figure(figsize=(10, 5))
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+        ax.fill_between(range(24), low, high, alpha=0.2, label="90% band (1000 paths)")
+        ax.plot(future_traj, marker='o', linestyle='-')
+        ax.set_title("Event Simulation: Future Density Projection with Shocks")
+        ax.set_xlabel("Months")
+        ax.set_ylabel("Projected Density")
+        ax.grid(True)
+        event_output_path = os.path.join(output_path, 'event_simulation_trajectory.png')
+        fig.savefig(event_output_path)
+    logger.info(f"Event simulation plot saved to {event_output_path}")
+    return [event_output_path]
+
+def write_fan_bands(output_path, panel):
+    """
+    County fan bands, starting from each county's last observed density.
+    """
+    if panel is None or 'microbusiness_density' not in panel.columns:
+        return []
+    start_values = last_density_by_county(panel)
+    bands = scenario_fan_bands(start_values, n_paths=1000, steps=24)
+    bands_output_path = os.path.join(output_path, 'event_simulation_fan_bands.csv')
+    bands.to_csv(bands_output_path, index=False)
+    logger.info(f"County fan bands saved to {bands_output_path}")
+    return [bands_output_path]
+
+def cached_files(cache, stage, key, output_path, write, *inputs):
+    """
+    Runs a file-writing stage write(output_path, *inputs) through the stage cache.
+    The cached artifact is the written files, so a hit only copies them back.
+    Module-level (with module-level writers) so it can run in a process pool.
+    """
+    os.makedirs(output_path, exist_ok=True)
+    def compute():
+        files = {}
+        for path in write(output_path, *inputs):
+            with open(path, 'rb') as f:
+                files[os.path.basename(path)] = f.read()
+        return {'files': files}
+    
+    if cache is None:
+        artifacts = compute()
+    else:
+        artifacts = cache.cached(stage, key, compute)
+        for name, content in artifacts['files'].items():
+            with open(os.path.join(output_path, name), 'wb') as f:
+                f.write(content)
+    return [os.path.join(output_path, name) for name in artifacts['files']]
+
 class Pipeline:
     def __init__(self, config=None):
         self.config = config if config else load_config()
         self.data_path = self.config['DATA_PATH']
         self.output_path = self.config['OUTPUT_PATH']
+        # Content-addressed cache of stage outputs; CACHE_DIR=None disables it
+        cache_dir = project_path(self.config.get('CACHE_DIR'))
+        self.cache = StageCache(cache_dir, self.config.get('CACHE_MAX_BYTES')) if cache_dir else None
+        # Opt-in model registry (MODEL_REGISTRY=None: models are not registered)
+        self.registry_path = project_path(self.config.get('MODEL_REGISTRY'))
+        self.stage_report = None
+        
+    def _stage(self, stage, compute, **key_parts):
+        """
+        Runs one pipeline stage through the stage cache (if enabled).
+        Returns (artifacts, key); the key is passed on to downstream stages.
+        """
+        if self.cache is None:
+            return compute(), None
+        key = self.cache.key(stage=stage, **key_parts)
+        return self.cache.cached(stage, key, compute), key
+
+    def _add_simulation_stages(self, dag, cache, census_digest=None, with_panel=False):
+        """
+        Adds the independent simulation stages; they need the 'census' stage
+        (and the 'panel' stage for the fan bands). The CA stages run in worker processes.
+        """
+        code = code_digest(cellular_automata, county_ca, event_simulation)
+        def key(stage, **parts):
+            return cache.key(stage=stage, code=code, **parts) if cache else None
         
+        adjacency_path = os.path.join(self.data_path, 'county_adjacency.txt')
+        adjacency_digest = cache.file_digest(adjacency_path) if cache else None
+        dag.add('ca_grid', partial(cached_files, cache, 'ca_grid', key('ca_grid', census=census_digest),
+                                   self.output_path, write_ca_grid),
+                deps=('census',), executor='process')
+        dag.add('county_ca', partial(cached_files, cache, 'county_ca',
+                                     key('county_ca', census=census_digest, adjacency=adjacency_digest),
+                                     self.output_path, partial(write_county_ca, adjacency_path=adjacency_path)),
+                deps=('census',), executor='process')
+        dag.add('event_trajectory', partial(cached_files, cache, 'event_trajectory', key('event_trajectory'),
+                                            self.output_path, write_event_trajectory))
+        if with_panel:
+            dag.add('fan_bands', lambda panel: cached_files(cache, 'fan_bands', key('fan_bands', panel=panel[1]),
+                                                            self.output_path, write_fan_bands, panel[0]),
+                    deps=('panel',))
+
+    def _run_dag(self, dag):
+        results = dag.run()
+        self.stage_report = dag.report
+        os.makedirs(self.output_path, exist_ok=True)
+        report_path = os.path.join(self.output_path, 'stage_report.csv')
+        dag.report.to_csv(report_path, index=False)
+        logger.info(f"Stage report saved to {report_path}")
+        return results
+
     def run(self, model_type='rf'):
+        """
+        Runs the pipeline under a Profiler and writes outputs/run_report.json: run metadata,
+        per-stage totals and calls of every instrumented function (load, clean, features,
+        train, predict, CA steps, plots, ...) and the DAG stage report.
+        """
+        profiler = Profiler(trace_memory=self.config.get('PROFILE_MEMORY', False),
+                            mode=self.config.get('PROFILE_MODE'), stages=self.config.get('PROFILE_STAGES'),
+                            output_dir=self.config.get('PROFILE_DIR', 'outputs/profiles'))
+        with activated(profiler):
+            try:
+                return self._run_stages(model_type)
+            finally:
+                dag_stages = self.stage_report.to_dict('records') if self.stage_report is not None else []
+                profiler.save(os.path.join(self.output_path, 'run_report.json'),
+                              model_type=model_type, dag_stages=dag_stages)
+                logger.info("Slowest stages: " + ", ".join(
+                    f"{row['stage']} {row['wall_seconds']:.2f}s ({row['calls']} calls)"
+                    for row in profiler.summary()[:5]))
+
+    def _run_stages(self, model_type):
         logger.info("Initializing End-to-End Pipeline...")
         
         # 1. Preprocessing
-        train_clean, test_clean, census = preprocess_pipeline(self.data_path)
+        # train.csv is streamed in cfips-aligned chunks and cleaned chunk by chunk
+        train_path = os.path.join(self.data_path, 'train.csv')
+        test_path = os.path.join(self.data_path, 'test.csv')
+        census_path = os.path.join(self.data_path, 'census_starter.csv')
+        has_panel = os.path.exists(train_path) and os.path.exists(test_path)
+        digest = self.cache.file_digest if self.cache else (lambda path: None)
+        census_digest = digest(census_path)
+        
+        # Stages form a dependency graph; independent ones run concurrently
+        dag = DAGExecutor(max_workers=self.config.get('MAX_WORKERS'))
+        # census_starter.csv is loaded once here and passed to every stage that needs it;
+        # stages never load the same file concurrently
+        def load_census():
+            if not os.path.exists(census_path):
+                logger.warning("census_starter.csv not found.")
+                return None
+            return load_table(census_path)
+        dag.add('census', load_census)
         
         # 2. Feature Engineering
-        if train_clean is not None:
-            train_fe, test_fe = feature_engineering_pipeline(train_clean, test_clean, census)
+        if has_panel:
+            def build_features(census):
+                test = load_table(test_path)
+                test_clean = clean_data(test)
+                train_chunks = iter_clean_chunks(train_path, chunk_rows=self.config.get('CHUNK_ROWS', 500_000))
+                train_fe, test_fe, train_clean = feature_engineering_chunked(
+                    train_chunks, test_clean, census,
+                    memory_optimized=self.config.get('MEMORY_OPTIMIZED', False),
+                    census_columns=self.config.get('CENSUS_COLUMNS'))
+                logger.info(f"Feature frames: train {train_fe.memory_usage(deep=True).sum() / 1e6:.2f} MB, "
+                            f"test {test_fe.memory_usage(deep=True).sum() / 1e6:.2f} MB")
+                return {'train_fe': train_fe, 'test_fe': test_fe, 'train_clean': train_clean}
+            
+            dag.add('features', lambda census: self._stage(
+                'features', partial(build_features, census),
+                files=[digest(train_path), digest(test_path), census_digest],
+                config={k: self.config.get(k) for k in ('CHUNK_ROWS', 'MEMORY_OPTIMIZED', 'CENSUS_COLUMNS')},
+                code=code_digest(preprocessing, feature_engineering, ingestion)), deps=('census',))
+            dag.add('panel', lambda features: (features[0]['train_clean'], features[1]), deps=('features',))
             
             # Prepare Data for Modeling
             # Target: microbusiness_density
             # Drop columns not needed for training
-            drop_cols = ['row_id', 'cfips', 'county', 'state', 'first_day_of_month', 'active', 'microbusiness_density']
-            feature_cols = [c for c in train_fe.columns if c not in drop_cols]
-            feature_cols = [c for c in feature_cols if pd.api.types.is_numeric_dtype(train_fe[c])]
+            def prepare_matrices(features):
+                train_fe, test_fe = features[0]['train_fe'], features[0]['test_fe']
+                drop_cols = ['row_id', 'cfips', 'county', 'state', 'first_day_of_month', 'active', 'microbusiness_density']
+                feature_cols = [c for c in train_fe.columns if c not in drop_cols]
+                feature_cols = [c for c in feature_cols if pd.api.types.is_numeric_dtype(train_fe[c])]
+                return {'X_train': train_fe[feature_cols], 'y_train': train_fe['microbusiness_density'],
+                        'X_test': test_fe[feature_cols], 'dates': train_fe['first_day_of_month'],
+                        'cfips': train_fe['cfips']}
             
-            X_train = train_fe[feature_cols]
-            y_train = train_fe['microbusiness_density']
-            X_test = test_fe[feature_cols]
+            dag.add('matrices', prepare_matrices, deps=('features',))
             
             # 3. Model Training
-            trainer = ModelTrainer(model_type=model_type)
-            trainer.train(X_train, y_train)
+            # SHARD_KEY trains one model per state / census cluster instead of one global model
+            shard_key = self.config.get('SHARD_KEY')
+            def train_model(features, matrices, census):
+                def compute():
+                    if shard_key:
+                        shards = shard_map(shard_key, panel=features[0]['train_fe'], census=census,
+                                           n_clusters=self.config.get('SHARD_CLUSTERS', 8))
+                        trainer = ShardedTrainer(model_type=model_type, max_workers=self.config.get('MAX_WORKERS'))
+                        trainer.train(matrices['X_train'], matrices['y_train'], features[0]['train_fe']['cfips'], shards,
+                                      dates=matrices['dates'])
+                    else:
+                        trainer = ModelTrainer(model_type=model_type, nthread=self.config.get('N_JOBS'))
+                        trainer.train(matrices['X_train'], matrices['y_train'], dates=matrices['dates'])
+                    # Every freshly trained model becomes a new registry version (servable by src.inference_server)
+                    if self.registry_path:
+                        ModelRegistry(self.registry_path).save(
+                            trainer, f"{model_type}_{shard_key}" if shard_key else model_type,
+                            feature_names=list(matrices['X_train'].columns),
+                            metadata={'features_key': features[1], 'train_rows': len(matrices['X_train'])})
+                    return {'trainer': trainer}
+                model = self._stage('model', compute, features=features[1], model_type=model_type,
+                                    shards=[shard_key, self.config.get('SHARD_CLUSTERS')] if shard_key else None,
+                                    code=code_digest(model_training, sharding))
+                if shard_key:
+                    model[0]['trainer'].save(os.path.join(self.output_path, 'sharded_model.joblib'))
+                return model
+            
+            dag.add('model', train_model, deps=('features', 'matrices', 'census'))
+            
+            # 4. Evaluation: rolling-origin time-series cross-validation over first_day_of_month
+            # Runs after training so the folds get the whole core budget; with SHARD_KEY every
+            # fold trains a sharded model on the trained model's shards
+            def evaluate(model, matrices):
+                def compute():
+                    scores, oof = cross_validate(
+                        matrices['X_train'], matrices['y_train'], matrices['dates'], model_type=model_type,
+                        n_folds=self.config.get('CV_FOLDS', 3), horizon=self.config.get('CV_HORIZON', 3),
+                        window=self.config.get('CV_WINDOW'), n_jobs=self.config.get('N_JOBS'),
+                        cfips=matrices['cfips'], shard_of=model[0]['trainer'].shard_of if shard_key else None)
+                    return {'scores': scores, 'oof': oof,
+                            'metrics': calculate_metrics(oof['y_true'], oof['y_pred'])}
+                evaluated = self._stage('evaluation', compute, model=model[1],
+                                        config={k: self.config.get(k) for k in ('CV_FOLDS', 'CV_HORIZON', 'CV_WINDOW')},
+                                        code=code_digest(cross_validation, evaluation, event_simulation))
+                cv_path = os.path.join(self.output_path, 'cv_scores.csv')
+                evaluated[0]['scores'].to_csv(cv_path, index=False)
+                logger.info(f"Cross-validation scores saved to {cv_path}")
+                return evaluated
             
-            # 4. Evaluation (Training Set - Just for check, ideally use validation set)
-            train_preds = trainer.predict(X_train)
-            metrics = calculate_metrics(y_train, train_preds)
+            dag.add('evaluation', evaluate, deps=('model', 'matrices'))
             
             # 5. Drift Detection (Concept Drift)
             # Check distribution of predictions or key features
-            # Here checking target variable distribution vs prediction distribution
-            drift_result = detect_drift(y_train, train_preds)
+            # Here checking target variable distribution vs out-of-fold prediction distribution
+            def check_drift(evaluated):
+                def compute():
+                    oof = evaluated[0]['oof']
+                    return {'drift_result': detect_drift(oof['y_true'], oof['y_pred'])}
+                return self._stage('drift', compute, evaluation=evaluated[1], code=code_digest(drift_detection, workshop_module('drift')))
+            
+            dag.add('drift', check_drift, deps=('evaluation',))
+            
+            # 5b. Feature drift: every model input, test month by test month, against a
+            # histogram sketch of the training rows
+            def check_feature_drift(features, matrices):
+                def compute():
+                    monitor = DriftMonitor(n_bins=self.config.get('DRIFT_BINS', 100),
+                                           alpha=self.config.get('DRIFT_ALPHA', 0.05)).fit(matrices['X_train'])
+                    months = features[0]['test_fe']['first_day_of_month']
+                    reports = [monitor.check(batch).assign(month=month)
+                               for month, batch in matrices['X_test'].groupby(months.to_numpy(), sort=True)]
+                    return {'report': pd.concat(reports, ignore_index=True), 'monitor': monitor}
+                drift, _ = self._stage('feature_drift', compute, features=features[1],
+                                       config={k: self.config.get(k) for k in ('DRIFT_BINS', 'DRIFT_ALPHA')},
+                                       code=code_digest(drift_detection, workshop_module('drift')))
+                report_path = os.path.join(self.output_path, 'feature_drift.csv')
+                drift['report'].to_csv(report_path, index=False)
+                # Cleared window: the file holds the fitted reference sketch, not the last month
+                drift['monitor'].reset().save(os.path.join(self.output_path, 'drift_monitor.npz'))
+                flagged = drift['report'].groupby('month')['drift_detected'].sum()
+                logger.info("Drifted features per test month: " +
+                            ", ".join(f"{pd.Timestamp(m).date()}: {n}" for m, n in flagged.items()))
+            
+            dag.add('feature_drift', check_feature_drift, deps=('features', 'matrices'))
             
             # 6. Generate Submission
-            test_preds = trainer.predict(X_test)
+            def write_submission(features, model, matrices):
+                def compute():
+                    test_preds = predict_with(model[0]['trainer'], matrices['X_test'], features[0]['test_fe']['cfips'])
+                    # We need row_id from test_fe
+                    return {'submission': pd.DataFrame({
+                        'row_id': features[0]['test_fe']['row_id'],
+                        'microbusiness_density': test_preds
+                    })}
+                submission, _ = self._stage('submission', compute, model=model[1])
+                submission_path = os.path.join(self.output_path, 'submission.csv')
+                submission['submission'].to_csv(submission_path, index=False)
+                logger.info(f"Submission saved to {submission_path}")
             
-            # Create output dir if not exists
-            os.makedirs(self.output_path, exist_ok=True)
+            dag.add('submission', write_submission, deps=('features', 'model', 'matrices'))
+            
+            # 6b. Recursive multi-step forecast for all counties (one predict call per month)
+            def write_forecast(features, model):
+                def compute():
+                    return {'forecast': simulate_future_scenario(model[0]['trainer'], features[0]['train_fe'],
+                                                                 steps=12, shock_prob=0.0)}
+                forecast, _ = self._stage('forecast', compute, model=model[1], code=code_digest(event_simulation))
+                forecast_path = os.path.join(self.output_path, 'forecast.csv')
+                forecast['forecast'].to_csv(forecast_path, index=False)
+                logger.info(f"Recursive forecast saved to {forecast_path}")
             
-            submission_path = os.path.join(self.output_path, 'submission.csv')
-            # We need row_id from test_fe
-            submission_df = pd.DataFrame({
-                'row_id': test_fe['row_id'],
-                'microbusiness_density': test_preds
-            })
+            dag.add('forecast', write_forecast, deps=('features', 'model'))
             
-            submission_df.to_csv(submission_path, index=False)
-            logger.info(f"Submission saved to {submission_path}")
+            # 6c. Persist lag/rolling state so next month's rows can be featurized incrementally:
+            # the store saved by the previous run only gets the months it has not seen yet
+            def write_feature_store(panel):
+                history = panel[0]
+                store_path = os.path.join(self.output_path, 'feature_store.npz')
+                store = LagFeatureStore.load(store_path) if os.path.exists(store_path) else None
+                if store is not None and (store.last_month is None or
+                                          store.last_month > history['first_day_of_month'].max() or
+                                          (store.lags, store.windows) != (LagFeatureStore().lags, LagFeatureStore().windows)):
+                    logger.warning(f"{store_path} does not match the training history; rebuilding it.")
+                    store = None
+                store = (store or LagFeatureStore()).fit(history)
+                store.save(store_path)
+            
+            dag.add('feature_store', write_feature_store, deps=('panel',))
             
             # 7. Run Simulation & Event Sim (Optional based on flag or always)
-            logger.info("Running Simulations...")
-            self.run_simulations(census)
+            self._add_simulation_stages(dag, self.cache, census_digest, with_panel=True)
+            
+            # Create output dir if not exists
+            os.makedirs(self.output_path, exist_ok=True)
+            results = self._run_dag(dag)
 
-            return metrics, drift_result
+            return results['evaluation'][0]['metrics'], results['drift'][0]['drift_result']
         else:
             logger.warning("Training data not available. Skipping Feature Engineering, Training, and Submission.")
             
             # Limited Mode: Run Simulation demo if census data exists
-            if census is not None:
-                logger.info(f"Census data available. entries: {len(census)}")
+            if os.path.exists(census_path):
                 logger.info("Running Limited Mode: Cellular Automata & Event Simulation")
-                
-                self.run_simulations(census)
+                self._add_simulation_stages(dag, self.cache, census_digest)
+                self._run_dag(dag)
             
             return None, None
 
-    def run_simulations(self, census_data):
+    def run_simulations(self, census_data, panel=None):
+        """
+        Runs the CA and event simulations (uncached) and returns the paths of the files written.
+        """
         # Ensure output directory exists because it might not be created in Limited Mode
         os.makedirs(self.output_path, exist_ok=True)
-
-        # 1. Cellular Automata
-        logger.info("Running Cellular Automata Simulation...")
-        ca = MicroEnterpriseCA(grid_size=50)
-        # Initialize with random or census density proxy (e.g. mean of normalized population)
-        density = 0.1
-        if census_data is not None and 'pct_bb_2021' in census_data.columns:
-             # Example proxy: use mean broadband access as proxy for initial density * 0.01
-             density = census_data['pct_bb_2021'].mean() / 1000.0 
-             density = max(0.05, min(0.3, density)) # Clip
-        
-        ca.initialize_random(density=density)
-        ca.run_simulation(steps=30)
-        
-        ca_output_path = os.path.join(self.output_path, 'ca_simulation_final.png')
-        ca.visualize_step(step_idx=30, output_path=ca_output_path)
-        
-        # 2. Event Simulation
-        logger.info("Running Event Simulation...")
-        # Simulating a hypothetical county trajectory
-        future_traj = simulate_future_scenario(model=None, current_data=None, steps=24)
-        
-        # Save event sim plot
-        import matplotlib.pyplot as plt
-        plt.figure(figsize=(10, 5))
-        plt.plot(future_traj, marker='o', linestyle='-')
-        plt.title("Event Simulation: Future Density Projection with Shocks")
-        plt.xlabel("Months")
-        plt.ylabel("Projected Density")
-        plt.grid(True)
-        event_output_path = os.path.join(self.output_path, 'event_simulation_trajectory.png')
-        plt.savefig(event_output_path)
-        plt.close()
-        logger.info(f"Event simulation plot saved to {event_output_path}")
+        dag = DAGExecutor(max_workers=self.config.get('MAX_WORKERS'))
+        dag.add('census', lambda: census_data)
+        dag.add('panel', lambda: (panel, None))
+        self._add_simulation_stages(dag, None, with_panel=panel is not None)
+        results = self._run_dag(dag)
+        return [path for name in ('ca_grid', 'county_ca', 'event_trajectory', 'fan_bands')
+                for path in results.get(name, [])]
 
 if __name__ == "__main__":
     # Example usage
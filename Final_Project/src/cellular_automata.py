@@ -1,28 +1,55 @@
 import numpy as np
+import pandas as pd
 import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 from .utils import setup_logger, set_seed
+from .profiling import timed
 
 logger = setup_logger("cellular_automata")
 
+ENGINES = ('loop', 'vectorized')
+
+def moore_neighbors(grid):
+    """
+    Counts active Moore neighbours for every cell at once.
+    Borders do not wrap: cells outside the grid count as empty.
+    Works on a single (H, W) grid or on a stack of grids (..., H, W).
+    """
+    pad_width = [(0, 0)] * (grid.ndim - 2) + [(1, 1), (1, 1)]
+    padded = np.pad(grid, pad_width, mode='constant')
+    return (
+        padded[..., :-2, :-2] + padded[..., :-2, 1:-1] + padded[..., :-2, 2:] +
+        padded[..., 1:-1, :-2]                         + padded[..., 1:-1, 2:] +
+        padded[..., 2:, :-2]  + padded[..., 2:, 1:-1]  + padded[..., 2:, 2:]
+    )
+
 class MicroEnterpriseCA:
-    def __init__(self, grid_size=50, p_growth=0.05, p_decay=0.01):
+    def __init__(self, grid_size=50, p_growth=0.05, p_decay=0.01, engine='vectorized'):
         """
         Initializes the Cellular Automata grid.
         States: 0 (Empty/Dead), 1 (Active Microenterprise)
+        engine: 'vectorized' updates the whole grid with array operations,
+                'loop' is the original cell-by-cell reference implementation.
         """
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine: {engine}")
         self.grid_size = grid_size
         self.p_growth = p_growth
         self.p_decay = p_decay
-        self.grid = np.zeros((grid_size, grid_size), dtype=int)
+        self.engine = engine
+        # States are 0/1, so one byte per cell is enough for both engines
+        self.grid = np.zeros((grid_size, grid_size), dtype=np.uint8)
         set_seed(42)
 
     def initialize_random(self, density=0.1):
         """
         Randomly populates the grid.
         """
-        self.grid = (np.random.rand(self.grid_size, self.grid_size) < density).astype(int)
+        self.grid = (np.random.rand(self.grid_size, self.grid_size) < density).astype(np.uint8)
         logger.info(f"CA initialized with density {density}")
 
+    @timed('ca_step')
     def step(self):
         """
         Evolves grid by one step.
@@ -30,6 +57,28 @@ class MicroEnterpriseCA:
         - If Empty (0): Grows to 1 with prob p_growth * neighbors
         - If Active (1): Decays to 0 with prob p_decay (or shock)
         """
+        if self.engine == 'vectorized':
+            return self._step_vectorized()
+        return self._step_loop()
+
+    def _step_vectorized(self):
+        """
+        Same rules as the loop engine, applied to every cell at once.
+        One uniform draw per cell decides growth (empty cells) or decay (active cells).
+        Draws are taken in the same row-major order as the loop, so both engines
+        produce identical grids for the same seed.
+        """
+        neighbors = moore_neighbors(self.grid)
+        draws = np.random.rand(self.grid_size, self.grid_size)
+
+        empty = self.grid == 0
+        grows = draws < self.p_growth * (neighbors + 0.1)
+        survives = draws >= self.p_decay
+
+        self.grid = np.where(empty, grows, survives).astype(self.grid.dtype)
+        return self.grid
+
+    def _step_loop(self):
         new_grid = self.grid.copy()
         
         for i in range(self.grid_size):
@@ -51,22 +100,110 @@ class MicroEnterpriseCA:
         self.grid = new_grid
         return self.grid
 
-    def run_simulation(self, steps=50):
-        history = []
-        for _ in range(steps):
-            history.append(self.grid.copy())
+    def run_simulation(self, steps=50, packed=False):
+        """
+        Runs `steps` steps and returns the grid before each step as one preallocated array.
+        packed=True stores every frame bit-packed along the last axis (np.packbits),
+        8 cells per byte; use unpack_history() to expand it again.
+        """
+        row_bytes = (self.grid_size + 7) // 8 if packed else self.grid_size
+        history = np.empty((steps, self.grid_size, row_bytes), dtype=np.uint8)
+        for t in range(steps):
+            history[t] = np.packbits(self.grid, axis=-1) if packed else self.grid
             self.step()
         return history
 
+    @timed('plot')
     def visualize_step(self, step_idx=None, output_path=None):
-        plt.figure(figsize=(10, 8))
-        plt.imshow(self.grid, cmap='Greens')
         title = f"CA State - Step {step_idx}" if step_idx is not None else "CA State"
-        plt.title(title)
         
         if output_path:
-            plt.savefig(output_path)
+            # Figure + Agg canvas instead of pyplot: no global state, safe from worker threads
+            fig = Figure(figsize=(10, 8))
+            FigureCanvasAgg(fig)
+            ax = fig.add_subplot()
+            ax.imshow(self.grid, cmap='Greens')
+            ax.set_title(title)
+            fig.savefig(output_path)
             logger.info(f"Saved CA visualization to {output_path}")
-            plt.close()
         else:
+            plt.figure(figsize=(10, 8))
+            plt.imshow(self.grid, cmap='Greens')
+            plt.title(title)
             plt.show()
+
+
+def unpack_history(history, grid_size):
+    """
+    Expands a bit-packed history from run_simulation(packed=True) to (steps, H, W) uint8.
+    """
+    return np.unpackbits(history, axis=-1, count=grid_size)
+
+class MicroEnterpriseEnsemble:
+    def __init__(self, n_replicates=100, grid_size=50, p_growth=0.05, p_decay=0.01, seed=42):
+        """
+        Runs many independent MicroEnterpriseCA realizations as one (N, H, W) array.
+        Each replicate owns its own numpy Generator spawned from a single SeedSequence,
+        so replicate k is reproducible regardless of how many replicates run with it.
+        """
+        self.n_replicates = n_replicates
+        self.grid_size = grid_size
+        self.p_growth = p_growth
+        self.p_decay = p_decay
+        self.rngs = [np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(n_replicates)]
+        self.grids = np.zeros((n_replicates, grid_size, grid_size), dtype=np.uint8)
+        self._draws = np.empty(self.grids.shape)
+        self.activity = None
+
+    def _fill_draws(self):
+        for k, rng in enumerate(self.rngs):
+            rng.random(out=self._draws[k])
+        return self._draws
+
+    def initialize_random(self, density=0.1):
+        draws = self._fill_draws()
+        self.grids = (draws < density).astype(np.uint8)
+        logger.info(f"CA ensemble of {self.n_replicates} replicates initialized with density {density}")
+
+    @timed('ca_ensemble_step')
+    def step(self):
+        """
+        Advances every replicate by one step using the MicroEnterpriseCA rules.
+        """
+        neighbors = moore_neighbors(self.grids)
+        draws = self._fill_draws()
+
+        empty = self.grids == 0
+        grows = draws < self.p_growth * (neighbors + 0.1)
+        survives = draws >= self.p_decay
+
+        self.grids = np.where(empty, grows, survives).astype(np.uint8)
+        return self.grids
+
+    def run_simulation(self, steps=50, quantiles=(0.05, 0.5, 0.95)):
+        """
+        Runs all replicates and returns per-step activity summaries.
+        Only the (steps + 1, N) active-cell counts are kept, never the grids themselves.
+        """
+        activity = np.empty((steps + 1, self.n_replicates), dtype=np.int64)
+        activity[0] = self.grids.sum(axis=(1, 2))
+        for t in range(steps):
+            self.step()
+            activity[t + 1] = self.grids.sum(axis=(1, 2))
+
+        self.activity = activity
+        logger.info(f"CA ensemble completed {steps} steps for {self.n_replicates} replicates.")
+        return summarize_activity(activity, quantiles)
+
+def summarize_activity(activity, quantiles=(0.05, 0.5, 0.95)):
+    """
+    Reduces a (steps, replicates) activity matrix to mean/std/quantile curves per step.
+    """
+    summary = pd.DataFrame({
+        'step': np.arange(activity.shape[0]),
+        'mean': activity.mean(axis=1),
+        'std': activity.std(axis=1),
+    })
+    for q, values in zip(quantiles, np.quantile(activity, quantiles, axis=1)):
+        summary[f'q{q:g}'] = values
+    return summary
@@ -0,0 +1,145 @@
+import os
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from .cellular_automata import summarize_activity
+from .utils import setup_logger
+from .profiling import timed
+
+logger = setup_logger("county_ca")
+
+# Census covariates that raise or lower a county's growth rate
+GROWTH_COVARIATES = ['pct_bb_2021', 'pct_college_2021', 'pct_it_workers_2021', 'median_hh_inc_2021']
+
+def load_county_adjacency(path):
+    """
+    Reads county neighbour pairs as a DataFrame with columns cfips, neighbor_cfips.
+    Accepts the Census Bureau county_adjacency.txt (tab separated without header and
+    county columns only filled on the first line of each block, or the newer
+    pipe-separated file with a header) or a csv with those two columns.
+    """
+    if path.endswith('.csv'):
+        pairs = pd.read_csv(path, usecols=['cfips', 'neighbor_cfips'])
+    else:
+        with open(path, encoding='latin-1') as f:
+            pipe_separated = '|' in f.readline()
+        raw = pd.read_csv(path, sep='|' if pipe_separated else '\t', header=0 if pipe_separated else None,
+                          usecols=[1, 3], encoding='latin-1')
+        raw.columns = ['cfips', 'neighbor_cfips']
+        raw['cfips'] = raw['cfips'].ffill()
+        pairs = raw.dropna()
+    logger.info(f"Loaded {len(pairs)} adjacency pairs from {path}")
+    return pairs.astype('int64')
+
+def proxy_adjacency(cfips, k=2):
+    """
+    State/FIPS-prefix proxy when no adjacency file is available:
+    links each county to its k nearest FIPS codes on each side within the same state.
+    """
+    codes = np.sort(np.asarray(cfips))
+    state = codes // 1000
+    sources, targets = [], []
+    for offset in range(1, k + 1):
+        same_state = state[offset:] == state[:-offset]
+        sources.append(codes[:-offset][same_state])
+        targets.append(codes[offset:][same_state])
+    return pd.DataFrame({'cfips': np.concatenate(sources), 'neighbor_cfips': np.concatenate(targets)})
+
+def build_adjacency_matrix(cfips, pairs):
+    """
+    Builds a symmetric 0/1 CSR matrix over the given cfips order.
+    Pairs referring to unknown counties and self-loops are dropped.
+    """
+    index = pd.Index(cfips)
+    rows = index.get_indexer(pairs['cfips'])
+    cols = index.get_indexer(pairs['neighbor_cfips'])
+    keep = (rows >= 0) & (cols >= 0) & (rows != cols)
+    rows, cols = rows[keep], cols[keep]
+
+    n = len(index)
+    data = np.ones(2 * len(rows), dtype=np.float32)
+    adjacency = sparse.coo_matrix((data, (np.concatenate([rows, cols]), np.concatenate([cols, rows]))), shape=(n, n)).tocsr()
+    # Duplicated pairs were summed by the conversion; the graph is unweighted
+    adjacency.data[:] = 1.0
+    return adjacency
+
+def growth_rates_from_census(census, p_growth=0.05, covariates=GROWTH_COVARIATES):
+    """
+    Per-county growth rate: p_growth scaled by 2 * sigmoid(mean z-score of the covariates).
+    Rates stay in (0, 2 * p_growth) and average roughly p_growth. Missing values count as average.
+    """
+    columns = [c for c in covariates if c in census.columns]
+    if not columns:
+        return np.full(len(census), p_growth)
+    values = census[columns].astype(float)
+    z_scores = ((values - values.mean()) / values.std(ddof=0)).fillna(0.0)
+    score = z_scores.mean(axis=1).to_numpy()
+    return p_growth * 2.0 / (1.0 + np.exp(-score))
+
+class CountyCA:
+    def __init__(self, census, adjacency_path=None, n_replicates=100, p_growth=0.05, p_decay=0.01, seed=42):
+        """
+        Cellular Automata with one cell per county (cfips row of the census table).
+        Neighbourhoods come from a sparse adjacency matrix instead of the Moore grid,
+        so a step for all counties and replicates is one sparse matrix product.
+        States: 0 (Empty/Dead), 1 (Active Microenterprise); one column per replicate.
+        """
+        self.cfips = census['cfips'].to_numpy()
+        if adjacency_path and os.path.exists(adjacency_path):
+            pairs = load_county_adjacency(adjacency_path)
+        else:
+            logger.info("No county adjacency file found, using the state/FIPS-prefix proxy.")
+            pairs = proxy_adjacency(self.cfips)
+        self.adjacency = build_adjacency_matrix(self.cfips, pairs)
+        self.growth_rates = growth_rates_from_census(census, p_growth).astype(np.float32)
+        self.p_decay = p_decay
+        self.n_replicates = n_replicates
+        self.rng = np.random.default_rng(seed)
+        self.state = np.zeros((len(self.cfips), n_replicates), dtype=np.float32)
+        self.activity = None
+        logger.info(f"County CA built with {len(self.cfips)} counties and {self.adjacency.nnz // 2} adjacencies.")
+
+    def initialize_random(self, density=0.1):
+        """
+        density: scalar or one initial activation probability per county.
+        """
+        density = np.broadcast_to(np.asarray(density, dtype=float).reshape(-1, 1), self.state.shape)
+        self.state = (self.rng.random(self.state.shape) < density).astype(np.float32)
+        logger.info(f"County CA initialized for {self.n_replicates} replicates.")
+
+    @timed('county_ca_step')
+    def step(self):
+        """
+        Same rules as MicroEnterpriseCA with per-county growth rates:
+        empty counties activate with prob rate * (active neighbours + 0.1),
+        active counties decay with prob p_decay.
+        """
+        neighbors = self.adjacency @ self.state
+        draws = self.rng.random(self.state.shape, dtype=np.float32)
+
+        empty = self.state == 0
+        grows = draws < self.growth_rates[:, None] * (neighbors + 0.1)
+        survives = draws >= self.p_decay
+
+        self.state = np.where(empty, grows, survives).astype(np.float32)
+        return self.state
+
+    def run_simulation(self, steps=30, quantiles=(0.05, 0.5, 0.95)):
+        """
+        Runs all replicates and returns per-step summaries of the number of active counties.
+        """
+        activity = np.empty((steps + 1, self.n_replicates), dtype=np.int64)
+        activity[0] = self.state.sum(axis=0)
+        for t in range(steps):
+            self.step()
+            activity[t + 1] = self.state.sum(axis=0)
+
+        self.activity = activity
+        logger.info(f"County CA completed {steps} steps for {self.n_replicates} replicates.")
+        return summarize_activity(activity, quantiles)
+
+    def county_activity(self):
+        """
+        Share of replicates in which each county is currently active.
+        """
+        return pd.DataFrame({'cfips': self.cfips, 'active_share': self.state.mean(axis=1)})
@@ -0,0 +1,175 @@
+import os
+import re
+import shutil
+import tempfile
+import joblib
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from .model_training import ModelTrainer
+from .sharding import ShardedTrainer, predict_with
+from .evaluation import smape
+from .event_simulation import recursive_forecast
+from .utils import setup_logger
+from .profiling import timed
+
+logger = setup_logger("cross_validation")
+
+def time_series_folds(months, n_folds=3, horizon=3, window=None, min_train_months=6):
+    """
+    Rolling-origin folds over sorted unique months.
+    The last fold tests the final `horizon` months; each earlier fold moves the origin
+    back by `horizon` months. Training uses every month before the origin (expanding
+    window) or only the last `window` months (rolling window).
+    Returns a list of (train_months, test_months) arrays.
+    """
+    months = np.sort(np.unique(months))
+    first_origin = len(months) - n_folds * horizon
+    if first_origin < min_train_months:
+        raise ValueError(f"{len(months)} months are too few for {n_folds} folds of {horizon} months "
+                         f"with at least {min_train_months} training months.")
+
+    folds = []
+    for k in range(n_folds):
+        origin = first_origin + k * horizon
+        start = 0 if window is None else max(0, origin - window)
+        folds.append((months[start:origin], months[origin:origin + horizon]))
+    return folds
+
+def thread_budget(n_folds, n_jobs=None):
+    """
+    Splits n_jobs cores (default: all) between parallel folds and each model's own threads,
+    so folds x model threads never exceeds the budget.
+    """
+    total = n_jobs if n_jobs and n_jobs > 0 else (os.cpu_count() or 1)
+    fold_jobs = max(1, min(n_folds, total))
+    return fold_jobs, max(1, total // fold_jobs)
+
+def target_features(feature_names):
+    """
+    Features derived from past target values (mbd_lag_*, mbd_roll_*, mbd_pct_change_*): at horizon h > 1
+    they would hold densities observed after the forecast origin.
+    """
+    return [c for c in feature_names or [] if re.match(r'mbd_(lag|roll|pct_change)_', c)]
+
+class _ArrayPredictor:
+    """
+    Feeds recursive_forecast's feature frames to a model trained on plain arrays
+    (passing the cfips through to sharded models).
+    """
+    def __init__(self, trainer, feature_names):
+        self.trainer = trainer
+        self.feature_names = feature_names
+        self.routes_by_cfips = getattr(trainer, 'routes_by_cfips', False)
+
+    def predict(self, X, *cfips):
+        return self.trainer.predict(np.asarray(X, dtype=np.float32), *cfips)
+
+def _fit_fold(data_path, model_type, params, train_rows, test_rows, feature_names=None, n_steps=None,
+              shard_of=None):
+    """
+    Trains one fold. X and y are memory-mapped from data_path; the rows are sorted by
+    month, so a fold's train and test sets are contiguous slices (views, not copies).
+    With shard_of (cfips -> shard key), the fold trains a ShardedTrainer on the same
+    shards as the final model, its shards sharing the fold's thread budget.
+    With n_steps, the test months are forecast recursively from the origin
+    (event_simulation.recursive_forecast) using only the rows before it, so horizon h
+    is a genuine h-step forecast. Test rows of counties without history get NaN.
+    """
+    # Copy-on-write mapping: pages are shared between workers, and sklearn's Cython
+    # validation (which needs a writable buffer) still accepts the arrays
+    X, y, cfips, months = joblib.load(data_path, mmap_mode='c')
+    if shard_of is not None:
+        trainer = ShardedTrainer(model_type=model_type, params={**params, 'n_jobs': 1}, max_workers=params['n_jobs'])
+        trainer.train(X[slice(*train_rows)], y[slice(*train_rows)], cfips[slice(*train_rows)], shard_of)
+    else:
+        trainer = ModelTrainer(model_type=model_type, params=params)
+        trainer.train(X[slice(*train_rows)], y[slice(*train_rows)])
+    if not n_steps:
+        return predict_with(trainer, X[slice(*test_rows)], cfips[slice(*test_rows)] if cfips is not None else None)
+
+    origin = test_rows[0]
+    history = pd.DataFrame(X[:origin], columns=feature_names)
+    history['cfips'] = cfips[:origin]
+    history['first_day_of_month'] = months[:origin]
+    history['microbusiness_density'] = y[:origin]
+    forecast = recursive_forecast(_ArrayPredictor(trainer, feature_names), history, feature_names, steps=n_steps)
+    forecast = forecast.set_index(['cfips', 'first_day_of_month'])['microbusiness_density']
+    test_index = pd.MultiIndex.from_arrays([cfips[slice(*test_rows)], months[slice(*test_rows)]])
+    return forecast.reindex(test_index).to_numpy()
+
+@timed('cross_validation')
+def cross_validate(X, y, dates, model_type='rf', params=None, n_folds=3, horizon=3, window=None,
+                   min_train_months=6, n_jobs=None, cfips=None, shard_of=None):
+    """
+    Time-series cross-validation of ModelTrainer over `dates` (first_day_of_month).
+    Folds are trained in parallel with joblib; the feature matrix is dumped once and
+    memory-mapped by every worker instead of being pickled per fold.
+    When X has lag/rolling target features, cfips (per row) is required: each fold's
+    test months are then forecast recursively from the origin, so the horizon-h score
+    never sees densities observed after the origin.
+    shard_of (Series cfips -> shard key, e.g. ShardedTrainer.shard_of) cross-validates
+    one model per shard instead of a single global model; it also requires cfips.
+    Returns (scores, predictions):
+    scores has one row per fold and horizon (months after the origin) plus a
+    horizon 'all' row per fold, with the rows scored and SMAPE;
+    predictions holds the out-of-fold rows (position in X, fold, horizon, y_true, y_pred).
+    """
+    feature_names = list(X.columns) if isinstance(X, pd.DataFrame) else None
+    recursive = bool(target_features(feature_names))
+    if recursive and cfips is None:
+        raise ValueError("cfips is required to cross-validate lag/rolling target features: "
+                         "test months are forecast recursively per county.")
+    if shard_of is not None and cfips is None:
+        raise ValueError("cfips is required to cross-validate a sharded model: rows are routed by county.")
+    dates = pd.to_datetime(pd.Series(dates)).to_numpy()
+    order = np.argsort(dates, kind='stable')
+    sorted_dates = dates[order]
+    folds = time_series_folds(sorted_dates, n_folds, horizon, window, min_train_months)
+
+    fold_jobs, model_jobs = thread_budget(n_folds, n_jobs)
+    params = {**(params or {}), 'n_jobs': model_jobs}
+    logger.info(f"Cross-validating {'sharded ' if shard_of is not None else ''}{model_type} on {n_folds} folds: "
+                f"{fold_jobs} parallel folds x {model_jobs} threads.")
+
+    def rows(months):
+        return (int(np.searchsorted(sorted_dates, months[0], 'left')),
+                int(np.searchsorted(sorted_dates, months[-1], 'right')))
+
+    fold_rows = [(rows(train_months), rows(test_months)) for train_months, test_months in folds]
+
+    tmp_dir = tempfile.mkdtemp(prefix='cv_')
+    try:
+        data_path = os.path.join(tmp_dir, 'data.joblib')
+        joblib.dump((np.asarray(X, dtype=np.float32)[order], np.asarray(y, dtype=np.float64)[order],
+                     np.asarray(cfips)[order] if cfips is not None else None, sorted_dates), data_path)
+        fold_preds = Parallel(n_jobs=fold_jobs)(
+            delayed(_fit_fold)(data_path, model_type, params, train_rows, test_rows, feature_names,
+                               len(test_months) if recursive else None, shard_of)
+            for (train_rows, test_rows), (_, test_months) in zip(fold_rows, folds))
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    y_sorted = np.asarray(y, dtype=np.float64)[order]
+    scores, predictions = [], []
+    for fold, ((train_months, test_months), (_, test_rows), preds) in enumerate(zip(folds, fold_rows, fold_preds)):
+        test_slice = slice(*test_rows)
+        horizons = np.searchsorted(test_months, sorted_dates[test_slice]) + 1
+        # Counties with no rows before the origin cannot be forecast recursively
+        scored = np.isfinite(preds)
+        if not scored.all():
+            logger.warning(f"Fold {fold}: {int((~scored).sum())} test rows without history before the origin are not scored.")
+        y_true, preds, horizons = y_sorted[test_slice][scored], preds[scored], horizons[scored]
+        predictions.append(pd.DataFrame({'row': order[test_slice][scored], 'fold': fold, 'horizon': horizons,
+                                         'y_true': y_true, 'y_pred': preds}))
+        for h in range(1, len(test_months) + 1):
+            mask = horizons == h
+            scores.append({'fold': fold, 'train_start': train_months[0], 'origin': test_months[0],
+                           'horizon': str(h), 'rows': int(mask.sum()), 'SMAPE': smape(y_true[mask], preds[mask])})
+        scores.append({'fold': fold, 'train_start': train_months[0], 'origin': test_months[0],
+                       'horizon': 'all', 'rows': len(y_true), 'SMAPE': smape(y_true, preds)})
+
+    scores = pd.DataFrame(scores)
+    logger.info("Cross-validation SMAPE per fold: " +
+                ", ".join(f"{r.fold}: {r.SMAPE:.4f}" for r in scores[scores['horizon'] == 'all'].itertuples()))
+    return scores, pd.concat(predictions, ignore_index=True)
@@ -0,0 +1,163 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, wait
+import pandas as pd
+from .utils import setup_logger
+from .profiling import active_profiler, call_profiled, current_rss_mb
+
+logger = setup_logger("dag")
+
+EXECUTORS = ('thread', 'process')
+
+def _sample_peak(peak, stop, interval):
+    while not stop.wait(interval):
+        peak[0] = max(peak[0], current_rss_mb())
+
+def _call_in_process(func, args, profiler_settings=None, sample_interval=0.05):
+    """
+    Runs a process-pool stage and reports the worker's wall time and peak RSS during
+    the call, plus the timings of its instrumented calls when the parent has an
+    active profiler. Pool workers are reused, so the peak is sampled while the stage
+    runs rather than read from the process-lifetime getrusage high-water mark.
+    """
+    peak, stop = [current_rss_mb()], threading.Event()
+    sampler = threading.Thread(target=_sample_peak, args=(peak, stop, sample_interval), daemon=True)
+    sampler.start()
+    start = time.perf_counter()
+    try:
+        if profiler_settings is None:
+            result, calls = func(*args), None
+        else:
+            result, calls = call_profiled(profiler_settings, func, *args)
+    finally:
+        wall = time.perf_counter() - start
+        stop.set()
+        sampler.join()
+    return result, wall, max(peak[0], current_rss_mb()), calls
+
+class Stage:
+    def __init__(self, name, func, deps=(), executor='thread'):
+        """
+        One node of the pipeline graph: func is called with the results of `deps`
+        as positional arguments, in the order given.
+        executor='process' runs it in a worker process (func and its inputs must pickle).
+        """
+        if executor not in EXECUTORS:
+            raise ValueError(f"Unknown executor: {executor}. Choose from {EXECUTORS}.")
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.executor = executor
+
+class DAGExecutor:
+    def __init__(self, max_workers=None, sample_interval=0.05):
+        """
+        Runs a graph of Stages, dispatching every stage whose dependencies are done
+        to a thread pool (or a process pool for executor='process' stages).
+        Records per-stage wall time and peak RSS in `report` after run().
+        Thread stages share the process, so their peak RSS is the process-wide peak
+        while the stage was running, including every stage running beside it
+        (rss_scope='process'); process stages report their own worker's peak during
+        the call (rss_scope='worker').
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.sample_interval = sample_interval
+        self.stages = {}
+        self.results = {}
+        self.report = None
+
+    def add(self, name, func, deps=(), executor='thread'):
+        if name in self.stages:
+            raise ValueError(f"Stage '{name}' is already defined.")
+        self.stages[name] = Stage(name, func, deps, executor)
+        return self
+
+    def _check_graph(self):
+        """
+        Raises ValueError on unknown dependencies or cycles.
+        """
+        for stage in self.stages.values():
+            missing = [d for d in stage.deps if d not in self.stages]
+            if missing:
+                raise ValueError(f"Stage '{stage.name}' depends on unknown stages: {missing}")
+        done = set()
+        remaining = dict(self.stages)
+        while remaining:
+            ready = [n for n, s in remaining.items() if all(d in done for d in s.deps)]
+            if not ready:
+                raise ValueError(f"Dependency cycle between stages: {sorted(remaining)}")
+            for name in ready:
+                done.add(name)
+                del remaining[name]
+
+    def _sample_memory(self, running, peaks, stop):
+        while not stop.wait(self.sample_interval):
+            rss = current_rss_mb()
+            for name in list(running):
+                peaks[name] = max(peaks.get(name, 0.0), rss)
+
+    def run(self):
+        """
+        Executes every stage once and returns {stage name: result}.
+        The first failing stage cancels the stages not yet started and re-raises its error.
+        """
+        self._check_graph()
+        self.results = {}
+        profiler = active_profiler()
+        records, peaks, running, futures = {}, {}, {}, {}
+        pending = dict(self.stages)
+        stop = threading.Event()
+        sampler = threading.Thread(target=self._sample_memory, args=(running, peaks, stop), daemon=True)
+        sampler.start()
+
+        threads = ThreadPoolExecutor(max_workers=self.max_workers)
+        processes = None
+        try:
+            while pending or futures:
+                ready = [s for s in pending.values() if all(d in self.results for d in s.deps)]
+                for stage in ready:
+                    del pending[stage.name]
+                    args = [self.results[d] for d in stage.deps]
+                    running[stage.name] = time.perf_counter()
+                    peaks[stage.name] = current_rss_mb()
+                    if stage.executor == 'process':
+                        processes = processes or ProcessPoolExecutor(max_workers=self.max_workers)
+                        future = processes.submit(_call_in_process, stage.func, args,
+                                                  profiler.settings() if profiler else None,
+                                                  self.sample_interval)
+                    else:
+                        future = threads.submit(stage.func, *args)
+                    futures[future] = stage
+                    logger.info(f"Stage '{stage.name}' started.")
+
+                done, _ = wait(list(futures), return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = futures.pop(future)
+                    start = running.pop(stage.name)
+                    wall = time.perf_counter() - start
+                    peak = max(peaks.get(stage.name, 0.0), current_rss_mb())
+                    result = future.result()
+                    if stage.executor == 'process':
+                        result, wall, peak, calls = result
+                        if profiler:
+                            profiler.merge(**calls)
+                    self.results[stage.name] = result
+                    scope = 'worker' if stage.executor == 'process' else 'process'
+                    records[stage.name] = {'stage': stage.name, 'executor': stage.executor,
+                                           'wall_seconds': wall, 'peak_rss_mb': peak,
+                                           'rss_scope': scope}
+                    logger.info(f"Stage '{stage.name}' finished in {wall:.2f}s "
+                                f"(peak RSS {peak:.0f} MB, {scope}).")
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+        finally:
+            stop.set()
+            threads.shutdown(wait=True, cancel_futures=True)
+            if processes is not None:
+                processes.shutdown(wait=True, cancel_futures=True)
+
+        self.report = pd.DataFrame([records[name] for name in self.stages if name in records])
+        return self.results
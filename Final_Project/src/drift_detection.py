@@ -1,27 +1,39 @@
 import numpy as np
-from scipy.stats import ks_2samp
+from scipy.stats import ks_2samp, wasserstein_distance
 from .utils import setup_logger
+from .workshop import workshop_module
 
 logger = setup_logger("drift_detection")
 
-def detect_drift(train_dist, new_dist, alpha=0.05):
+# The histogram-sketch monitor is implemented once, in Workshop_4_Simulation/src/drift.py
+_drift = workshop_module('drift')
+benjamini_hochberg = _drift.benjamini_hochberg
+DriftMonitor = _drift.DriftMonitor
+
+def detect_drift(train_dist, new_dist, alpha=0.05, n_bins=100):
     """
     Performs Kolmogorov-Smirnov test to detect drift between training distribution and new data.
+    Both samples are in memory, so KS and the Wasserstein distance are exact; PSI is taken
+    from a DriftMonitor sketch with n_bins bins. Use DriftMonitor directly for streamed data.
     """
     logger.info("Performing KS-Test for drift detection...")
+    train_dist = np.asarray(train_dist, dtype=np.float64).ravel()
+    new_dist = np.asarray(new_dist, dtype=np.float64).ravel()
+    train_dist, new_dist = train_dist[~np.isnan(train_dist)], new_dist[~np.isnan(new_dist)]
     stat, p_value = ks_2samp(train_dist, new_dist)
-    
-    drift_detected = p_value < alpha
+    report = DriftMonitor(n_bins=n_bins, alpha=alpha).fit(train_dist).check(new_dist).iloc[0]
     
     result = {
         "statistic": float(stat),
         "p_value": float(p_value),
-        "drift_detected": bool(drift_detected)
+        "psi": float(report['psi']),
+        "wasserstein": float(wasserstein_distance(train_dist, new_dist)),
+        "drift_detected": bool(p_value < alpha)
     }
     
-    if drift_detected:
-        logger.warning(f"Drift DETECTED! p-value: {p_value:.5f} < alpha: {alpha}")
+    if result['drift_detected']:
+        logger.warning(f"Drift DETECTED! p-value: {result['p_value']:.5f} < alpha: {alpha}")
     else:
-        logger.info(f"No drift detected. p-value: {p_value:.5f}")
+        logger.info(f"No drift detected. p-value: {result['p_value']:.5f}")
         
     return result
@@ -4,6 +4,16 @@ from .utils import setup_logger
 
 logger = setup_logger("evaluation")
 
+def smape(y_true, y_pred):
+    """
+    Symmetric mean absolute percentage error (0-200); pairs where both values are 0 count as 0.
+    """
+    y_true = np.asarray(y_true, dtype=float)
+    y_pred = np.asarray(y_pred, dtype=float)
+    denominator = (np.abs(y_true) + np.abs(y_pred)) / 200.0
+    diff = np.divide(np.abs(y_true - y_pred), denominator, out=np.zeros_like(denominator), where=denominator != 0)
+    return float(np.mean(diff)) if len(diff) else float('nan')
+
 def calculate_metrics(y_true, y_pred):
     """
     Calculates RMSE and MAE.
@@ -13,16 +23,10 @@ def calculate_metrics(y_true, y_pred):
     rmse = np.sqrt(mse)
     mae = mean_absolute_error(y_true, y_pred)
     
-    # SMAPE calculation
-    denominator = (np.abs(y_true) + np.abs(y_pred)) / 200.0
-    diff = np.abs(y_true - y_pred) / denominator
-    diff[denominator == 0] = 0.0
-    smape = np.mean(diff)
-    
     metrics = {
         "RMSE": float(rmse),
         "MAE": float(mae),
-        "SMAPE": float(smape)
+        "SMAPE": smape(y_true, y_pred)
     }
     
     logger.info(f"Evaluation Metrics: {metrics}")
@@ -1,50 +1,181 @@
+import re
 import numpy as np
 import pandas as pd
 from .utils import setup_logger
+from .profiling import timed
 
 logger = setup_logger("event_simulation")
 
 def apply_shock(series, shock_magnitude=-0.2, duration=3):
     """
     Applies a temporary shock to the time series.
+    Also accepts a (n_paths, steps) array; the same window is shocked on every path.
     """
-    series = series.copy()
-    shock_indices = np.random.choice(len(series) - duration, 1)
+    if isinstance(series, pd.Series):
+        series = series.copy()
+    else:
+        series = np.array(series, dtype=float)
+    shock_indices = np.random.choice(series.shape[-1] - duration, 1)
     start_idx = shock_indices[0]
     
     logger.info(f"Applying shock of magnitude {shock_magnitude} at index {start_idx} for {duration} steps.")
     
-    for i in range(duration):
-        series[start_idx + i] *= (1 + shock_magnitude)
+    window = slice(start_idx, start_idx + duration)
+    if isinstance(series, pd.Series):
+        series.iloc[window] *= (1 + shock_magnitude)
+    else:
+        series[..., window] *= (1 + shock_magnitude)
         
     return series
 
+@timed('monte_carlo_paths')
+def simulate_paths(start_values, n_paths=1000, steps=12, drift_sigma=0.05, shock_prob=0.1,
+                   shock_magnitude=-0.2, seed=42):
+    """
+    Batched Monte Carlo engine for future trajectories.
+    Each month multiplies the previous value by (1 + N(0, drift_sigma)) and, with
+    probability shock_prob, by (1 + shock_magnitude); a path is the cumulative
+    product of those factors.
+    Returns float32 paths of shape start_values.shape + (n_paths, steps).
+    """
+    rng = np.random.default_rng(seed)
+    start = np.asarray(start_values, dtype=np.float32)
+    shape = start.shape + (n_paths, steps)
+    
+    factors = rng.standard_normal(shape, dtype=np.float32)
+    factors *= drift_sigma
+    factors += 1
+    shocks = rng.random(shape, dtype=np.float32) < shock_prob
+    factors[shocks] *= (1 + shock_magnitude)
+    
+    paths = np.cumprod(factors, axis=-1, out=factors)
+    paths *= start[..., None, None]
+    return paths
+
+def last_density_by_county(df):
+    """
+    Latest microbusiness_density per cfips, the starting point for county scenarios.
+    """
+    latest = df.sort_values('first_day_of_month').groupby('cfips')['microbusiness_density'].last()
+    return latest.dropna()
+
+def scenario_fan_bands(start_values, n_paths=10000, steps=24, quantiles=(0.05, 0.25, 0.5, 0.75, 0.95),
+                       chunk_size=64, seed=42, **path_kwargs):
+    """
+    Quantile fan bands for many counties at once.
+    start_values: pd.Series of starting densities indexed by cfips (see last_density_by_county).
+    Counties are simulated in chunks of `chunk_size`, so peak memory is
+    chunk_size * n_paths * steps float32 values regardless of the number of counties.
+    Returns one row per (cfips, step) with a mean column and one column per quantile.
+    """
+    seeds = np.random.SeedSequence(seed).spawn((len(start_values) + chunk_size - 1) // chunk_size)
+    values = start_values.to_numpy()
+    frames = []
+    for chunk_idx, start in enumerate(range(0, len(values), chunk_size)):
+        paths = simulate_paths(values[start:start + chunk_size], n_paths=n_paths, steps=steps,
+                               seed=seeds[chunk_idx], **path_kwargs)
+        bands = np.quantile(paths, quantiles, axis=1)   # (n_quantiles, chunk, steps)
+        chunk_cfips = start_values.index[start:start + chunk_size]
+        frame = pd.DataFrame({
+            'cfips': np.repeat(chunk_cfips, steps),
+            'step': np.tile(np.arange(1, steps + 1), len(chunk_cfips)),
+            'mean': paths.mean(axis=1).ravel(),
+        })
+        for q, band in zip(quantiles, bands):
+            frame[f'q{q:g}'] = band.ravel()
+        frames.append(frame)
+    
+    logger.info(f"Simulated {n_paths} paths x {steps} steps for {len(values)} counties.")
+    return pd.concat(frames, ignore_index=True)
+
+@timed('forecast')
+def recursive_forecast(model, panel_fe, feature_cols=None, steps=12, shock_prob=0.0,
+                       shock_magnitude=-0.2, seed=42):
+    """
+    Recursive multi-step forecast for all counties at once.
+    model: trained ModelTrainer (or any estimator with predict).
+    panel_fe: feature-engineered panel with cfips, first_day_of_month, microbusiness_density
+              and the model's features (see feature_engineering_pipeline).
+    Each horizon step rebuilds the mbd_lag_* / mbd_roll_{mean,std,min,max}_* / mbd_pct_change_*
+    features from the latest densities (observed, then predicted), advances year/month, calls predict once on the
+    stacked (n_counties, n_features) matrix, and optionally applies random shocks on top.
+    Returns one row per (cfips, step) with the forecast density.
+    """
+    if feature_cols is None:
+        feature_cols = getattr(model, 'feature_names', None)
+    if feature_cols is None:
+        raise ValueError("feature_cols must be given when the model does not record its feature names.")
+    
+    lag_cols = {c: int(m.group(1)) for c in feature_cols if (m := re.fullmatch(r'mbd_lag_(\d+)', c))}
+    roll_cols = {c: (m.group(1), int(m.group(2))) for c in feature_cols
+                 if (m := re.fullmatch(r'mbd_roll_(mean|std|min|max)_(\d+)', c))}
+    pct_cols = {c: int(m.group(1)) for c in feature_cols if (m := re.fullmatch(r'mbd_pct_change_(\d+)', c))}
+    depth = max(list(lag_cols.values()) + [w for _, w in roll_cols.values()] +
+                [w + 1 for w in pct_cols.values()] + [1])
+    
+    panel = panel_fe.dropna(subset=['microbusiness_density']).sort_values(['cfips', 'first_day_of_month'])
+    last_rows = panel.groupby('cfips').tail(1).set_index('cfips')
+    cfips = last_rows.index.to_numpy()
+    
+    # Last `depth` densities per county, oldest first; NaN where the history is shorter
+    from_end = panel.groupby('cfips').cumcount(ascending=False).to_numpy()
+    recent = panel[from_end < depth]
+    history = np.full((len(cfips), depth), np.nan)
+    history[np.searchsorted(cfips, recent['cfips'].to_numpy()), depth - 1 - from_end[from_end < depth]] = \
+        recent['microbusiness_density'].to_numpy()
+    
+    # Everything except lags, rolling means and calendar features stays at its last value
+    X = last_rows.reindex(columns=feature_cols).copy()
+    last_date = last_rows['first_day_of_month'].max()
+    rng = np.random.default_rng(seed)
+    
+    forecasts = []
+    for step in range(1, steps + 1):
+        date = last_date + pd.DateOffset(months=step)
+        for col, lag in lag_cols.items():
+            X[col] = history[:, -lag]
+        for col, (stat, window) in roll_cols.items():
+            # Same statistics as feature_engineering.compute_panel_features
+            X[col] = history[:, -window:].std(axis=1, ddof=1) if stat == 'std' else \
+                getattr(history[:, -window:], stat)(axis=1)
+        for col, window in pct_cols.items():
+            X[col] = history[:, -1] / history[:, -(window + 1)] - 1
+        if 'year' in X.columns:
+            X['year'] = date.year
+        if 'month' in X.columns:
+            X['month'] = date.month
+        
+        # Sharded models route rows by county, so they also get the cfips
+        preds = model.predict(X, cfips) if getattr(model, 'routes_by_cfips', False) else model.predict(X)
+        preds = np.asarray(preds, dtype=float)
+        if shock_prob > 0:
+            preds = np.where(rng.random(len(preds)) < shock_prob, preds * (1 + shock_magnitude), preds)
+        
+        history = np.concatenate([history[:, 1:], preds[:, None]], axis=1)
+        forecasts.append(pd.DataFrame({'cfips': cfips, 'first_day_of_month': date,
+                                       'step': step, 'microbusiness_density': preds}))
+    
+    logger.info(f"Recursive forecast: {steps} steps for {len(cfips)} counties.")
+    return pd.concat(forecasts, ignore_index=True)
+
+@timed('scenario')
 def simulate_future_scenario(model, current_data, steps=12, shock_prob=0.1):
     """
     Simulates future trajectory with potential random shocks.
-    Returns the predicted values.
+    With a trained model and a feature-engineered panel, returns the recursive
+    per-county forecast (see recursive_forecast) with shocks applied on top.
+    Otherwise returns a single random-walk trajectory as a list.
     """
-    predictions = []
-    # If we have a model and data we would predict, here we might return a dummy trajectory for demo
     logger.info("Simulating future scenario...")
     
+    if model is not None and isinstance(current_data, pd.DataFrame) and 'cfips' in current_data.columns:
+        return recursive_forecast(model, current_data, steps=steps, shock_prob=shock_prob)
+    
     # Create a dummy trajectory starting from last value or 1.0
     last_val = 1.0
     if isinstance(current_data, pd.DataFrame) and 'microbusiness_density' in current_data.columns:
         if not current_data.empty:
             last_val = current_data['microbusiness_density'].iloc[-1]
-            
-    for i in range(steps):
-        # Random drift
-        change = np.random.normal(0, 0.05)
-        next_val = last_val * (1 + change)
-        
-        # Random shock
-        if np.random.rand() < shock_prob:
-             next_val = next_val * (1 - 0.2) # Negative shock
-             logger.info(f"Shock applied at step {i}")
-             
-        predictions.append(next_val)
-        last_val = next_val
-        
-    return predictions
+    
+    path = simulate_paths(last_val, n_paths=1, steps=steps, shock_prob=shock_prob)
+    return path[0].astype(float).tolist()
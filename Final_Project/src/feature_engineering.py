@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy as np
 from .utils import setup_logger
+from .profiling import timed
+from .preprocessing import optimize_dtypes, log_memory_change, memory_profile, log_memory_profiles
 
 logger = setup_logger("feature_engineering")
 
@@ -31,10 +33,98 @@ def create_rolling_features(df, window=3):
     df[f'mbd_roll_mean_{window}'] = df.groupby('cfips')['microbusiness_density'].transform(lambda x: x.shift(1).rolling(window).mean())
     return df
 
-def feature_engineering_pipeline(train_df, test_df, census_df):
+ROLLING_STATS = ('mean', 'std', 'min', 'max', 'pct_change')
+
+def compute_panel_features(df, lags=(1, 2, 3, 6, 12), windows=(3,), stats=('mean',),
+                           target='microbusiness_density'):
+    """
+    Computes lag and rolling-window features for every county in one pass.
+    Rows are put in (cfips, first_day_of_month) order once; group boundaries are found
+    with NumPy and every window is a strided view over one contiguous array, so there
+    are no per-county Python calls and no copies of the input frame.
+    Rolling statistics use the previous `window` values (shift(1)), like create_rolling_features:
+    mbd_roll_{stat}_{window} for mean/std/min/max and mbd_pct_change_{window}.
+    Returns a DataFrame with only the new columns, aligned to df.index.
+    """
+    unknown = set(stats) - set(ROLLING_STATS)
+    if unknown:
+        raise ValueError(f"Unknown rolling stats: {sorted(unknown)}")
+    
+    cfips = df['cfips'].to_numpy()
+    order = np.lexsort((df['first_day_of_month'].to_numpy(), cfips))
+    is_sorted = bool((order == np.arange(len(order))).all())
+    values = df[target].to_numpy(dtype=float)
+    if not is_sorted:
+        cfips, values = cfips[order], values[order]
+    
+    # Position of each row inside its county block
+    n = len(values)
+    rows = np.arange(n)
+    boundary = np.ones(n, dtype=bool)
+    boundary[1:] = cfips[1:] != cfips[:-1]
+    position = rows - np.maximum.accumulate(np.where(boundary, rows, 0))
+    
+    def shifted(k):
+        out = np.full(n, np.nan)
+        out[k:] = values[:n - k]
+        out[position < k] = np.nan
+        return out
+    
+    features = {}
+    for lag in lags:
+        features[f'mbd_lag_{lag}'] = shifted(lag)
+    
+    previous = features['mbd_lag_1'] if 'mbd_lag_1' in features else shifted(1)
+    for window in windows:
+        padded = np.concatenate([np.full(window - 1, np.nan), previous])
+        view = np.lib.stride_tricks.sliding_window_view(padded, window)
+        incomplete = position < window
+        for stat in stats:
+            if stat == 'pct_change':
+                base = shifted(window + 1)
+                result = previous / base - 1
+                name = f'mbd_pct_change_{window}'
+            else:
+                if stat == 'std':
+                    result = view.std(axis=1, ddof=1)
+                else:
+                    result = getattr(view, stat)(axis=1)
+                result[incomplete] = np.nan
+                name = f'mbd_roll_{stat}_{window}'
+            features[name] = result
+    
+    if not is_sorted:
+        # Scatter back to the caller's row order
+        for name, result in features.items():
+            unsorted = np.empty(n)
+            unsorted[order] = result
+            features[name] = unsorted
+    return pd.DataFrame(features, index=df.index)
+
+def census_lookup(cfips, census_df, columns):
+    """
+    Gathers census columns for every row by cfips code (positional take) instead of a merge.
+    Rows whose cfips is not in the census get NaN.
+    """
+    positions = pd.Index(census_df['cfips']).get_indexer(np.asarray(cfips))
+    missing = positions < 0
+    gathered = {}
+    for col in columns:
+        values = census_df[col].to_numpy().take(positions)
+        if missing.any():
+            values = values.astype(np.result_type(values.dtype, np.float32))
+            values[missing] = np.nan
+        gathered[col] = values
+    return gathered
+
+@timed('features')
+def feature_engineering_pipeline(train_df, test_df, census_df, memory_optimized=False, census_columns=None):
     """
     Applies feature engineering to both train and test sets.
     Merges census data.
+    census_columns limits the census columns added (default: all).
+    memory_optimized=True gathers the census columns by cfips instead of merging,
+    downcasts numerics, turns county/state into categoricals and logs the memory saved.
     """
     logger.info("Starting feature engineering...")
     
@@ -54,18 +144,40 @@ def feature_engineering_pipeline(train_df, test_df, census_df):
     full_df = full_df.sort_values(by=['cfips', 'first_day_of_month'])
     
     # 1. Merge Census Data
-    full_df = full_df.merge(census_df, on='cfips', how='left')
-    
-    # 2. Lag Features
-    full_df = create_lag_features(full_df)
+    if census_columns is None:
+        census_columns = [c for c in census_df.columns if c != 'cfips']
+    if memory_optimized:
+        # Index-aligned gather: no merge, no duplicated join keys, only the requested columns
+        full_df = full_df.reset_index(drop=True)
+        gathered = census_lookup(full_df['cfips'], census_df, census_columns)
+        for col, values in gathered.items():
+            full_df[col] = values
+        # The merge is never run here, so its size is estimated from the census dtypes
+        # (integers widen to float64 when some rows have no census match); the
+        # gathered columns are measured
+        unmatched = not full_df['cfips'].isin(census_df['cfips']).all()
+        merge_bytes = sum(len(full_df) * (8 if unmatched and census_df[col].dtype.kind in 'iub'
+                                          else census_df[col].dtype.itemsize)
+                          for col in census_columns)
+        log_memory_change("Census columns (estimated merge vs measured gather)", merge_bytes,
+                          full_df[list(gathered)].memory_usage(deep=True, index=False).sum())
+    else:
+        full_df = full_df.merge(census_df[['cfips'] + list(census_columns)], on='cfips', how='left')
     
-    # 3. Rolling Features
-    full_df = create_rolling_features(full_df)
+    # 2-3. Lag and Rolling Features (one vectorized pass, columns added without copying the frame)
+    panel_features = compute_panel_features(full_df)
+    for col in panel_features.columns:
+        full_df[col] = panel_features[col].to_numpy()
     
     # 4. Extract Date Features
     full_df['year'] = full_df['first_day_of_month'].dt.year
     full_df['month'] = full_df['first_day_of_month'].dt.month
     
+    if memory_optimized:
+        before = memory_profile(full_df)
+        optimize_dtypes(full_df)
+        log_memory_profiles("Feature frame dtypes", before, memory_profile(full_df))
+    
     # Split back
     train_fe = full_df[full_df['is_train'] == 1].drop(columns=['is_train'])
     test_fe = full_df[full_df['is_train'] == 0].drop(columns=['is_train'])
@@ -75,3 +187,46 @@ def feature_engineering_pipeline(train_df, test_df, census_df):
     
     logger.info("Feature engineering completed.")
     return train_fe, test_fe
+
+@timed('features_chunked')
+def feature_engineering_chunked(train_chunks, test_df, census_df, **kwargs):
+    """
+    Feature engineering over cfips-aligned train chunks (see preprocessing.iter_clean_chunks);
+    expects at least one chunk.
+    Each chunk is joined with the test rows of the same counties and run through
+    feature_engineering_pipeline; lag and rolling features are per county, so the result
+    matches processing the whole panel at once.
+    Returns train_fe, test_fe and the (cfips, first_day_of_month, microbusiness_density)
+    history of every train row, which the forecast and feature store need.
+    kwargs are passed to feature_engineering_pipeline (memory_optimized, census_columns).
+    """
+    test_by_cfips = test_df.groupby('cfips').indices
+    used_test = []
+    train_parts, test_parts, history_parts = [], [], []
+    
+    for chunk in train_chunks:
+        rows = [test_by_cfips[c] for c in chunk['cfips'].unique() if c in test_by_cfips]
+        idx = np.concatenate(rows) if rows else np.empty(0, dtype=int)
+        used_test.append(idx)
+        history_parts.append(chunk[['cfips', 'first_day_of_month', 'microbusiness_density']])
+        
+        train_fe, test_fe = feature_engineering_pipeline(chunk, test_df.iloc[idx].copy(), census_df, **kwargs)
+        train_parts.append(train_fe)
+        test_parts.append(test_fe)
+    
+    # Test counties that never appear in train still get their (NaN-lag) features
+    leftover = np.setdiff1d(np.arange(len(test_df)), np.concatenate(used_test))
+    if len(leftover):
+        empty_train = history_parts[-1].iloc[:0].copy()
+        _, test_fe = feature_engineering_pipeline(empty_train, test_df.iloc[leftover].copy(), census_df, **kwargs)
+        test_parts.append(test_fe)
+    
+    train_fe = pd.concat(train_parts, ignore_index=True)
+    test_fe = pd.concat(test_parts, ignore_index=True)
+    if kwargs.get('memory_optimized'):
+        # Per-chunk categories differ, so concat fell back to strings; encode once more
+        optimize_dtypes(train_fe)
+        optimize_dtypes(test_fe)
+    
+    logger.info(f"Chunked feature engineering completed over {len(train_parts)} chunks.")
+    return train_fe, test_fe, pd.concat(history_parts, ignore_index=True)
@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+from .utils import setup_logger
+
+logger = setup_logger("feature_store")
+
+class LagFeatureStore:
+    def __init__(self, lags=(1, 2, 3, 6, 12), windows=(3,)):
+        """
+        Incremental state for the mbd_lag_* and mbd_roll_mean_* features.
+        Keeps, per cfips, a ring buffer of the last max(lags, windows) densities, so
+        appending one month costs O(counties) and featurizing it O(counties x window)
+        instead of recomputing the whole history.
+        Features equal compute_panel_features exactly: lags are counted in rows per county,
+        and a rolling mean is summed directly from the buffered window (oldest value first,
+        no running sums that accumulate rounding error), NaN unless the whole window is observed.
+        """
+        self.lags = tuple(lags)
+        self.windows = tuple(windows)
+        self.depth = max(self.lags + self.windows)
+        self.cfips = np.empty(0, dtype=np.int64)
+        self.buffer = np.empty((0, self.depth))
+        self.head = np.empty(0, dtype=np.int64)          # next write slot per county
+        self.last_month = None
+
+    def _locate(self, cfips):
+        """
+        Row index of every cfips in the state arrays, adding empty state for new counties.
+        """
+        cfips = np.asarray(cfips, dtype=np.int64)
+        idx = pd.Index(self.cfips).get_indexer(cfips)
+        new = np.unique(cfips[idx < 0])
+        if len(new):
+            n = len(new)
+            self.cfips = np.concatenate([self.cfips, new])
+            self.buffer = np.vstack([self.buffer, np.full((n, self.depth), np.nan)])
+            self.head = np.concatenate([self.head, np.zeros(n, dtype=np.int64)])
+            idx = pd.Index(self.cfips).get_indexer(cfips)
+        return idx
+
+    def _lag(self, idx, k):
+        return self.buffer[idx, (self.head[idx] - k) % self.depth]
+
+    def features(self, cfips):
+        """
+        Lag and rolling features for the next row of each given county, from the current state.
+        """
+        idx = self._locate(cfips)
+        out = {'cfips': np.asarray(cfips)}
+        for lag in self.lags:
+            out[f'mbd_lag_{lag}'] = self._lag(idx, lag)
+        for window in self.windows:
+            # (counties, window) block of the last `window` values, oldest first; NaN propagates
+            slots = (self.head[idx, None] - np.arange(window, 0, -1)) % self.depth
+            out[f'mbd_roll_mean_{window}'] = self.buffer[idx[:, None], slots].mean(axis=1)
+        return pd.DataFrame(out)
+
+    def update(self, month_df):
+        """
+        Pushes one month of observed densities (one row per cfips) into the state.
+        """
+        month = pd.Timestamp(month_df['first_day_of_month'].iloc[0])
+        if self.last_month is not None and month <= self.last_month:
+            raise ValueError(f"Month {month.date()} is not after the last stored month {self.last_month.date()}.")
+
+        idx = self._locate(month_df['cfips'].to_numpy())
+        values = month_df['microbusiness_density'].to_numpy(dtype=float)
+        self.buffer[idx, self.head[idx]] = values
+        self.head[idx] = (self.head[idx] + 1) % self.depth
+        self.last_month = month
+
+    def append(self, month_df):
+        """
+        Returns the features for one new month's rows, then stores the month's densities.
+        Rows without microbusiness_density (e.g. test months) are featurized but not stored.
+        """
+        features = self.features(month_df['cfips'].to_numpy())
+        features.index = month_df.index
+        if 'microbusiness_density' in month_df.columns and month_df['microbusiness_density'].notna().any():
+            self.update(month_df)
+        return features
+
+    def fit(self, panel):
+        """
+        Pushes the months of a historical panel into the state, one month at a time.
+        Months up to last_month are already stored and skipped, so a loaded store is
+        brought up to date by fitting it on the full history again.
+        """
+        if self.last_month is not None:
+            panel = panel[panel['first_day_of_month'] > self.last_month]
+        months = 0
+        for _, month_df in panel.sort_values(['first_day_of_month', 'cfips']).groupby('first_day_of_month', sort=True):
+            self.update(month_df)
+            months += 1
+        logger.info(f"Feature store: {months} months added for {len(self.cfips)} counties, "
+                    f"up to {self.last_month.date() if self.last_month is not None else None}.")
+        return self
+
+    def save(self, path):
+        np.savez(path, lags=self.lags, windows=self.windows, cfips=self.cfips, buffer=self.buffer,
+                 head=self.head,
+                 last_month=np.datetime64(self.last_month) if self.last_month is not None else np.datetime64('NaT'))
+        logger.info(f"Feature store saved to {path}")
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as state:
+            store = cls(lags=tuple(state['lags'].tolist()), windows=tuple(state['windows'].tolist()))
+            store.cfips = state['cfips']
+            store.buffer = state['buffer']
+            store.head = state['head']
+            last_month = state['last_month'][()]
+            store.last_month = None if np.isnat(last_month) else pd.Timestamp(last_month)
+        logger.info(f"Feature store loaded from {path}")
+        return store
@@ -0,0 +1,225 @@
+"""
+Local HTTP inference service for registered models (stdlib asyncio only, fully offline).
+
+    python -m src.inference_server --registry models --name rf --port 8080
+
+POST /predict with {"rows": [[...], ...]} (values in manifest feature order) or
+{"instances": [{"feature": value, ...}, ...]}, plus "cfips" for sharded models;
+returns {"predictions": [...]}. GET /health returns the model manifest.
+"""
+import argparse
+import asyncio
+import json
+import numpy as np
+import pandas as pd
+from .model_registry import ModelRegistry
+from .utils import setup_logger
+
+logger = setup_logger("inference_server")
+
+class MicroBatcher:
+    def __init__(self, model, feature_names, max_batch_rows=4096, max_wait_ms=2.0):
+        """
+        Collects concurrent requests and runs them as one predict call: a batch closes
+        when it reaches max_batch_rows or max_wait_ms after its first request.
+        predict runs in a worker thread so the event loop keeps accepting requests.
+        """
+        self.model = model
+        self.feature_names = feature_names
+        self.max_batch_rows = max_batch_rows
+        self.max_wait = max_wait_ms / 1000.0
+        self.queue = asyncio.Queue()
+        self.batches = 0
+        self.rows = 0
+
+    def parse_request(self, payload):
+        """
+        Validated (X, cfips) for one request; raises ValueError for malformed payloads
+        before the request can join a batch.
+        """
+        if not isinstance(payload, dict):
+            raise ValueError("Request body must be a JSON object.")
+        n_features = len(self.feature_names)
+        if 'rows' in payload:
+            X = np.asarray(payload['rows'], dtype=np.float32)
+            if X.ndim != 2 or X.shape[1] != n_features:
+                raise ValueError(f"'rows' must be a list of rows with {n_features} values each, got shape {X.shape}.")
+        elif 'instances' in payload:
+            instances = payload['instances']
+            if not isinstance(instances, list) or not all(isinstance(row, dict) for row in instances):
+                raise ValueError("'instances' must be a list of {feature: value} objects.")
+            X = np.array([[row.get(f, np.nan) for f in self.feature_names] for row in instances],
+                         dtype=np.float32).reshape(-1, n_features)
+        else:
+            raise ValueError("Request needs 'rows' or 'instances'.")
+        if len(X) == 0:
+            raise ValueError("Request has no rows.")
+
+        if getattr(self.model, 'routes_by_cfips', False):
+            if 'cfips' not in payload:
+                raise ValueError("This model is sharded by county: 'cfips' (one per row) is required.")
+            cfips = np.asarray(payload['cfips'])
+            if cfips.shape != (len(X),) or not np.issubdtype(cfips.dtype, np.integer):
+                raise ValueError(f"'cfips' must be a list of {len(X)} integers, got shape {cfips.shape}.")
+        else:
+            cfips = np.zeros(len(X), dtype=np.int64)
+        return X, cfips.astype(np.int64)
+
+    async def predict(self, payload):
+        return await self.submit(*self.parse_request(payload))
+
+    async def submit(self, X, cfips):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((X, cfips, future))
+        return await future
+
+    def _predict_batch(self, X, cfips):
+        if getattr(self.model, 'routes_by_cfips', False):
+            return self.model.predict(X, cfips)
+        # Named columns, as the model was fitted on a DataFrame
+        return self.model.predict(pd.DataFrame(X, columns=self.feature_names))
+
+    async def _predict_items(self, loop, batch):
+        """
+        Predicts a batch in one call. If that fails, each request is retried on its own,
+        so a request that breaks the model only fails itself.
+        """
+        X = np.vstack([item[0] for item in batch])
+        cfips = np.concatenate([item[1] for item in batch])
+        try:
+            preds = await loop.run_in_executor(None, self._predict_batch, X, cfips)
+        except Exception as err:
+            if len(batch) == 1:
+                batch[0][2].set_exception(err)
+                return
+            logger.warning(f"Batch of {len(batch)} requests failed ({err!r}); retrying them one by one.")
+            for item in batch:
+                await self._predict_items(loop, [item])
+            return
+        self.batches += 1
+        self.rows += len(X)
+        start = 0
+        for item_X, _, future in batch:
+            future.set_result(np.asarray(preds[start:start + len(item_X)], dtype=float).tolist())
+            start += len(item_X)
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            n_rows = len(batch[0][0])
+            deadline = loop.time() + self.max_wait
+            while n_rows < self.max_batch_rows:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(item)
+                n_rows += len(item[0])
+            await self._predict_items(loop, batch)
+
+async def _read_request(reader):
+    """
+    Minimal HTTP/1.1 request parser: returns (method, path, headers, body) or None on EOF.
+    """
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    method, path, _ = request_line.decode('latin-1').split(' ', 2)
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        key, _, value = line.decode('latin-1').partition(':')
+        headers[key.strip().lower()] = value.strip()
+    body = await reader.readexactly(int(headers.get('content-length', 0)))
+    return method, path, headers, body
+
+def _response(status, payload):
+    body = json.dumps(payload).encode()
+    reason = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 500: 'Internal Server Error'}[status]
+    return (f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: keep-alive\r\n\r\n").encode() + body
+
+class InferenceServer:
+    def __init__(self, model, manifest, host='127.0.0.1', port=8080, max_batch_rows=4096, max_wait_ms=2.0):
+        """
+        Keeps one model warm and serves it over keep-alive HTTP connections.
+        """
+        self.manifest = manifest
+        self.host = host
+        self.port = port
+        self.batcher = MicroBatcher(model, manifest['feature_names'], max_batch_rows, max_wait_ms)
+        self.server = None
+
+    @classmethod
+    def from_registry(cls, root, name, version=None, **kwargs):
+        model, manifest = ModelRegistry(root).load(name, version)
+        return cls(model, manifest, **kwargs)
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                method, path, _, body = request
+                if method == 'GET' and path == '/health':
+                    response = _response(200, {'status': 'ok', 'model': self.manifest,
+                                               'batches': self.batcher.batches, 'rows': self.batcher.rows})
+                elif method == 'POST' and path == '/predict':
+                    try:
+                        X, cfips = self.batcher.parse_request(json.loads(body))
+                    except (ValueError, KeyError, TypeError) as err:
+                        # Malformed request (bad JSON, shape or cfips): rejected before batching
+                        response = _response(400, {'error': str(err)})
+                    else:
+                        try:
+                            predictions = await self.batcher.submit(X, cfips)
+                            response = _response(200, {'predictions': predictions})
+                        except Exception as err:
+                            logger.exception("Prediction failed")
+                            response = _response(500, {'error': f"{type(err).__name__}: {err}"})
+                else:
+                    response = _response(404, {'error': f"No route for {method} {path}"})
+                writer.write(response)
+                await writer.drain()
+        except (ConnectionResetError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        self._batch_task = asyncio.create_task(self.batcher.run())
+        logger.info(f"Serving {self.manifest['name']} v{self.manifest['version']} on http://{self.host}:{self.port}")
+        return self
+
+    async def serve_forever(self):
+        await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+        self._batch_task.cancel()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--registry', type=str, default='models')
+    parser.add_argument('--name', type=str, required=True)
+    parser.add_argument('--version', type=int, default=None)
+    parser.add_argument('--host', type=str, default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--max-batch-rows', type=int, default=4096)
+    parser.add_argument('--max-wait-ms', type=float, default=2.0)
+    args = parser.parse_args()
+    server = InferenceServer.from_registry(args.registry, args.name, args.version, host=args.host, port=args.port,
+                                           max_batch_rows=args.max_batch_rows, max_wait_ms=args.max_wait_ms)
+    asyncio.run(server.serve_forever())
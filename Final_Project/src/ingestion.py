@@ -0,0 +1,144 @@
+import hashlib
+import importlib.util
+import json
+import os
+import threading
+import pandas as pd
+from .utils import setup_logger
+
+logger = setup_logger("ingestion")
+
+# Parquet needs pyarrow (or fastparquet); without it the cache falls back to pickle
+PARQUET_AVAILABLE = any(importlib.util.find_spec(m) is not None for m in ('pyarrow', 'fastparquet'))
+
+# Explicit compact dtypes for the Kaggle files; prefixes cover the per-year census columns
+COLUMN_DTYPES = {
+    'cfips': 'int32',
+    'county': 'category',
+    'state': 'category',
+    'microbusiness_density': 'float64',
+    'active': 'int32',
+}
+PREFIX_DTYPES = {
+    'pct_': 'float32',
+    'median_hh_inc_': 'float32',  # mixes int and float text across years in census_starter.csv
+}
+DATE_COLUMNS = ['first_day_of_month']
+
+# Serializes the read-modify-write of digests.json between threads (e.g. parallel DAG stages)
+_index_lock = threading.Lock()
+
+def _atomic_write(path, write):
+    """
+    Calls write(tmp_path), then renames the finished file over `path`, so readers never
+    see a half-written file. The temporary name is unique per process and thread.
+    """
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def schema_for(columns):
+    """
+    dtype mapping for the given CSV header; unknown columns are left to pandas.
+    """
+    schema = {}
+    for col in columns:
+        if col in COLUMN_DTYPES:
+            schema[col] = COLUMN_DTYPES[col]
+        else:
+            for prefix, dtype in PREFIX_DTYPES.items():
+                if col.startswith(prefix):
+                    schema[col] = dtype
+                    break
+    return schema
+
+def file_digest(path, cache_dir):
+    """
+    sha256 of the file contents (first 16 hex chars).
+    Digests are remembered in cache_dir/digests.json by (size, mtime), so an
+    unchanged file is not re-read just to hash it.
+    """
+    stat = os.stat(path)
+    key = os.path.abspath(path)
+    index_path = os.path.join(cache_dir, 'digests.json')
+
+    def read_index():
+        try:
+            with open(index_path) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    entry = read_index().get(key)
+    if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+        return entry['digest']
+
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            sha.update(block)
+    digest = sha.hexdigest()[:16]
+
+    def write_index(tmp_path):
+        with open(tmp_path, 'w') as f:
+            json.dump(index, f)
+
+    with _index_lock:
+        # Re-read under the lock so entries added by other threads are kept
+        index = read_index()
+        index[key] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'digest': digest}
+        _atomic_write(index_path, write_index)
+    return digest
+
+def read_csv_typed(path, columns=None, **kwargs):
+    """
+    read_csv with the explicit schema and date parsing, reading only `columns` if given.
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    usecols = [c for c in header if columns is None or c in columns]
+    return pd.read_csv(path, usecols=usecols, dtype=schema_for(usecols),
+                       parse_dates=[c for c in DATE_COLUMNS if c in usecols], **kwargs)
+
+def load_table(path, columns=None, cache_dir=None):
+    """
+    Loads a CSV through a columnar cache keyed by the file's content hash.
+    The first load parses the CSV with the explicit schema and writes
+    cache_dir/<name>-<digest>.parquet; later loads read that file instead and only
+    the requested `columns` (column projection). A changed CSV gets a new digest
+    and replaces its stale cache file. Cache files are written to a temporary name
+    and renamed into place, so concurrent loads of the same file are safe.
+    """
+    cache_dir = cache_dir or os.path.join(os.path.dirname(path), '.cache')
+    os.makedirs(cache_dir, exist_ok=True)
+    name = os.path.splitext(os.path.basename(path))[0]
+    suffix = '.parquet' if PARQUET_AVAILABLE else '.pkl'
+    cache_path = os.path.join(cache_dir, f"{name}-{file_digest(path, cache_dir)}{suffix}")
+
+    if os.path.exists(cache_path):
+        if PARQUET_AVAILABLE:
+            df = pd.read_parquet(cache_path, columns=columns)
+        else:
+            df = pd.read_pickle(cache_path)
+            df = df[columns] if columns is not None else df
+        logger.info(f"Loaded {name} from cache {cache_path}. Shape: {df.shape}")
+        return df
+
+    df = read_csv_typed(path)
+    if PARQUET_AVAILABLE:
+        _atomic_write(cache_path, lambda tmp_path: df.to_parquet(tmp_path, index=False))
+    else:
+        _atomic_write(cache_path, lambda tmp_path: df.to_pickle(tmp_path, compression=None))
+    # Only cache files of older versions of this CSV are stale, never the current one
+    for stale in os.listdir(cache_dir):
+        stale_path = os.path.join(cache_dir, stale)
+        if stale.startswith(f"{name}-") and stale.endswith(('.parquet', '.pkl')) and stale_path != cache_path:
+            try:
+                os.remove(stale_path)
+            except FileNotFoundError:
+                pass  # removed by a concurrent load
+    logger.info(f"Parsed {path} and cached it to {cache_path}. Shape: {df.shape}")
+    return df[columns] if columns is not None else df
@@ -0,0 +1,102 @@
+import hashlib
+import json
+import os
+import platform
+from datetime import datetime, timezone
+import joblib
+import sklearn
+import xgboost as xgb
+from .utils import setup_logger
+
+logger = setup_logger("model_registry")
+
+class ModelRegistry:
+    def __init__(self, root='models'):
+        """
+        Versioned on-disk store of trained models: root/<name>/v0001/ holds model.joblib
+        and manifest.json (model type, feature list, library versions, checksum, metadata).
+        Uncompressed artifacts (compress=0, the default) can be loaded memory-mapped, so the
+        large numpy arrays inside e.g. RandomForest trees are paged in lazily and shared
+        between processes serving the same model; compress=1..9 trades that for smaller files.
+        """
+        self.root = root
+
+    def _reserved(self, name):
+        path = os.path.join(self.root, name)
+        if not os.path.isdir(path):
+            return []
+        return sorted(int(v[1:]) for v in os.listdir(path) if v.startswith('v') and v[1:].isdigit())
+
+    def versions(self, name):
+        """
+        Complete versions of `name` (those whose manifest has been written), oldest first.
+        """
+        return [v for v in self._reserved(name)
+                if os.path.exists(os.path.join(self._version_path(name, v), 'manifest.json'))]
+
+    def _version_path(self, name, version):
+        return os.path.join(self.root, name, f"v{version:04d}")
+
+    def save(self, model, name, feature_names=None, metadata=None, compress=0):
+        """
+        Saves a new version of `name` and returns its version number.
+        model: ModelTrainer, ShardedTrainer or any picklable estimator.
+        The version directory is reserved with an exclusive create, so concurrent saves
+        get distinct versions; the manifest is written last, and versions() only lists
+        versions that have one.
+        """
+        os.makedirs(os.path.join(self.root, name), exist_ok=True)
+        while True:
+            version = (self._reserved(name) or [0])[-1] + 1
+            path = self._version_path(name, version)
+            try:
+                os.makedirs(path, exist_ok=False)
+                break
+            except FileExistsError:
+                continue  # another writer took this version first
+
+        artifact = os.path.join(path, 'model.joblib')
+        joblib.dump(model, artifact, compress=compress)
+        sha = hashlib.sha256()
+        with open(artifact, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                sha.update(block)
+
+        manifest = {
+            'name': name,
+            'version': version,
+            'model_type': getattr(model, 'model_type', type(model).__name__),
+            'feature_names': list(feature_names if feature_names is not None else getattr(model, 'feature_names', None) or []),
+            'compress': compress,
+            'sha256': sha.hexdigest(),
+            'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'sklearn': sklearn.__version__,
+            'xgboost': xgb.__version__,
+            'metadata': metadata or {},
+        }
+        tmp_manifest = os.path.join(path, 'manifest.json.tmp')
+        with open(tmp_manifest, 'w') as f:
+            json.dump(manifest, f, indent=2, default=str)
+        os.replace(tmp_manifest, os.path.join(path, 'manifest.json'))
+        logger.info(f"Registered {name} v{version} at {path}")
+        return version
+
+    def manifest(self, name, version=None):
+        version = version or (self.versions(name) or [None])[-1]
+        if version is None:
+            raise ValueError(f"No registered versions of model '{name}' in {self.root}.")
+        with open(os.path.join(self._version_path(name, version), 'manifest.json')) as f:
+            return json.load(f)
+
+    def load(self, name, version=None, mmap=True):
+        """
+        Loads a model version (default: latest). Returns (model, manifest).
+        Uncompressed artifacts are memory-mapped read-only when mmap=True.
+        """
+        manifest = self.manifest(name, version)
+        artifact = os.path.join(self._version_path(name, manifest['version']), 'model.joblib')
+        mmap_mode = 'r' if mmap and not manifest['compress'] else None
+        model = joblib.load(artifact, mmap_mode=mmap_mode)
+        logger.info(f"Loaded {name} v{manifest['version']} ({manifest['model_type']}, mmap={mmap_mode is not None})")
+        return model, manifest
@@ -1,46 +1,204 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
 import numpy as np
 import pandas as pd
 from sklearn.ensemble import RandomForestRegressor
 import xgboost as xgb
 from .utils import setup_logger, set_seed
+from .profiling import timed
 
 logger = setup_logger("model_training")
 
+# High-throughput XGBoost path: native API, histogram trees, early stopping
+XGB_HIST_DEFAULTS = {
+    'objective': 'reg:squarederror',
+    'tree_method': 'hist',
+    'max_depth': 6,
+    'eta': 0.1,
+    'max_bin': 256,
+    'seed': 42,
+    'num_boost_round': 1000,
+    'early_stopping_rounds': 20,
+    'validation_fraction': 0.1,  # share of the latest months (or rows) held out for early stopping
+    'refit_full': True,  # after early stopping, refit best_iteration + 1 rounds on all rows (incl. validation)
+}
+
+def array_digest(*arrays, **params):
+    """
+    sha256 (first 16 hex chars) of the arrays' contents, shapes and dtypes plus params.
+    """
+    sha = hashlib.sha256()
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        sha.update(f"{array.dtype}{array.shape}".encode())
+        sha.update(array.data)
+    sha.update(repr(sorted(params.items())).encode())
+    return sha.hexdigest()[:16]
+
+class DMatrixCache:
+    def __init__(self, max_entries=6):
+        """
+        Process-wide LRU store of QuantileDMatrix objects keyed by a content digest of
+        their inputs, so every trainer fitting the same rows (refits, CV folds run in
+        the same worker, shards, benchmarks) reuses the quantile sketch.
+        Holds only the matrices, never the source frames; the least recently used entry
+        is evicted past max_entries, and clear() empties it.
+        """
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            matrix = self.entries.get(key)
+            if matrix is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return matrix
+
+    def put(self, key, matrix):
+        with self.lock:
+            self.entries[key] = matrix
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+DMATRIX_CACHE = DMatrixCache()
+
 class ModelTrainer:
-    def __init__(self, model_type='rf', params=None):
+    def __init__(self, model_type='rf', params=None, nthread=None):
+        """
+        model_type: 'rf', 'xgb' or 'xgb_hist' (native xgb.train with histogram trees,
+        float32 QuantileDMatrix inputs and early stopping on the latest months).
+        nthread: threads per model (RF n_jobs / XGBoost nthread); None keeps the defaults.
+        """
         self.model_type = model_type
         self.params = params if params else {}
+        self.nthread = nthread
         self.model = None
+        self.feature_names = None
+        self.best_iteration = None
         set_seed(42)  # Ensure reproducibility per run attempt
 
-    def train(self, X_train, y_train):
+    @timed('train')
+    def train(self, X_train, y_train, dates=None):
         """
         Trains the selected model.
+        dates (first_day_of_month per row) lets 'xgb_hist' hold out the latest months
+        for early stopping; without it the last rows are held out, so they should be time-ordered.
         """
         logger.info(f"Training {self.model_type} model...")
+        if isinstance(X_train, pd.DataFrame):
+            self.feature_names = list(X_train.columns)
+        thread_params = {'n_jobs': self.nthread} if self.nthread else {}
         
         if self.model_type == 'rf':
             # Default params for RF if not provided
             default_params = {'n_estimators': 100, 'max_depth': 10, 'n_jobs': -1, 'random_state': 42}
-            final_params = {**default_params, **self.params}
+            final_params = {**default_params, **self.params, **thread_params}
             self.model = RandomForestRegressor(**final_params)
             self.model.fit(X_train, y_train)
             
         elif self.model_type == 'xgb':
             # Default params for XGBoost
             default_params = {'n_estimators': 100, 'max_depth': 6, 'learning_rate': 0.1, 'random_state': 42}
-            final_params = {**default_params, **self.params}
+            final_params = {**default_params, **self.params, **thread_params}
             self.model = xgb.XGBRegressor(**final_params)
             self.model.fit(X_train, y_train)
             
+        elif self.model_type == 'xgb_hist':
+            self._train_xgb_hist(X_train, y_train, dates)
+            
         else:
             raise ValueError(f"Unknown model type: {self.model_type}")
             
         logger.info("Training completed.")
 
+    def _hist_params(self):
+        params = {**XGB_HIST_DEFAULTS, **self.params}
+        # n_jobs (as set by cross-validation) means the same as nthread here
+        nthread = self.nthread or params.pop('n_jobs', None) or params.get('nthread') or os.cpu_count()
+        params.pop('n_jobs', None)
+        params['nthread'] = nthread
+        return params
+
+    def _quantile_matrix(self, values, target, max_bin, nthread, ref=None, ref_key=None):
+        """
+        QuantileDMatrix for (values, target) from DMATRIX_CACHE, built on a miss.
+        A matrix sketched against `ref` is keyed on the reference's key as well.
+        """
+        key = array_digest(values, target, max_bin=max_bin, ref=ref_key, features=tuple(self.feature_names or ()))
+        matrix = DMATRIX_CACHE.get(key)
+        if matrix is None:
+            matrix = xgb.QuantileDMatrix(values, target, max_bin=max_bin, nthread=nthread, ref=ref,
+                                         feature_names=self.feature_names)
+            DMATRIX_CACHE.put(key, matrix)
+        return matrix, key
+
+    def _hist_matrices(self, X, y, dates, validation_fraction, max_bin, nthread):
+        """
+        float32 QuantileDMatrix for the training rows and the time-ordered validation slice
+        (None without one), plus a thunk building the matrix of all rows for the refit.
+        Matrices come from DMATRIX_CACHE, so refitting the same data (other params,
+        other thread counts, another trainer) skips the quantile sketch.
+        """
+        values = np.asarray(X, dtype=np.float32)
+        target = np.asarray(y, dtype=np.float32)
+        if dates is not None:
+            months = np.sort(np.unique(np.asarray(dates)))
+            n_valid = max(1, int(np.ceil(validation_fraction * len(months)))) if validation_fraction else 0
+            valid = np.asarray(dates) >= months[-n_valid] if 0 < n_valid < len(months) else np.zeros(len(values), bool)
+        else:
+            n_valid = int(len(values) * validation_fraction)
+            valid = np.arange(len(values)) >= len(values) - n_valid
+        
+        dtrain, train_key = self._quantile_matrix(values[~valid], target[~valid], max_bin, nthread)
+        dvalid = None
+        if valid.any():
+            dvalid, _ = self._quantile_matrix(values[valid], target[valid], max_bin, nthread,
+                                              ref=dtrain, ref_key=train_key)
+        return dtrain, dvalid, lambda: self._quantile_matrix(values, target, max_bin, nthread)[0]
+
+    def _train_xgb_hist(self, X_train, y_train, dates):
+        params = self._hist_params()
+        num_boost_round = params.pop('num_boost_round')
+        early_stopping_rounds = params.pop('early_stopping_rounds')
+        validation_fraction = params.pop('validation_fraction')
+        refit_full = params.pop('refit_full')
+        
+        dtrain, dvalid, full_matrix = self._hist_matrices(X_train, y_train, dates, validation_fraction,
+                                                          params['max_bin'], params['nthread'])
+        evals = [(dvalid, 'valid')] if dvalid is not None else []
+        self.model = xgb.train(params, dtrain, num_boost_round=num_boost_round, evals=evals,
+                               early_stopping_rounds=early_stopping_rounds if evals else None,
+                               verbose_eval=False)
+        self.best_iteration = self.model.best_iteration if evals else num_boost_round - 1
+        logger.info(f"xgb_hist: {self.best_iteration + 1} trees kept (nthread={params['nthread']}, "
+                    f"{dtrain.num_row()} train / {dvalid.num_row() if dvalid is not None else 0} validation rows).")
+        
+        if refit_full and evals:
+            # The validation months are the most recent data: refit on every row with the
+            # number of rounds early stopping chose, so the final model has seen them too
+            self.model = xgb.train(params, full_matrix(), num_boost_round=self.best_iteration + 1, verbose_eval=False)
+            logger.info(f"xgb_hist: refit {self.best_iteration + 1} rounds on all {len(y_train)} rows.")
+
+    @timed('predict')
     def predict(self, X):
         if not self.model:
             raise ValueError("Model has not been trained yet.")
+        if self.model_type == 'xgb_hist':
+            return self.model.inplace_predict(np.asarray(X, dtype=np.float32),
+                                              iteration_range=(0, self.best_iteration + 1))
         return self.model.predict(X)
 
     def get_feature_importance(self, feature_names):
@@ -48,6 +206,11 @@ class ModelTrainer:
             importances = self.model.feature_importances_
         elif self.model_type == 'xgb':
             importances = self.model.feature_importances_
+        elif self.model_type == 'xgb_hist':
+            gains = self.model.get_score(importance_type='gain')
+            keys = self.feature_names or [f'f{i}' for i in range(len(feature_names))]
+            importances = np.array([gains.get(k, 0.0) for k in keys])
+            importances = importances / importances.sum() if importances.sum() else importances
         else:
             return None
         
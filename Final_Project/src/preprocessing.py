@@ -2,37 +2,98 @@ import pandas as pd
 import numpy as np
 import os
 from .utils import setup_logger
+from .profiling import timed
+from .ingestion import load_table, schema_for, DATE_COLUMNS
 
 logger = setup_logger("preprocessing")
 
-def load_data(data_path: str):
+@timed('load')
+def load_data(data_path: str, census_columns=None, include_train=True):
     """
     Loads raw datasets: train.csv, test.csv, census_starter.csv.
+    Files go through the typed columnar cache in data_path/.cache (see ingestion.load_table);
+    census_columns limits the census table to the columns a caller needs.
+    include_train=False skips train.csv, for callers that stream it with iter_clean_chunks.
     """
     train, test, census = None, None, None
     
-    # train.csv and test.csv do not exist in the current environment
-    # explicitly setting them to None as requested
+    names = ['train', 'test'] if include_train else ['test']
+    panels = {}
+    for name in names:
+        path = os.path.join(data_path, f'{name}.csv')
+        if os.path.exists(path):
+            panels[name] = load_table(path)
+        else:
+            logger.warning(f"{name}.csv not found.")
+    train, test = panels.get('train'), panels.get('test')
     
     try:
-        census = pd.read_csv(os.path.join(data_path, 'census_starter.csv'))
+        census = load_table(os.path.join(data_path, 'census_starter.csv'), columns=census_columns)
     except FileNotFoundError:
         logger.warning("census_starter.csv not found.")
     
-    logger.info(f"Census data loaded. Train/Test set to None.")
+    logger.info(f"Data loaded. Train: {None if train is None else train.shape}, "
+                f"Test: {None if test is None else test.shape}, Census: {None if census is None else census.shape}")
     
     return train, test, census
 
-def clean_data(df: pd.DataFrame) -> pd.DataFrame:
+def iter_panel_chunks(path: str, chunk_rows: int = 500_000):
+    """
+    Streams a panel CSV (train.csv layout) in cfips-aligned chunks.
+    The file is read `chunk_rows` rows at a time; the rows of the last cfips in each
+    block are held back and prepended to the next block, so a county is never split
+    across chunks. The file must be grouped by cfips (as the Kaggle files are);
+    a county that reappears after its block ended raises ValueError.
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    # Categories would differ per chunk, so text columns stay plain strings here
+    dtypes = {c: ('str' if t == 'category' else t) for c, t in schema_for(header).items()}
+    reader = pd.read_csv(path, dtype=dtypes, parse_dates=[c for c in DATE_COLUMNS if c in header],
+                         chunksize=chunk_rows)
+    
+    finished = set()
+    def checked(chunk):
+        counties = set(chunk['cfips'].unique())
+        if counties & finished:
+            raise ValueError(f"{path} is not grouped by cfips; cannot stream it in aligned chunks.")
+        finished.update(counties)
+        return chunk
+    
+    carry = None
+    for block in reader:
+        if carry is not None:
+            block = pd.concat([carry, block], ignore_index=True)
+        is_last = (block['cfips'] == block['cfips'].iloc[-1]).to_numpy()
+        carry, chunk = block[is_last], block[~is_last]
+        if len(chunk):
+            yield checked(chunk)
+    if carry is not None and len(carry):
+        yield checked(carry)
+
+def iter_clean_chunks(path: str, chunk_rows: int = 500_000):
+    """
+    Cleans a panel chunk by chunk (see iter_panel_chunks): date parsing, sorting and
+    per-county forward fill happen inside each chunk, so the raw panel is never held whole.
+    """
+    n_rows = 0
+    for chunk in iter_panel_chunks(path, chunk_rows):
+        n_rows += len(chunk)
+        yield clean_data(chunk, copy=False)
+    logger.info(f"Streamed {n_rows} rows from {path}.")
+
+@timed('clean')
+def clean_data(df: pd.DataFrame, copy: bool = True) -> pd.DataFrame:
     """
     Basic data cleaning pipeline:
     1. Convert dates
     2. Sort values
     3. Handle missing values (if any in critical columns)
+    copy=False modifies `df` in place (used for streamed chunks that nobody else holds).
     """
     if df is None:
         return None
-    df = df.copy()
+    if copy:
+        df = df.copy()
     
     # Convert date to datetime
     if 'first_day_of_month' in df.columns:
@@ -40,12 +101,60 @@ def clean_data(df: pd.DataFrame) -> pd.DataFrame:
         df = df.sort_values(by=['cfips', 'first_day_of_month']).reset_index(drop=True)
     
     # Imputation example (Microbusiness density shouldn't be null in train, but just in case)
+    # Forward fill within each county only, never across a county boundary
     if 'microbusiness_density' in df.columns:
-         df['microbusiness_density'] = df['microbusiness_density'].fillna(method='ffill')
+         df['microbusiness_density'] = df.groupby('cfips')['microbusiness_density'].ffill()
     
     logger.info("Data cleaning completed.")
     return df
 
+def optimize_dtypes(df: pd.DataFrame, categorical=('county', 'state'),
+                    keep=('microbusiness_density',)) -> pd.DataFrame:
+    """
+    Shrinks a frame column by column (no full-frame copy):
+    - integers go to the smallest integer dtype that holds them exactly,
+    - floats go to float32 when they fit its range (about 7 significant digits),
+    - `categorical` text columns become pandas categoricals.
+    Columns in `keep` (the target by default) are left untouched.
+    """
+    for col in df.columns:
+        if col in keep:
+            continue
+        series = df[col]
+        if col in categorical:
+            if not isinstance(series.dtype, pd.CategoricalDtype):
+                df[col] = series.astype('category')
+        elif pd.api.types.is_integer_dtype(series.dtype):
+            df[col] = pd.to_numeric(series, downcast='integer')
+        elif pd.api.types.is_float_dtype(series.dtype) and series.dtype != np.float32:
+            if not (series.abs() > np.finfo(np.float32).max).any():
+                df[col] = series.astype(np.float32)
+    return df
+
+def memory_profile(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per-column dtype and deep memory usage in bytes, largest first.
+    """
+    usage = df.memory_usage(deep=True, index=False)
+    return pd.DataFrame({'dtype': df.dtypes.astype(str), 'bytes': usage}).sort_values('bytes', ascending=False)
+
+def log_memory_change(label: str, before_bytes: int, after_bytes: int):
+    saved = 1 - after_bytes / before_bytes if before_bytes else 0.0
+    logger.info(f"{label}: {before_bytes / 1e6:.2f} MB -> {after_bytes / 1e6:.2f} MB ({saved:.0%} smaller)")
+
+def log_memory_profiles(label: str, before: pd.DataFrame, after: pd.DataFrame) -> pd.DataFrame:
+    """
+    Logs the total and the per-column before/after memory_profile of the columns whose
+    dtype changed, largest saving first; returns that table.
+    """
+    table = before.join(after, lsuffix='_before', rsuffix='_after', how='inner')
+    table['saved'] = table['bytes_before'] - table['bytes_after']
+    log_memory_change(label, before['bytes'].sum(), after['bytes'].sum())
+    changed = table[table['dtype_before'] != table['dtype_after']].sort_values('saved', ascending=False)
+    if len(changed):
+        logger.info(f"{label} per column:\n{changed.to_string()}")
+    return changed
+
 def preprocess_pipeline(data_path: str):
     """
     Orchestrates the loading and cleaning process.
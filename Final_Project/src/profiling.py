@@ -0,0 +1,27 @@
+"""
+Timing and memory instrumentation for the pipeline.
+
+    @timed('train')
+    def train(...): ...
+
+    with profile_stage('plot'): ...
+
+Both are no-ops unless a Profiler is active (`with activated(Profiler(...)):`), so
+instrumented functions cost one global lookup when nobody is measuring.
+
+The implementation lives in Workshop_4_Simulation/src/monitoring.py (see src.workshop),
+so both projects run the same profiler and write the same reports.
+"""
+from .workshop import workshop_module
+
+_monitoring = workshop_module('monitoring')
+
+PROFILE_MODES = _monitoring.PROFILE_MODES
+Profiler = _monitoring.Profiler
+current_rss_mb = _monitoring.current_rss_mb
+max_rss_mb = _monitoring.max_rss_mb
+active_profiler = _monitoring.active_profiler
+activated = _monitoring.activated
+profile_stage = _monitoring.profile_stage
+timed = _monitoring.timed
+call_profiled = _monitoring.call_profiled
@@ -0,0 +1,136 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.cluster import KMeans
+from .model_training import ModelTrainer
+from .utils import setup_logger
+from .profiling import timed
+
+logger = setup_logger("sharding")
+
+SHARD_KEYS = ('state', 'cluster')
+
+def cluster_keys(census, n_clusters=8, columns=None, seed=42):
+    """
+    KMeans cluster label per county from standardized census features
+    (missing values count as the column median). Returns a Series indexed by cfips.
+    """
+    columns = columns or [c for c in census.columns if c != 'cfips' and pd.api.types.is_numeric_dtype(census[c])]
+    values = census[columns].astype(float)
+    values = values.fillna(values.median())
+    values = ((values - values.mean()) / values.std(ddof=0).replace(0, 1)).fillna(0.0)
+    labels = KMeans(n_clusters=n_clusters, n_init=10, random_state=seed).fit_predict(values.to_numpy())
+    return pd.Series(labels, index=census['cfips'].to_numpy(), name='cluster')
+
+def shard_map(shard_key, panel=None, census=None, n_clusters=8):
+    """
+    cfips -> shard key Series: the county's state, or its census cluster.
+    """
+    if shard_key == 'state':
+        return panel.drop_duplicates('cfips').set_index('cfips')['state'].rename('state')
+    if shard_key == 'cluster':
+        return cluster_keys(census, n_clusters)
+    raise ValueError(f"Unknown shard key: {shard_key}. Choose from {SHARD_KEYS}.")
+
+def _train_shard(model_type, params, X, y, dates=None):
+    trainer = ModelTrainer(model_type=model_type, params=params)
+    trainer.train(X, y, dates=dates)
+    return trainer
+
+def predict_with(model, X, cfips):
+    """
+    Calls model.predict, passing the rows' cfips to models that route by county.
+    """
+    if getattr(model, 'routes_by_cfips', False):
+        return model.predict(X, cfips)
+    return model.predict(X)
+
+class ShardedTrainer:
+    routes_by_cfips = True
+
+    def __init__(self, model_type='rf', params=None, min_rows=100, max_workers=None):
+        """
+        One ModelTrainer per shard (e.g. per state or census cluster) plus a global
+        fallback model for counties in small or unseen shards.
+        Shards are trained concurrently in a process pool, one core per model
+        unless params sets n_jobs.
+        """
+        self.model_type = model_type
+        self.params = {'n_jobs': 1, **(params or {})}
+        self.min_rows = min_rows
+        self.max_workers = max_workers
+        self.shard_of = None
+        self.models = {}
+        self.fallback = None
+        self.feature_names = None
+
+    @timed('train_shards')
+    def train(self, X, y, cfips, shard_of, dates=None):
+        """
+        X, y: training rows; cfips: county of each row; shard_of: Series cfips -> shard key.
+        dates: optional first_day_of_month per row (early stopping slice for 'xgb_hist').
+        """
+        # String keys, so routing does not depend on the key dtype surviving a reindex
+        self.shard_of = shard_of.astype(str)
+        self.feature_names = list(X.columns) if isinstance(X, pd.DataFrame) else None
+        X = np.asarray(X, dtype=np.float32)
+        y = np.asarray(y, dtype=float)
+        dates = np.asarray(dates) if dates is not None else None
+        keys = self.shard_of.reindex(np.asarray(cfips)).to_numpy()
+
+        valid = pd.notna(keys)
+        shard_keys, codes = np.unique(keys[valid], return_inverse=True)
+        shard_keys = [str(key) for key in shard_keys]
+        counts = np.bincount(codes, minlength=len(shard_keys))
+        rows = np.flatnonzero(valid)
+        logger.info(f"Training {len(shard_keys)} {self.model_type} shards and a global fallback...")
+
+        with ProcessPoolExecutor(max_workers=self.max_workers or os.cpu_count()) as executor:
+            fallback = executor.submit(_train_shard, self.model_type, self.params, X, y, dates)
+            futures = {}
+            for code, key in enumerate(shard_keys):
+                if counts[code] < self.min_rows:
+                    continue
+                idx = rows[codes == code]
+                futures[key] = executor.submit(_train_shard, self.model_type, self.params, X[idx], y[idx],
+                                               dates[idx] if dates is not None else None)
+            self.models = {key: future.result() for key, future in futures.items()}
+            self.fallback = fallback.result()
+
+        logger.info(f"Trained {len(self.models)} shard models; "
+                    f"{len(shard_keys) - len(self.models)} small shards use the fallback.")
+        return self
+
+    @timed('predict_shards')
+    def predict(self, X, cfips):
+        """
+        Routes each row to its shard model. Rows are grouped by shard with one
+        stable sort, so every model predicts its rows in a single call.
+        """
+        if self.fallback is None:
+            raise ValueError("Model has not been trained yet.")
+        X = np.asarray(X, dtype=np.float32)
+        model_keys = list(self.models)
+        # -1: unseen county or small shard, predicted by the fallback
+        keys = self.shard_of.reindex(np.asarray(cfips)).fillna('').to_numpy()
+        codes = pd.Index(model_keys, dtype=object).get_indexer(keys)
+
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(-1, len(model_keys) + 1))
+        preds = np.empty(len(X))
+        for code in range(-1, len(model_keys)):
+            idx = order[bounds[code + 1]:bounds[code + 2]]
+            if len(idx):
+                model = self.fallback if code < 0 else self.models[model_keys[code]]
+                preds[idx] = model.predict(X[idx])
+        return preds
+
+    def save(self, path):
+        joblib.dump(self, path)
+        logger.info(f"Sharded model bundle ({len(self.models)} shards) saved to {path}")
+
+    @classmethod
+    def load(cls, path):
+        return joblib.load(path)
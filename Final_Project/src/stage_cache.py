@@ -0,0 +1,186 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+import joblib
+import pandas as pd
+from .ingestion import PARQUET_AVAILABLE, file_digest
+from .utils import setup_logger
+
+logger = setup_logger("stage_cache")
+
+try:
+    import fcntl
+except ImportError:  # Windows: eviction is only serialized within the process
+    fcntl = None
+
+_evict_lock = threading.Lock()
+
+def code_digest(*modules):
+    """
+    sha256 (first 16 hex chars) of the source files of the given modules.
+    Editing a stage's code changes its key, so stale artifacts are never reused.
+    """
+    sha = hashlib.sha256()
+    for module in modules:
+        with open(module.__file__, 'rb') as f:
+            sha.update(f.read())
+    return sha.hexdigest()[:16]
+
+class StageCache:
+    def __init__(self, cache_dir, max_bytes=5_000_000_000):
+        """
+        Content-addressed store for pipeline stage outputs.
+        Every entry lives in cache_dir/<stage>-<key>/, where the key hashes everything
+        the stage depends on (input file digests, config values, code digests and the
+        keys of upstream stages). DataFrames are stored as Parquet (pickle without
+        pyarrow), other objects with joblib. When the cache grows past max_bytes the
+        least recently used entries are evicted.
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def file_digest(self, path):
+        """
+        Content digest of an input file, or None if it does not exist.
+        """
+        return file_digest(path, self.cache_dir) if path and os.path.exists(path) else None
+
+    @staticmethod
+    def key(**parts):
+        """
+        Stable key for a stage from JSON-serializable parts.
+        """
+        payload = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+    def _entry_path(self, stage, key):
+        return os.path.join(self.cache_dir, f"{stage}-{key}")
+
+    def get(self, stage, key):
+        """
+        Artifacts stored for (stage, key) as a dict, or None on a miss.
+        """
+        path = self._entry_path(stage, key)
+        if not os.path.isdir(path):
+            return None
+        try:
+            with open(os.path.join(path, 'manifest.json')) as f:
+                manifest = json.load(f)
+
+            artifacts = {}
+            for name, fmt in manifest.items():
+                file_path = os.path.join(path, name)
+                if fmt == 'parquet':
+                    artifacts[name] = pd.read_parquet(file_path)
+                elif fmt == 'pickle':
+                    artifacts[name] = pd.read_pickle(file_path)
+                else:
+                    artifacts[name] = joblib.load(file_path)
+            # The directory mtime doubles as the LRU timestamp
+            os.utime(path)
+        except FileNotFoundError:
+            # Evicted by a concurrent stage while being read
+            return None
+        logger.info(f"Stage '{stage}' loaded from cache ({key}).")
+        return artifacts
+
+    def put(self, stage, key, artifacts):
+        """
+        Stores a dict of artifacts for (stage, key), then evicts old entries if needed.
+        """
+        path = self._entry_path(stage, key)
+        tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+
+        manifest = {}
+        for name, value in artifacts.items():
+            file_path = os.path.join(tmp_path, name)
+            if isinstance(value, pd.DataFrame) and PARQUET_AVAILABLE:
+                value.to_parquet(file_path, index=False)
+                manifest[name] = 'parquet'
+            elif isinstance(value, pd.DataFrame):
+                value.to_pickle(file_path)
+                manifest[name] = 'pickle'
+            else:
+                joblib.dump(value, file_path)
+                manifest[name] = 'joblib'
+        with open(os.path.join(tmp_path, 'manifest.json'), 'w') as f:
+            json.dump(manifest, f)
+
+        # Publish the complete entry in one rename so readers never see a partial one
+        shutil.rmtree(path, ignore_errors=True)
+        try:
+            os.replace(tmp_path, path)
+        except OSError:
+            # Another stage published the same key first; its entry is equivalent
+            shutil.rmtree(tmp_path, ignore_errors=True)
+        logger.info(f"Stage '{stage}' cached ({key}).")
+        self.evict()
+
+    def cached(self, stage, key, compute):
+        """
+        Returns the cached artifacts for (stage, key), computing and storing them on a miss.
+        """
+        artifacts = self.get(stage, key)
+        if artifacts is None:
+            start = time.perf_counter()
+            artifacts = compute()
+            logger.info(f"Stage '{stage}' computed in {time.perf_counter() - start:.1f}s.")
+            self.put(stage, key, artifacts)
+        return artifacts
+
+    def entries(self):
+        """
+        DataFrame of cache entries (name, bytes, last_used), least recently used first.
+        Entries being written (*.tmp-*) are skipped, and so are entries removed by a
+        concurrent eviction while they are listed.
+        """
+        rows = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if '.tmp' in name or not os.path.isdir(path):
+                continue
+            try:
+                size = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+                last_used = os.path.getmtime(path)
+            except FileNotFoundError:
+                continue
+            rows.append({'name': name, 'bytes': size, 'last_used': last_used})
+        return pd.DataFrame(rows, columns=['name', 'bytes', 'last_used']).sort_values('last_used', ignore_index=True)
+
+    @contextmanager
+    def _eviction_lock(self):
+        """
+        Serializes eviction between threads and, through a lock file in the cache
+        directory, between processes sharing the cache.
+        """
+        with _evict_lock, open(os.path.join(self.cache_dir, '.evict.lock'), 'w') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def evict(self):
+        """
+        Removes least recently used entries until the cache fits in max_bytes.
+        """
+        if self.max_bytes is None:
+            return
+        with self._eviction_lock():
+            entries = self.entries()
+            total = entries['bytes'].sum()
+            for row in entries.itertuples():
+                if total <= self.max_bytes:
+                    break
+                shutil.rmtree(os.path.join(self.cache_dir, row.name), ignore_errors=True)
+                total -= row.bytes
+                logger.info(f"Evicted cache entry {row.name} ({row.bytes / 1e6:.1f} MB).")
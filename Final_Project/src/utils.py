@@ -1,29 +1,43 @@
 import os
 import random
+import threading
 import numpy as np
 import logging
 import pandas as pd
 
+# Final_Project/; relative CACHE_DIR and MODEL_REGISTRY paths are resolved against it
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# One console and one file handler per log file, shared by every module logger
+_shared_handlers = {}
+_handlers_lock = threading.Lock()
+
 def setup_logger(name: str = "project_logger", log_file: str = "project.log") -> logging.Logger:
     """
     Sets up a logger with console and file handlers.
+    Loggers writing to the same log_file share one FileHandler, so the file is
+    opened once per process instead of once per module.
     """
     logger = logging.getLogger(name)
     logger.setLevel(logging.INFO)
     
     # Check if handlers already exist to avoid duplicate logs
     if not logger.handlers:
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        
-        # Console Handler
-        ch = logging.StreamHandler()
-        ch.setFormatter(formatter)
-        logger.addHandler(ch)
-        
-        # File Handler
-        fh = logging.FileHandler(log_file)
-        fh.setFormatter(formatter)
-        logger.addHandler(fh)
+        key = os.path.abspath(log_file)
+        with _handlers_lock:
+            if key not in _shared_handlers:
+                formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+                
+                # Console Handler
+                ch = logging.StreamHandler()
+                ch.setFormatter(formatter)
+                
+                # File Handler
+                fh = logging.FileHandler(log_file)
+                fh.setFormatter(formatter)
+                _shared_handlers[key] = (ch, fh)
+        for handler in _shared_handlers[key]:
+            logger.addHandler(handler)
         
     return logger
 
@@ -35,6 +49,15 @@ def set_seed(seed: int = 42):
     np.random.seed(seed)
     os.environ['PYTHONHASHSEED'] = str(seed)
     # If using torch/tensorflow, add their seed setting here
+
+def project_path(path):
+    """
+    `path` resolved against PROJECT_ROOT if it is relative (None stays None), so the
+    result does not depend on the working directory.
+    """
+    if path is None:
+        return None
+    return path if os.path.isabs(path) else os.path.join(PROJECT_ROOT, path)
     
 def load_config():
     """
@@ -44,5 +67,24 @@ def load_config():
     return {
         "DATA_PATH": "data",
         "OUTPUT_PATH": "outputs",
-        "SEED": 42
+        "SEED": 42,
+        "CHUNK_ROWS": 500_000,  # rows per streamed train.csv block
+        "MEMORY_OPTIMIZED": False,  # downcast dtypes and gather census columns by cfips
+        "CENSUS_COLUMNS": None,  # census columns used as features (None: all)
+        "CACHE_DIR": ".cache/stages",  # stage cache for Pipeline.run, under Final_Project/ if relative (None disables it)
+        "CACHE_MAX_BYTES": 5_000_000_000,  # least recently used stages are evicted beyond this
+        "MAX_WORKERS": None,  # worker threads/processes for independent stages (None: CPU count)
+        "N_JOBS": None,  # cores shared by parallel CV folds and each model (None: all)
+        "CV_FOLDS": 3,  # rolling-origin folds over first_day_of_month
+        "CV_HORIZON": 3,  # months tested per fold
+        "CV_WINDOW": None,  # training months per fold (None: expanding window)
+        "SHARD_KEY": None,  # 'state' or 'cluster': one model per shard (None: one global model)
+        "SHARD_CLUSTERS": 8,  # KMeans clusters of census features for SHARD_KEY='cluster'
+        "MODEL_REGISTRY": None,  # versioned store of trained models, e.g. "outputs/models" (None: not saved)
+        "DRIFT_BINS": 100,  # histogram bins per feature in the drift reference sketch
+        "DRIFT_ALPHA": 0.05,  # false discovery rate across features for feature drift
+        "PROFILE_MEMORY": False,  # tracemalloc peak per instrumented call (slower)
+        "PROFILE_MODE": None,  # 'cprofile' (.prof) or 'sample' (.folded stacks) dumps per stage call
+        "PROFILE_STAGES": None,  # stages dumped by PROFILE_MODE (None: all)
+        "PROFILE_DIR": "outputs/profiles"  # where PROFILE_MODE dumps are written
     }
@@ -0,0 +1,30 @@
+"""
+Code shared with Workshop_4_Simulation. The profiler (src.profiling) and the feature
+drift monitor (src.drift_detection) are implemented once, in the Workshop package, and
+imported from there. Both projects name their package `src`, so the Workshop one is
+imported from its path as `workshop_src`.
+"""
+import importlib
+import importlib.util
+import os
+import sys
+from .utils import PROJECT_ROOT, setup_logger
+
+WORKSHOP_SRC = os.path.join(os.path.dirname(PROJECT_ROOT), 'Workshop_4_Simulation', 'src')
+
+def workshop_module(name):
+    """
+    Imports workshop_src.<name> (Workshop_4_Simulation/src/<name>.py).
+    """
+    if 'workshop_src' not in sys.modules:
+        init = os.path.join(WORKSHOP_SRC, '__init__.py')
+        if not os.path.exists(init):
+            raise ImportError(f"Workshop_4_Simulation/src not found at {WORKSHOP_SRC}.")
+        spec = importlib.util.spec_from_file_location('workshop_src', init,
+                                                      submodule_search_locations=[WORKSHOP_SRC])
+        module = importlib.util.module_from_spec(spec)
+        sys.modules['workshop_src'] = module
+        spec.loader.exec_module(module)
+        # Its modules log to logging.getLogger(__name__): send them to project.log as well
+        setup_logger('workshop_src')
+    return importlib.import_module(f'workshop_src.{name}')
@@ -0,0 +1,19 @@
+import numpy as np
+from src.cellular_automata import MicroEnterpriseCA, unpack_history
+
+def _history(engine, steps=6, packed=False):
+    ca = MicroEnterpriseCA(grid_size=23, p_growth=0.08, p_decay=0.05, engine=engine)
+    ca.initialize_random(density=0.2)
+    return ca.run_simulation(steps, packed=packed), ca.grid
+
+def test_vectorized_engine_matches_the_loop_reference():
+    loop_history, loop_grid = _history('loop')
+    history, grid = _history('vectorized')
+    np.testing.assert_array_equal(history, loop_history)
+    np.testing.assert_array_equal(grid, loop_grid)
+    assert 0 < loop_history[-1].sum() < loop_history[-1].size
+
+def test_packed_history_unpacks_to_the_full_frames():
+    history, _ = _history('vectorized')
+    packed, _ = _history('vectorized', packed=True)
+    np.testing.assert_array_equal(unpack_history(packed, 23), history)
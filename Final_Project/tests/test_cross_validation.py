@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.cross_validation import cross_validate
+from src.feature_engineering import compute_panel_features
+from benchmarks.synthetic import make_panel
+
+def _features(panel):
+    panel = panel.sort_values(['cfips', 'first_day_of_month'], ignore_index=True)
+    X = compute_panel_features(panel, lags=(1, 2, 3), windows=(3,))
+    keep = X['mbd_lag_3'].notna().to_numpy()
+    return X[keep], panel[keep]
+
+def _cv(panel, shard_of=None):
+    X, rows = _features(panel)
+    return cross_validate(X, rows['microbusiness_density'], rows['first_day_of_month'], n_folds=1, horizon=3,
+                          params={'n_estimators': 10}, n_jobs=1, cfips=rows['cfips'], shard_of=shard_of)
+
+def test_horizon_scores_do_not_see_actuals_after_origin():
+    panel = make_panel(n_counties=20, n_months=18)
+    origin = np.sort(panel['first_day_of_month'].unique())[-3]
+    _, predictions = _cv(panel)
+
+    # Change every density after the origin: the lags/rolling means of the test rows change too
+    shocked = panel.copy()
+    after = shocked['first_day_of_month'] >= origin
+    shocked.loc[after, 'microbusiness_density'] *= 3.0
+    _, shocked_predictions = _cv(shocked)
+
+    assert set(predictions['horizon']) == {1, 2, 3}
+    np.testing.assert_allclose(predictions['y_pred'], shocked_predictions['y_pred'])
+    assert not np.allclose(predictions['y_true'], shocked_predictions['y_true'])
+
+def test_lag_features_require_cfips():
+    X, rows = _features(make_panel(n_counties=5, n_months=18))
+    with pytest.raises(ValueError):
+        cross_validate(X, rows['microbusiness_density'], rows['first_day_of_month'], n_folds=1, horizon=3)
+
+def test_sharded_cross_validation_trains_one_model_per_shard():
+    panel = make_panel(n_counties=20, n_months=18)
+    counties = np.sort(panel['cfips'].unique())
+    # Two shards large enough to get their own models
+    shard_of = pd.Series(np.where(np.arange(len(counties)) < 10, 'a', 'b'), index=counties)
+    scores, predictions = _cv(panel, shard_of=shard_of)
+    _, global_predictions = _cv(panel)
+
+    assert set(scores['horizon']) == {'1', '2', '3', 'all'}
+    np.testing.assert_allclose(predictions['y_true'], global_predictions['y_true'])
+    assert not np.allclose(predictions['y_pred'], global_predictions['y_pred'])
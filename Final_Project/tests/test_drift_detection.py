@@ -0,0 +1,14 @@
+import numpy as np
+import pytest
+from scipy.stats import ks_2samp, wasserstein_distance
+from src.drift_detection import detect_drift
+
+def test_detect_drift_keeps_the_exact_two_sample_test():
+    rng = np.random.default_rng(0)
+    train, new = rng.normal(size=5000), rng.normal(0.05, 1, 800)
+    result = detect_drift(train, new)
+    exact = ks_2samp(train, new)
+    assert result['statistic'] == exact.statistic
+    assert result['p_value'] == exact.pvalue
+    assert result['wasserstein'] == pytest.approx(wasserstein_distance(train, new))
+    assert result['drift_detected'] == (exact.pvalue < 0.05)
@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+from benchmarks.synthetic import make_panel
+from src.feature_engineering import compute_panel_features, create_lag_features, create_rolling_features
+
+def _panel():
+    panel = make_panel(n_counties=25, n_months=20, seed=1)
+    panel = panel.sort_values(['cfips', 'first_day_of_month']).reset_index(drop=True)
+    # Gaps in the target and counties of different lengths
+    panel.loc[panel.sample(frac=0.05, random_state=0).index, 'microbusiness_density'] = np.nan
+    return panel.drop(panel[panel['cfips'] == panel['cfips'].iloc[0]].index[:7]).reset_index(drop=True)
+
+def test_panel_features_match_the_legacy_lag_and_rolling_features():
+    panel = _panel()
+    legacy = create_rolling_features(create_lag_features(panel, lags=[1, 2, 3, 6, 12]), window=3)
+    features = compute_panel_features(panel, lags=(1, 2, 3, 6, 12), windows=(3,))
+    pd.testing.assert_frame_equal(features, legacy[features.columns], rtol=1e-12)
+
+def test_other_stats_match_pandas_and_shuffled_rows_keep_their_features():
+    panel = _panel()
+    stats = ('mean', 'std', 'min', 'max', 'pct_change')
+    features = compute_panel_features(panel, lags=(1,), windows=(3, 6), stats=stats)
+    density = panel.groupby('cfips')['microbusiness_density']
+    for window in (3, 6):
+        for stat in ('std', 'min', 'max'):
+            expected = density.transform(lambda x: getattr(x.shift(1).rolling(window), stat)())
+            # pandas computes std with running sums, so it differs in the last digits
+            np.testing.assert_allclose(features[f'mbd_roll_{stat}_{window}'], expected, rtol=1e-9)
+        expected = density.transform(lambda x: x.shift(1) / x.shift(window + 1) - 1)
+        np.testing.assert_allclose(features[f'mbd_pct_change_{window}'], expected, rtol=1e-12)
+
+    shuffled = panel.sample(frac=1, random_state=0)
+    pd.testing.assert_frame_equal(compute_panel_features(shuffled, lags=(1,), windows=(3, 6), stats=stats),
+                                  features.loc[shuffled.index])
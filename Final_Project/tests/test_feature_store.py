@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+from benchmarks.synthetic import make_panel
+from src.feature_engineering import compute_panel_features, create_lag_features, create_rolling_features
+from src.feature_store import LagFeatureStore
+
+def _panel(n_months):
+    panel = make_panel(n_counties=25, n_months=n_months, seed=2)
+    panel = panel.sort_values(['cfips', 'first_day_of_month']).reset_index(drop=True)
+    panel.loc[panel.sample(frac=0.05, random_state=1).index, 'microbusiness_density'] = np.nan
+    # One county only starts after the store was fitted
+    return panel.drop(panel[panel['cfips'] == panel['cfips'].iloc[0]].index[:14]).reset_index(drop=True)
+
+def test_incremental_store_matches_batch_features(tmp_path):
+    panel = _panel(24)
+    batch = create_rolling_features(create_lag_features(panel, lags=[1, 2, 3, 6, 12]), window=3)
+
+    months = np.sort(panel['first_day_of_month'].unique())
+    store = LagFeatureStore().fit(panel[panel['first_day_of_month'] < months[12]])
+    store.save(tmp_path / "store.npz")
+    store = LagFeatureStore.load(tmp_path / "store.npz")
+    for month in months[12:]:
+        month_df = panel[panel['first_day_of_month'] == month]
+        features = store.append(month_df)
+        expected = batch.loc[month_df.index, features.columns]
+        pd.testing.assert_frame_equal(features, expected, check_dtype=False, rtol=1e-12)
+
+def test_store_is_exact_after_a_long_history_and_fit_only_adds_new_months():
+    panel = _panel(240)
+    expected = compute_panel_features(panel)
+    months = np.sort(panel['first_day_of_month'].unique())
+    store = LagFeatureStore().fit(panel[panel['first_day_of_month'] < months[-1]])
+    last = panel[panel['first_day_of_month'] == months[-1]]
+    features = store.features(last['cfips'].to_numpy()).set_index(last.index)
+    pd.testing.assert_frame_equal(features.drop(columns='cfips'), expected.loc[last.index, features.columns[1:]],
+                                  check_exact=True)
+
+    # Refitting on the full history only pushes the month after last_month
+    store.fit(panel)
+    full = LagFeatureStore().fit(panel)
+    assert store.last_month == full.last_month == pd.Timestamp(months[-1])
+    np.testing.assert_array_equal(store.buffer, full.buffer)
+    np.testing.assert_array_equal(store.head, full.head)
@@ -0,0 +1,39 @@
+import asyncio
+import pytest
+from src.inference_server import MicroBatcher
+
+class ShardedStub:
+    routes_by_cfips = True
+
+    def predict(self, X, cfips):
+        if (cfips == 999).any():
+            raise KeyError("no shard for county 999")
+        return X.sum(axis=1) + cfips
+
+def test_bad_requests_fail_alone():
+    async def scenario():
+        batcher = MicroBatcher(ShardedStub(), ['a', 'b'], max_wait_ms=20)
+        runner = asyncio.create_task(batcher.run())
+        results = await asyncio.gather(
+            batcher.predict({'rows': [[1, 2]], 'cfips': [10]}),
+            batcher.predict({'rows': [[1, 1]], 'cfips': [999]}),
+            batcher.predict({'rows': [[0, 0], [5, 5]], 'cfips': [1, 2]}),
+            return_exceptions=True)
+        runner.cancel()
+        return results
+
+    good, bad, other = asyncio.run(scenario())
+    assert good == [13.0]
+    assert isinstance(bad, KeyError)
+    assert other == [1.0, 12.0]
+
+@pytest.mark.parametrize('payload', [
+    {'rows': [[1, 2, 3]], 'cfips': [1]},     # wrong feature count
+    {'rows': [[1, 2], [3, 4]], 'cfips': [1]},  # cfips does not match the rows
+    {'rows': [[1, 2]]},                      # sharded model without cfips
+    {'values': [[1, 2]]},
+])
+def test_malformed_requests_are_rejected_before_batching(payload):
+    batcher = MicroBatcher(ShardedStub(), ['a', 'b'])
+    with pytest.raises(ValueError):
+        batcher.parse_request(payload)
@@ -0,0 +1,12 @@
+from concurrent.futures import ThreadPoolExecutor
+from src.model_registry import ModelRegistry
+
+def test_concurrent_saves_get_distinct_complete_versions(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    with ThreadPoolExecutor(8) as pool:
+        versions = list(pool.map(lambda i: registry.save({'model': i}, 'demo', metadata={'i': i}), range(16)))
+    assert sorted(versions) == list(range(1, 17))
+    assert registry.versions('demo') == list(range(1, 17))
+    for version in versions:
+        model, manifest = registry.load('demo', version)
+        assert manifest['version'] == version and model['model'] == manifest['metadata']['i']
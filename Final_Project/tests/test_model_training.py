@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+from src.model_training import DMATRIX_CACHE, ModelTrainer
+
+def _data(n=600):
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.random((n, 4)), columns=['a', 'b', 'c', 'd'])
+    y = X['a'] * 3 + rng.normal(0, 0.05, n)
+    dates = pd.Series(pd.date_range('2020-01-01', periods=12, freq='MS')).repeat(n // 12).to_numpy()
+    return X, y, dates
+
+def test_xgb_hist_reuses_quantile_matrices_across_trainers_and_refits_on_all_rows():
+    X, y, dates = _data()
+    params = {'num_boost_round': 50, 'early_stopping_rounds': 5, 'nthread': 1}
+    DMATRIX_CACHE.clear()
+    first = ModelTrainer('xgb_hist', params=params)
+    first.train(X, y, dates=dates)
+    misses = DMATRIX_CACHE.misses
+
+    # A new trainer on an equal copy of the data hits the cache for every matrix
+    second = ModelTrainer('xgb_hist', params={**params, 'eta': 0.3})
+    second.train(X.copy(), y.copy(), dates=dates)
+    assert DMATRIX_CACHE.misses == misses
+    assert DMATRIX_CACHE.hits >= 3
+
+    # The final booster was refit on all rows with the early-stopped number of rounds
+    assert second.model.num_boosted_rounds() == second.best_iteration + 1
+    held_out = ModelTrainer('xgb_hist', params={**params, 'eta': 0.3, 'refit_full': False})
+    held_out.train(X, y, dates=dates)
+    assert held_out.best_iteration == second.best_iteration
+    assert not np.allclose(held_out.predict(X), second.predict(X))
+    assert len(DMATRIX_CACHE.entries) <= DMATRIX_CACHE.max_entries
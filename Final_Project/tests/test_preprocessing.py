@@ -0,0 +1,19 @@
+import pandas as pd
+import pytest
+from src.preprocessing import iter_panel_chunks
+
+def write_panel(path, cfips):
+    pd.DataFrame({'row_id': [f"{c}_{i}" for i, c in enumerate(cfips)], 'cfips': cfips,
+                  'first_day_of_month': pd.date_range('2020-01-01', periods=len(cfips), freq='MS'),
+                  'microbusiness_density': 1.0, 'active': 10}).to_csv(path, index=False)
+
+def test_panel_chunks_keep_counties_whole(tmp_path):
+    write_panel(tmp_path / "train.csv", [1, 1, 1, 2, 2, 3, 3, 3])
+    chunks = list(iter_panel_chunks(str(tmp_path / "train.csv"), chunk_rows=2))
+    assert [sorted(set(c['cfips'])) for c in chunks] == [[1], [2], [3]]
+    assert sum(len(c) for c in chunks) == 8
+
+def test_county_reappearing_in_the_last_chunk_raises(tmp_path):
+    write_panel(tmp_path / "train.csv", [1, 1, 2, 2, 1])
+    with pytest.raises(ValueError, match="not grouped by cfips"):
+        list(iter_panel_chunks(str(tmp_path / "train.csv"), chunk_rows=2))
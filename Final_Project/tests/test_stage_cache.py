@@ -0,0 +1,22 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from src.stage_cache import StageCache
+
+def test_concurrent_puts_and_evictions_keep_the_cache_consistent(tmp_path):
+    # Room for about two entries, so every put evicts while other threads write
+    cache = StageCache(str(tmp_path), max_bytes=150_000)
+    frame = pd.DataFrame({'x': np.random.default_rng(0).random(8_000)})
+
+    def store(i):
+        cache.put('stage', f"key{i % 6}", {'frame': frame, 'meta': {'i': i}})
+        return cache.get('stage', f"key{i % 6}")
+
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(store, range(48)))
+
+    assert all(r is None or len(r['frame']) == len(frame) for r in results)
+    entries = cache.entries()
+    assert 0 < len(entries) and entries['bytes'].sum() <= cache.max_bytes
+    assert not [name for name in os.listdir(tmp_path) if '.tmp' in name]
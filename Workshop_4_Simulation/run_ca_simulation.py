@@ -7,8 +7,9 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 from datetime import datetime
 
-from src.ca_sim import CellularAutomata
-from src.monitoring import setup_logging
+from src.ca_sim import CellularAutomata, CellularAutomataEnsemble, decode_grid
+from src.history import MemoryHistory, MemmapHistory, ReductionHistory, TeeHistory
+from src.monitoring import setup_logging, activated, profiler_from_config
 
 def main(config_path):
     # Load config
@@ -19,37 +20,89 @@ def main(config_path):
     os.makedirs(output_dir, exist_ok=True)
     setup_logging(output_dir)
     
-    # Initialize CA
-    grid_shape = (config['grid']['height'], config['grid']['width'])
-    ca = CellularAutomata(grid_shape, config)
-    
-    # Initialize from random data (simulating data slice)
-    # In real app, load_data() and pass slice
-    dummy_data = pd.DataFrame(np.random.rand(100, 1), columns=['val'])
-    ca.initialize_from_data(dummy_data)
-    
-    # Run
-    steps = config['simulation']['steps']
-    history = ca.run(steps)
-    
-    # Visualize
-    # 1. Final State
-    plt.figure(figsize=(8, 8))
-    sns.heatmap(history[-1], cmap="viridis", vmin=0, vmax=1)
-    plt.title(f"CA State at Step {steps}")
-    plt.savefig(os.path.join(output_dir, "ca_final_state.png"))
-    plt.close()
-    
-    # 2. Time Series of Total Activity
-    activity = [np.sum(grid) for grid in history]
-    plt.figure(figsize=(10, 5))
-    plt.plot(activity)
-    plt.title("Total Microenterprise Activity Over Time")
-    plt.xlabel("Step")
-    plt.ylabel("Total Activity")
-    plt.savefig(os.path.join(output_dir, "ca_activity_series.png"))
-    plt.close()
+    profiler = profiler_from_config(output_dir, config)
+    with activated(profiler):
+        # Initialize CA
+        grid_shape = (config['grid']['height'], config['grid']['width'])
+        ca = CellularAutomata(grid_shape, config)
     
+        # Initialize from random data (simulating data slice)
+        # In real app, load_data() and pass slice
+        dummy_data = pd.DataFrame(np.random.rand(100, 1), columns=['val'])
+        ca.initialize_from_data(dummy_data)
+    
+        # History sinks: per-step reductions are always kept for the activity plot;
+        # frames are kept in memory, streamed to a memory-mapped .npy file, or dropped
+        history_config = config.get('history', {})
+        mode = history_config.get('mode', 'memory')
+        every = history_config.get('every', 1)
+        reductions = ReductionHistory(os.path.join(output_dir, "ca_activity.csv"))
+        if mode == 'memory':
+            frame_sink = MemoryHistory(every=every)
+        elif mode == 'memmap':
+            frame_sink = MemmapHistory(os.path.join(output_dir, "ca_history.npy"), every=every)
+        elif mode == 'reductions':
+            frame_sink = None
+        else:
+            raise ValueError(f"Unknown history mode: {mode}")
+        sink = TeeHistory(frame_sink, reductions) if frame_sink else reductions
+    
+        # Run
+        steps = config['simulation']['steps']
+        with profiler.stage('ca_run'):
+            ca.run(steps, sink=sink)
+    
+        # Visualize
+        # 1. Final State (last kept frame, read lazily when memory-mapped)
+        if frame_sink is not None:
+            frames = frame_sink.result()
+            final_step = (len(frames) - 1) * every
+            final_grid = decode_grid(np.asarray(frames[-1]))
+        else:
+            final_step = steps
+            final_grid = decode_grid(ca.grid)
+        with profiler.stage('plot'):
+            plt.figure(figsize=(8, 8))
+            sns.heatmap(final_grid, cmap="viridis", vmin=0, vmax=1)
+            plt.title(f"CA State at Step {final_step}")
+            plt.savefig(os.path.join(output_dir, "ca_final_state.png"))
+            plt.close()
+    
+        # 2. Time Series of Total Activity
+        activity = reductions.result()
+        with profiler.stage('plot'):
+            plt.figure(figsize=(10, 5))
+            plt.plot(activity['step'], activity['total_activity'])
+            plt.title("Total Microenterprise Activity Over Time")
+            plt.xlabel("Step")
+            plt.ylabel("Total Activity")
+            plt.savefig(os.path.join(output_dir, "ca_activity_series.png"))
+            plt.close()
+    
+        # 3. Monte Carlo ensemble (optional)
+        ensemble_config = config.get('ensemble', {})
+        n_replicates = ensemble_config.get('replicates', 0)
+        if n_replicates > 0:
+            quantiles = ensemble_config.get('quantiles', [0.05, 0.5, 0.95])
+            ensemble = CellularAutomataEnsemble(n_replicates, grid_shape, config)
+            ensemble.initialize_from_data(dummy_data)
+            with profiler.stage('ensemble'):
+                summary = ensemble.run(steps, quantiles=quantiles)
+                summary.to_csv(os.path.join(output_dir, "ca_ensemble_activity.csv"), index=False)
+        
+            low, high = f"q{min(quantiles):g}", f"q{max(quantiles):g}"
+            with profiler.stage('plot'):
+                plt.figure(figsize=(10, 5))
+                plt.fill_between(summary['step'], summary[low], summary[high], alpha=0.3, label=f"{low}-{high}")
+                plt.plot(summary['step'], summary['mean'], label="mean")
+                plt.title(f"Total Activity Across {n_replicates} Replicates")
+                plt.xlabel("Step")
+                plt.ylabel("Total Activity")
+                plt.legend()
+                plt.savefig(os.path.join(output_dir, "ca_ensemble_activity.png"))
+                plt.close()
+    
+    profiler.save(os.path.join(output_dir, 'run_report.json'))
     print(f"CA Simulation completed. Results in {output_dir}")
 
 if __name__ == "__main__":
@@ -0,0 +1,40 @@
+import argparse
+import yaml
+import os
+import matplotlib.pyplot as plt
+import seaborn as sns
+
+from src.sweep import run_sweep
+from src.monitoring import setup_logging
+
+def main(config_path, max_workers=None):
+    # Load config
+    with open(config_path, 'r') as f:
+        config = yaml.safe_load(f)
+    
+    output_dir = config['sweep']['output_dir']
+    os.makedirs(output_dir, exist_ok=True)
+    setup_logging(output_dir)
+    
+    # Run (resumes from checkpoints in output_dir/runs if present)
+    results = run_sweep(config, output_dir, max_workers=max_workers)
+    
+    # Final activity against each swept parameter
+    final = results[results['step'] == results['step'].max()]
+    parameters = list(config['sweep']['parameters'])
+    fig, axes = plt.subplots(1, len(parameters), figsize=(5 * len(parameters), 4), squeeze=False)
+    for ax, name in zip(axes[0], parameters):
+        sns.scatterplot(data=final, x=name, y='total_activity', ax=ax)
+        ax.set_title(f"Final Activity vs {name}")
+    plt.tight_layout()
+    plt.savefig(os.path.join(output_dir, "sweep_sensitivity.png"))
+    plt.close()
+    
+    print(f"CA Sweep completed. Results in {output_dir}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--config', type=str, required=True)
+    parser.add_argument('--max-workers', type=int, default=None)
+    args = parser.parse_args()
+    main(args.config, args.max_workers)
@@ -0,0 +1,57 @@
+import argparse
+import yaml
+import os
+from sklearn.model_selection import train_test_split
+
+from src.ingestion import load_data, validate_schema
+from src.preprocessing import preprocess_data
+from src.features import create_features
+from src.models import train_model, evaluate_model
+from src.tuning import run_search
+from src.monitoring import setup_logging, SimulationLogger
+
+def main(config_path, max_workers=None):
+    # Load config
+    with open(config_path, 'r') as f:
+        config = yaml.safe_load(f)
+    
+    output_dir = config['tuning']['output_dir']
+    os.makedirs(output_dir, exist_ok=True)
+    setup_logging(output_dir)
+    with SimulationLogger(output_dir, **config.get('monitoring', {})) as sim_logger:
+        # Same data preparation and test split as run_ml_simulation.py
+        df = load_data(config['data_path'], cache_dir=config.get('cache_dir'))
+        validate_schema(df)
+        df = preprocess_data(df, config)
+        df = create_features(df)
+        
+        target_col = 'microbusiness_density'
+        if target_col not in df.columns:
+            target_col = df.columns[-1]
+        
+        X = df.drop(columns=[target_col])
+        y = df[target_col]
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=config['random_seed'])
+        
+        # Candidates are compared on a validation split of the training rows; the test rows stay untouched
+        X_fit, X_val, y_fit, y_val = train_test_split(X_train, y_train, test_size=config['tuning'].get('validation_size', 0.2),
+                                                      random_state=config['random_seed'])
+        leaderboard = run_search(X_fit, y_fit, X_val, y_val, config, output_dir, max_workers=max_workers)
+        
+        # Refit the winner on all training rows and score it on the test rows
+        with open(os.path.join(output_dir, "best_config.yaml"), 'r') as f:
+            best = yaml.safe_load(f)
+        (model_type, params), = best['models'].items()
+        model = train_model(X_train, y_train, config, model_type=model_type, params=params)
+        metrics, _ = evaluate_model(model, X_test, y_test)
+        sim_logger.log_metric("tuned_test_rmse", metrics['rmse'], f"{model_type} trial {best['tuning_result']['trial_id']}")
+    
+    print(leaderboard.head(10).to_string(index=False))
+    print(f"Tuning completed. Results in {output_dir}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--config', type=str, required=True)
+    parser.add_argument('--max-workers', type=int, default=None)
+    args = parser.parse_args()
+    main(args.config, args.max_workers)
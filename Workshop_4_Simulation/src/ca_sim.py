@@ -1,14 +1,57 @@
 import numpy as np
+import pandas as pd
 import matplotlib.pyplot as plt
 import logging
+from .history import MemoryHistory, encode_grid, decode_grid
+from .monitoring import timed
 
 logger = logging.getLogger(__name__)
 
+def moore_neighbors_sum(grid):
+    """
+    Moore-neighbourhood sum with wrapping borders.
+    Works on a single (H, W) grid or on a stack of grids (N, H, W).
+    """
+    pad_width = [(0, 0)] * (grid.ndim - 2) + [(1, 1), (1, 1)]
+    padded = np.pad(grid, pad_width, mode='wrap')
+    return (
+        padded[..., :-2, :-2] + padded[..., :-2, 1:-1] + padded[..., :-2, 2:] +
+        padded[..., 1:-1, :-2]                         + padded[..., 1:-1, 2:] +
+        padded[..., 2:, :-2]  + padded[..., 2:, 1:-1]  + padded[..., 2:, 2:]
+    )
+
+# Storage dtype -> dtype the step kernel computes in
+GRID_DTYPES = {
+    'float64': np.float64,
+    'float32': np.float32,
+    'uint16': np.float32,
+}
+def normalize_slice(df_slice, size):
+    """
+    Maps the first `size` values of a data slice to [0, 1] and zero-fills the rest.
+    """
+    flat_grid = np.zeros(size)
+    values = df_slice.values[:size]
+    if len(values) > 0:
+        norm_values = (values - values.min()) / (values.max() - values.min() + 1e-9)
+        flat_grid[:len(values)] = norm_values.flatten()
+    return flat_grid
+
 class CellularAutomata:
-    def __init__(self, grid_shape, config):
+    def __init__(self, grid_shape, config, rng=None):
         self.grid_shape = grid_shape
         self.config = config
-        self.grid = np.zeros(grid_shape)
+        # Optional numpy Generator; defaults to the global np.random state
+        self.rng = rng if rng is not None else np.random
+        
+        # Storage precision: float64 (default), float32, or uint16-quantized
+        dtype_name = config.get('grid', {}).get('dtype', 'float64')
+        if dtype_name not in GRID_DTYPES:
+            raise ValueError(f"Unknown grid dtype: {dtype_name}")
+        self.dtype = np.dtype(dtype_name)
+        self.compute_dtype = np.dtype(GRID_DTYPES[dtype_name])
+        
+        self.grid = np.zeros(grid_shape, dtype=self.dtype)
         self.history = []
 
     def initialize_from_data(self, df_slice):
@@ -17,33 +60,29 @@ class CellularAutomata:
         Maps values to a normalized 0-1 range for the grid.
         """
         # Simple mapping: take first N values and fill grid
-        flat_grid = self.grid.flatten()
-        values = df_slice.values[:len(flat_grid)]
-        
-        # Normalize
-        if len(values) > 0:
-            norm_values = (values - values.min()) / (values.max() - values.min() + 1e-9)
-            flat_grid[:len(values)] = norm_values.flatten()
-        
-        self.grid = flat_grid.reshape(self.grid_shape)
+        flat_grid = normalize_slice(df_slice, self.grid.size)
+        self.grid = encode_grid(flat_grid.reshape(self.grid_shape), self.dtype)
         self.history.append(self.grid.copy())
         logger.info("CA Grid initialized.")
 
     def get_neighbors_sum(self):
         # Simple convolution for neighbor sum (Moore neighborhood)
-        padded = np.pad(self.grid, 1, mode='wrap')
-        neighbor_sum = (
-            padded[:-2, :-2] + padded[:-2, 1:-1] + padded[:-2, 2:] +
-            padded[1:-1, :-2]                     + padded[1:-1, 2:] +
-            padded[2:, :-2]  + padded[2:, 1:-1]  + padded[2:, 2:]
-        )
-        return neighbor_sum
+        return moore_neighbors_sum(self.grid)
 
     def step(self):
         """
         Applies CA rules.
         """
-        neighbor_sum = self.get_neighbors_sum()
+        self._advance()
+        self.history.append(self.grid.copy())
+
+    @timed('ca_step')
+    def _advance(self):
+        """
+        Computes the next grid in the compute dtype and stores it in the storage dtype.
+        """
+        grid = decode_grid(self.grid).astype(self.compute_dtype, copy=False)
+        neighbor_sum = moore_neighbors_sum(grid)
         
         # Rule: Growth based on neighbors and random perturbation
         growth_threshold = self.config.get('simulation', {}).get('growth_threshold', 0.6)
@@ -51,24 +90,117 @@ class CellularAutomata:
         perturbation_sigma = self.config.get('simulation', {}).get('perturbation_sigma', 0.05)
         
         # Stochastic update
-        noise = np.random.normal(0, perturbation_sigma, self.grid.shape)
+        noise = self.rng.normal(0, perturbation_sigma, self.grid.shape).astype(self.compute_dtype, copy=False)
         
         # Logic: If neighbors are strong, grow. If random decay, die.
         # This is a continuous CA (values 0-1)
-        new_grid = self.grid + (neighbor_sum / 8.0) * 0.1 + noise
+        new_grid = grid + (neighbor_sum / 8.0) * 0.1 + noise
         
         # Decay
-        decay_mask = np.random.random(self.grid.shape) < decay_prob
+        decay_mask = self.rng.random(self.grid.shape) < decay_prob
         new_grid[decay_mask] *= 0.5
         
         # Clip
         new_grid = np.clip(new_grid, 0, 1)
         
-        self.grid = new_grid
-        self.history.append(self.grid.copy())
+        self.grid = encode_grid(new_grid, self.dtype)
 
-    def run(self, steps):
-        for _ in range(steps):
-            self.step()
+    def run(self, steps, sink=None):
+        """
+        Runs `steps` steps and streams every frame (including the existing history) to `sink`.
+        Without a sink, frames go to a preallocated in-memory buffer and the
+        (len(history), H, W) array is returned; use decode_grid() for [0, 1] values.
+        With a sink (see src/history.py), self.history is not extended and sink.result() is returned.
+        """
+        keep_in_memory = sink is None
+        if keep_in_memory:
+            sink = MemoryHistory()
+        
+        offset = len(self.history)
+        sink.open(offset + steps, self.grid_shape, self.dtype)
+        try:
+            for i, frame in enumerate(self.history):
+                sink.append(i, frame)
+            
+            for t in range(steps):
+                self._advance()
+                sink.append(offset + t, self.grid)
+        finally:
+            sink.close()
+        
         logger.info(f"CA Simulation completed for {steps} steps.")
-        return np.array(self.history)
+        if keep_in_memory:
+            frames = sink.result()
+            # Keep history as views into the buffer instead of per-step copies
+            self.history = list(frames)
+            return frames
+        return sink.result()
+
+class CellularAutomataEnsemble:
+    def __init__(self, n_replicates, grid_shape, config):
+        """
+        Holds N independent realizations of CellularAutomata as one (N, H, W) array.
+        Every replicate draws from its own Generator spawned from config['random_seed'].
+        """
+        self.n_replicates = n_replicates
+        self.grid_shape = tuple(grid_shape)
+        self.config = config
+        seed_seq = np.random.SeedSequence(config.get('random_seed'))
+        self.rngs = [np.random.default_rng(s) for s in seed_seq.spawn(n_replicates)]
+        # Ensemble grids are never stored per step, so they live in the compute dtype
+        dtype_name = config.get('grid', {}).get('dtype', 'float64')
+        if dtype_name not in GRID_DTYPES:
+            raise ValueError(f"Unknown grid dtype: {dtype_name}")
+        self.dtype = np.dtype(GRID_DTYPES[dtype_name])
+        self.grids = np.zeros((n_replicates,) + self.grid_shape, dtype=self.dtype)
+        self._noise = np.empty(self.grids.shape, dtype=self.dtype)
+        self._uniform = np.empty(self.grids.shape, dtype=self.dtype)
+        self.activity = None
+
+    def initialize_from_data(self, df_slice):
+        """
+        Every replicate starts from the same normalized data slice.
+        """
+        grid = normalize_slice(df_slice, int(np.prod(self.grid_shape))).reshape(self.grid_shape)
+        self.grids[:] = grid
+        logger.info(f"CA ensemble of {self.n_replicates} grids initialized.")
+
+    @timed('ca_ensemble_step')
+    def step(self):
+        """
+        Applies the CellularAutomata rules to every replicate at once.
+        """
+        sim_config = self.config.get('simulation', {})
+        decay_prob = sim_config.get('decay_probability', 0.02)
+        perturbation_sigma = sim_config.get('perturbation_sigma', 0.05)
+
+        for k, rng in enumerate(self.rngs):
+            rng.standard_normal(out=self._noise[k], dtype=self.dtype)
+            rng.random(out=self._uniform[k], dtype=self.dtype)
+
+        new_grids = self.grids + (moore_neighbors_sum(self.grids) / 8.0) * 0.1 + perturbation_sigma * self._noise
+        new_grids[self._uniform < decay_prob] *= 0.5
+        self.grids = np.clip(new_grids, 0, 1)
+
+    def run(self, steps, quantiles=(0.05, 0.5, 0.95)):
+        """
+        Runs all replicates and returns mean/quantile curves of total activity per step.
+        Only per-step totals are kept, not the grids.
+        """
+        activity = np.empty((steps + 1, self.n_replicates))
+        activity[0] = self.grids.sum(axis=(1, 2))
+        for t in range(steps):
+            self.step()
+            activity[t + 1] = self.grids.sum(axis=(1, 2))
+
+        self.activity = activity
+        logger.info(f"CA ensemble completed {steps} steps for {self.n_replicates} replicates.")
+
+        summary = pd.DataFrame({
+            'step': np.arange(steps + 1),
+            'mean': activity.mean(axis=1),
+            'std': activity.std(axis=1),
+        })
+        for q, values in zip(quantiles, np.quantile(activity, quantiles, axis=1)):
+            summary[f'q{q:g}'] = values
+        return summary
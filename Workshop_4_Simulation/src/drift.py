@@ -0,0 +1,310 @@
+import logging
+from collections import deque
+
+import numpy as np
+import pandas as pd
+from scipy.stats import kstwobign
+
+from .monitoring import timed
+
+logger = logging.getLogger(__name__)
+
+def benjamini_hochberg(p_values):
+    """
+    Benjamini-Hochberg adjusted p-values (false discovery rate control across features).
+    """
+    p_values = np.asarray(p_values, dtype=float)
+    n = len(p_values)
+    order = np.argsort(p_values)
+    ranked = p_values[order] * n / np.arange(1, n + 1)
+    adjusted = np.empty(n)
+    adjusted[order] = np.minimum(np.minimum.accumulate(ranked[::-1])[::-1], 1.0)
+    return adjusted
+
+class DriftMonitor:
+    def __init__(self, n_bins=100, alpha=0.05):
+        """
+        Fixed-size histogram sketch per feature for drift monitoring.
+        fit() places n_bins quantile bins per feature on the reference (training) data once;
+        update() then only adds a batch's per-bin counts and sums to the current window, and
+        compare() tests the window against the reference for all features at once from the
+        (features x bins) matrices: KS with Benjamini-Hochberg adjusted p-values, PSI and the
+        Wasserstein-1 distance. A check costs O(features x bins) however many rows were seen.
+        KS is evaluated at the bin edges, so it is a lower bound on the exact statistic.
+        """
+        self.n_bins = n_bins
+        self.alpha = alpha
+        self.features = None
+        self.edges = None       # (features, n_bins - 1) inner bin edges
+        self.ref_counts = None  # (features, n_bins)
+        self.ref_sums = None
+        self.counts = None
+        self.sums = None
+
+    def _values(self, X):
+        if isinstance(X, pd.DataFrame):
+            X = X[self.features] if self.features is not None else X
+        X = np.asarray(X, dtype=np.float64)
+        return X.reshape(len(X), -1)
+
+    def _bin_stats(self, X):
+        """
+        Per-feature bin counts and value sums of a batch (missing values are skipped).
+        """
+        counts = np.zeros((X.shape[1], self.n_bins))
+        sums = np.zeros((X.shape[1], self.n_bins))
+        for j in range(X.shape[1]):
+            values = X[:, j][~np.isnan(X[:, j])]
+            bins = np.searchsorted(self.edges[j], values, side='right')
+            counts[j] = np.bincount(bins, minlength=self.n_bins)
+            sums[j] = np.bincount(bins, weights=values, minlength=self.n_bins)
+        return counts, sums
+
+    @timed('drift_fit')
+    def fit(self, reference):
+        """
+        Builds the reference sketch (bin edges at the reference quantiles) and clears the window.
+        """
+        if isinstance(reference, pd.DataFrame):
+            self.features = list(reference.columns)
+        X = self._values(reference)
+        if self.features is None:
+            self.features = [f"feature_{j}" for j in range(X.shape[1])]
+        quantiles = np.linspace(0, 1, self.n_bins + 1)[1:-1]
+        with np.errstate(all='ignore'):
+            self.edges = np.nan_to_num(np.nanquantile(X, quantiles, axis=0).T, nan=0.0)
+        self.ref_counts, self.ref_sums = self._bin_stats(X)
+        self.reset()
+        logger.info(f"Drift reference sketch: {len(self.features)} features x {self.n_bins} bins "
+                    f"from {len(X)} rows.")
+        return self
+
+    def reset(self):
+        self.counts = np.zeros_like(self.ref_counts)
+        self.sums = np.zeros_like(self.ref_sums)
+        return self
+
+    def update(self, batch):
+        """
+        Adds a batch (e.g. one month of rows) to the current window.
+        """
+        if self.edges is None:
+            raise ValueError("DriftMonitor has not been fitted yet.")
+        counts, sums = self._bin_stats(self._values(batch))
+        self.counts += counts
+        self.sums += sums
+        return self
+
+    def compare(self):
+        """
+        Tests the current window against the reference. Returns one row per feature with
+        the KS statistic, its p-value and BH-adjusted p-value, PSI, Wasserstein-1 distance
+        and drift_detected (adjusted p-value below alpha).
+        """
+        n_ref = self.ref_counts.sum(axis=1)
+        n_cur = self.counts.sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            p_ref = self.ref_counts / n_ref[:, None]
+            p_cur = self.counts / n_cur[:, None]
+            cdf_gap = np.abs(np.cumsum(p_ref, axis=1) - np.cumsum(p_cur, axis=1))
+            statistic = cdf_gap.max(axis=1)
+            n_eff = n_ref * n_cur / (n_ref + n_cur)
+            p_value = np.where(n_cur > 0, kstwobign.sf(np.sqrt(n_eff) * statistic), 1.0)
+
+            eps = 1e-6
+            psi = ((p_cur - p_ref) * np.log(np.clip(p_cur, eps, None) / np.clip(p_ref, eps, None))).sum(axis=1)
+
+            # Each bin is represented by the pooled mean of its values (edge midpoint if empty)
+            left = np.concatenate([self.edges[:, :1], self.edges], axis=1)
+            right = np.concatenate([self.edges, self.edges[:, -1:]], axis=1)
+            pooled = (self.ref_sums + self.sums) / (self.ref_counts + self.counts)
+            centers = np.where(np.isfinite(pooled), pooled, (left + right) / 2)
+            wasserstein = (cdf_gap[:, :-1] * np.diff(centers, axis=1)).sum(axis=1)
+
+        p_adjusted = benjamini_hochberg(np.nan_to_num(p_value, nan=1.0))
+        return pd.DataFrame({'feature': self.features, 'rows': n_cur.astype(np.int64), 'ks_statistic': statistic,
+                             'p_value': p_value, 'p_adjusted': p_adjusted, 'psi': np.nan_to_num(psi),
+                             'wasserstein': np.nan_to_num(wasserstein), 'drift_detected': p_adjusted < self.alpha})
+
+    @timed('drift_check')
+    def check(self, batch):
+        """
+        Compares one batch on its own against the reference.
+        """
+        return self.reset().update(batch).compare()
+
+    def save(self, path):
+        np.savez(path, n_bins=self.n_bins, alpha=self.alpha, features=np.asarray(self.features, dtype=str),
+                 edges=self.edges, ref_counts=self.ref_counts, ref_sums=self.ref_sums,
+                 counts=self.counts, sums=self.sums)
+        logger.info(f"Drift monitor saved to {path}")
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as state:
+            monitor = cls(n_bins=int(state['n_bins']), alpha=float(state['alpha']))
+            monitor.features = state['features'].tolist()
+            monitor.edges = state['edges']
+            monitor.ref_counts = state['ref_counts']
+            monitor.ref_sums = state['ref_sums']
+            monitor.counts = state['counts']
+            monitor.sums = state['sums']
+        return monitor
+
+class PageHinkley:
+    """
+    Page-Hinkley test for an increase in the mean of a stream (e.g. absolute
+    prediction errors): alarms when the cumulative deviation above the running
+    mean rises more than `threshold` over its minimum. O(1) per observation.
+    """
+    def __init__(self, delta=0.005, threshold=1.0, min_samples=30):
+        self.delta = delta
+        self.threshold = threshold
+        self.min_samples = min_samples
+        self.reset()
+
+    def reset(self):
+        self.n = 0
+        self.mean = 0.0
+        self.cumulative = 0.0
+        self.minimum = 0.0
+
+    def update(self, x):
+        self.n += 1
+        self.mean += (x - self.mean) / self.n
+        self.cumulative += x - self.mean - self.delta
+        self.minimum = min(self.minimum, self.cumulative)
+        if self.n >= self.min_samples and self.cumulative - self.minimum > self.threshold:
+            self.reset()
+            return True
+        return False
+
+class CUSUM:
+    """
+    Two-sided CUSUM on standardized observations. Mean and standard deviation are
+    estimated (Welford) from the first `warmup` values; afterwards the upper and
+    lower sums accumulate deviations beyond `k` standard deviations and alarm above
+    `h`. O(1) per observation.
+    """
+    def __init__(self, k=0.5, h=5.0, warmup=30):
+        self.k = k
+        self.h = h
+        self.warmup = warmup
+        self.reset()
+
+    def reset(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.upper = 0.0
+        self.lower = 0.0
+
+    def update(self, x):
+        if self.n < self.warmup:
+            self.n += 1
+            delta = x - self.mean
+            self.mean += delta / self.n
+            self.m2 += delta * (x - self.mean)
+            return False
+        std = np.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else 0.0
+        z = (x - self.mean) / std if std > 0 else 0.0
+        self.upper = max(0.0, self.upper + z - self.k)
+        self.lower = max(0.0, self.lower - z - self.k)
+        if self.upper > self.h or self.lower > self.h:
+            self.reset()
+            return True
+        return False
+
+class ADWIN:
+    """
+    ADaptive WINdowing (Bifet & Gavalda): keeps a window compressed into an
+    exponential histogram (at most max_buckets buckets per power-of-two size, so
+    O(log W) memory) and drops its oldest part whenever two sub-windows have means
+    that differ by more than the Hoeffding-style bound for confidence delta.
+    Cut points are checked every `clock` observations, which keeps the amortized
+    update cost constant.
+    """
+    def __init__(self, delta=0.002, max_buckets=5, clock=32, min_window=10):
+        self.delta = delta
+        self.max_buckets = max_buckets
+        self.clock = clock
+        self.min_window = min_window
+        self.reset()
+
+    def reset(self):
+        # levels[i]: buckets of 2**i observations as [total, sum of squares], oldest first
+        self.levels = []
+        self.n = 0
+        self.total = 0.0
+        self.sum_squares = 0.0
+        self.ticks = 0
+
+    @property
+    def mean(self):
+        return self.total / self.n if self.n else 0.0
+
+    def _insert(self, x):
+        self.n += 1
+        self.total += x
+        self.sum_squares += x * x
+        carry = [x, x * x]
+        for level in range(len(self.levels) + 1):
+            if level == len(self.levels):
+                self.levels.append(deque())
+            self.levels[level].append(carry)
+            if len(self.levels[level]) <= self.max_buckets:
+                break
+            first, second = self.levels[level].popleft(), self.levels[level].popleft()
+            carry = [first[0] + second[0], first[1] + second[1]]
+
+    def _drop_oldest(self):
+        level = len(self.levels) - 1
+        total, sum_squares = self.levels[level].popleft()
+        self.n -= 2 ** level
+        self.total -= total
+        self.sum_squares -= sum_squares
+        while self.levels and not self.levels[-1]:
+            self.levels.pop()
+
+    def _cut_found(self):
+        variance = max(self.sum_squares / self.n - self.mean ** 2, 0.0)
+        log_term = np.log(2 * np.log(self.n) / self.delta)
+        n_old, total_old = 0, 0.0
+        for level in range(len(self.levels) - 1, -1, -1):
+            for bucket_total, _ in self.levels[level]:
+                n_old += 2 ** level
+                total_old += bucket_total
+                n_new = self.n - n_old
+                if n_new < self.min_window:
+                    return False
+                if n_old < self.min_window:
+                    continue
+                m = 1 / (1 / n_old + 1 / n_new)
+                bound = np.sqrt(2 / m * variance * log_term) + 2 / (3 * m) * log_term
+                if abs(total_old / n_old - (self.total - total_old) / n_new) > bound:
+                    return True
+        return False
+
+    def update(self, x):
+        self._insert(x)
+        self.ticks += 1
+        if self.ticks % self.clock or self.n < 2 * self.min_window:
+            return False
+        detected = False
+        while self.n >= 2 * self.min_window and self._cut_found():
+            self._drop_oldest()
+            detected = True
+        return detected
+
+DETECTORS = {'adwin': ADWIN, 'page_hinkley': PageHinkley, 'cusum': CUSUM}
+
+def make_detectors(detector_config):
+    """
+    Detectors from a {name: {params}} config mapping, e.g. {'adwin': {'delta': 0.002}}.
+    """
+    detectors = {}
+    for name, params in (detector_config or {}).items():
+        if name not in DETECTORS:
+            raise ValueError(f"Unknown drift detector: {name}. Choose from {sorted(DETECTORS)}.")
+        detectors[name] = DETECTORS[name](**(params or {}))
+    return detectors
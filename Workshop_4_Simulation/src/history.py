@@ -0,0 +1,154 @@
+import numpy as np
+import pandas as pd
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+UINT16_SCALE = 65535.0
+
+def encode_grid(values, dtype):
+    """
+    Converts [0, 1] values to the storage dtype; uint16 stores round(value * 65535).
+    """
+    if np.dtype(dtype) == np.uint16:
+        return np.rint(values * UINT16_SCALE).astype(np.uint16)
+    return values.astype(dtype, copy=False)
+
+def decode_grid(frames):
+    """
+    Returns grid values in [0, 1] as floats, undoing uint16 quantization if needed.
+    """
+    if frames.dtype == np.uint16:
+        return frames.astype(np.float32) / np.float32(UINT16_SCALE)
+    return frames
+
+class HistorySink:
+    """
+    Receives CA frames one step at a time.
+    CellularAutomata.run calls open() once, append() for every frame, then close().
+    `every` keeps only frames whose step index is a multiple of k.
+    """
+    def __init__(self, every=1):
+        if every < 1:
+            raise ValueError("every must be >= 1")
+        self.every = every
+
+    def open(self, n_frames, frame_shape, dtype):
+        pass
+
+    def append(self, step, frame):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def result(self):
+        return None
+
+    def n_kept(self, n_frames):
+        return (n_frames + self.every - 1) // self.every
+
+class MemoryHistory(HistorySink):
+    """
+    Keeps frames in one preallocated in-memory array.
+    """
+    def open(self, n_frames, frame_shape, dtype):
+        self.frames = np.empty((self.n_kept(n_frames),) + tuple(frame_shape), dtype=dtype)
+
+    def append(self, step, frame):
+        if step % self.every == 0:
+            self.frames[step // self.every] = frame
+
+    def result(self):
+        return self.frames
+
+class MemmapHistory(HistorySink):
+    """
+    Writes frames straight into a memory-mapped .npy file, so memory use does not grow with steps.
+    result() reopens the file read-only with mmap_mode='r' for lazy access.
+    """
+    def __init__(self, path, every=1):
+        super().__init__(every)
+        self.path = path
+        self.frames = None
+
+    def open(self, n_frames, frame_shape, dtype):
+        dirname = os.path.dirname(self.path)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+        shape = (self.n_kept(n_frames),) + tuple(frame_shape)
+        self.frames = np.lib.format.open_memmap(self.path, mode='w+', dtype=dtype, shape=shape)
+
+    def append(self, step, frame):
+        if step % self.every == 0:
+            self.frames[step // self.every] = frame
+
+    def close(self):
+        if self.frames is not None:
+            self.frames.flush()
+            self.frames = None
+            logger.info(f"CA history written to {self.path}")
+
+    def result(self):
+        return np.load(self.path, mmap_mode='r')
+
+class ReductionHistory(HistorySink):
+    """
+    Keeps only per-step reductions: total activity and the number of cells above `active_threshold`.
+    Optionally writes them to a CSV file on close().
+    """
+    def __init__(self, path=None, active_threshold=0.5, every=1):
+        super().__init__(every)
+        self.path = path
+        self.active_threshold = active_threshold
+
+    def open(self, n_frames, frame_shape, dtype):
+        n_kept = self.n_kept(n_frames)
+        self.steps = np.empty(n_kept, dtype=np.int64)
+        self.total_activity = np.empty(n_kept)
+        self.active_cells = np.empty(n_kept, dtype=np.int64)
+
+    def append(self, step, frame):
+        if step % self.every == 0:
+            values = decode_grid(frame)
+            i = step // self.every
+            self.steps[i] = step
+            self.total_activity[i] = values.sum()
+            self.active_cells[i] = np.count_nonzero(values > self.active_threshold)
+
+    def close(self):
+        if self.path:
+            self.result().to_csv(self.path, index=False)
+            logger.info(f"CA reductions written to {self.path}")
+
+    def result(self):
+        return pd.DataFrame({
+            'step': self.steps,
+            'total_activity': self.total_activity,
+            'active_cells': self.active_cells,
+        })
+
+class TeeHistory(HistorySink):
+    """
+    Forwards every frame to several sinks, e.g. sparse frames on disk plus per-step reductions.
+    result() returns a list with each sink's result.
+    """
+    def __init__(self, *sinks):
+        super().__init__()
+        self.sinks = sinks
+
+    def open(self, n_frames, frame_shape, dtype):
+        for sink in self.sinks:
+            sink.open(n_frames, frame_shape, dtype)
+
+    def append(self, step, frame):
+        for sink in self.sinks:
+            sink.append(step, frame)
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+    def result(self):
+        return [sink.result() for sink in self.sinks]
@@ -1,18 +1,143 @@
+import hashlib
+import importlib.util
+import json
 import pandas as pd
 import os
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
-def load_data(path: str) -> pd.DataFrame:
+# Parquet needs pyarrow (or fastparquet); without it the cache falls back to pickle
+PARQUET_AVAILABLE = any(importlib.util.find_spec(m) is not None for m in ('pyarrow', 'fastparquet'))
+
+# Explicit compact dtypes for census_starter.csv and the train/test panels
+COLUMN_DTYPES = {
+    'cfips': 'int32',
+    'county': 'category',
+    'state': 'category',
+    'microbusiness_density': 'float64',
+    'active': 'int32',
+}
+PREFIX_DTYPES = {
+    'pct_': 'float32',
+    'median_hh_inc_': 'float32',  # mixes int and float text across years
+}
+DATE_COLUMNS = ['first_day_of_month']
+
+# Serializes the read-modify-write of digests.json between threads
+_index_lock = threading.Lock()
+
+def _atomic_write(path: str, write) -> None:
+    """
+    Calls write(tmp_path), then renames the finished file over `path`, so readers never
+    see a half-written file. The temporary name is unique per process and thread.
+    """
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def schema_for(columns) -> dict:
+    """
+    dtype mapping for the given CSV header; unknown columns are left to pandas.
+    """
+    schema = {}
+    for col in columns:
+        if col in COLUMN_DTYPES:
+            schema[col] = COLUMN_DTYPES[col]
+        else:
+            for prefix, dtype in PREFIX_DTYPES.items():
+                if col.startswith(prefix):
+                    schema[col] = dtype
+                    break
+    return schema
+
+def file_digest(path: str, cache_dir: str) -> str:
+    """
+    sha256 of the file contents (first 16 hex chars), remembered in
+    cache_dir/digests.json by (size, mtime) so unchanged files are not re-hashed.
+    """
+    stat = os.stat(path)
+    key = os.path.abspath(path)
+    index_path = os.path.join(cache_dir, 'digests.json')
+    
+    def read_index():
+        try:
+            with open(index_path) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+    
+    entry = read_index().get(key)
+    if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+        return entry['digest']
+    
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            sha.update(block)
+    digest = sha.hexdigest()[:16]
+    
+    def write_index(tmp_path):
+        with open(tmp_path, 'w') as f:
+            json.dump(index, f)
+    
+    with _index_lock:
+        # Re-read under the lock so entries added by other threads are kept
+        index = read_index()
+        index[key] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'digest': digest}
+        _atomic_write(index_path, write_index)
+    return digest
+
+def load_data(path: str, columns: list = None, cache_dir: str = None) -> pd.DataFrame:
     """
     Loads data from a CSV file.
+    The first load parses the CSV with an explicit schema and caches it as
+    cache_dir/<name>-<content hash>.parquet (default cache_dir: .cache next to the CSV);
+    later loads read only the requested `columns` from the cache and skip CSV parsing.
+    Cache files are written to a temporary name and renamed into place, so concurrent
+    loads of the same file are safe.
     """
     if not os.path.exists(path):
         raise FileNotFoundError(f"Data file not found at {path}")
     
     try:
-        df = pd.read_csv(path)
+        cache_dir = cache_dir or os.path.join(os.path.dirname(path), '.cache')
+        os.makedirs(cache_dir, exist_ok=True)
+        name = os.path.splitext(os.path.basename(path))[0]
+        suffix = '.parquet' if PARQUET_AVAILABLE else '.pkl'
+        cache_path = os.path.join(cache_dir, f"{name}-{file_digest(path, cache_dir)}{suffix}")
+        
+        if os.path.exists(cache_path):
+            if PARQUET_AVAILABLE:
+                df = pd.read_parquet(cache_path, columns=columns)
+            else:
+                df = pd.read_pickle(cache_path)
+                df = df[columns] if columns is not None else df
+            logger.info(f"Loaded data from cache {cache_path}. Shape: {df.shape}")
+            return df
+        
+        header = pd.read_csv(path, nrows=0).columns
+        df = pd.read_csv(path, dtype=schema_for(header),
+                         parse_dates=[c for c in DATE_COLUMNS if c in header])
+        if PARQUET_AVAILABLE:
+            _atomic_write(cache_path, lambda tmp_path: df.to_parquet(tmp_path, index=False))
+        else:
+            _atomic_write(cache_path, lambda tmp_path: df.to_pickle(tmp_path, compression=None))
+        # Only cache files of older versions of this CSV are stale, never the current one
+        for stale in os.listdir(cache_dir):
+            stale_path = os.path.join(cache_dir, stale)
+            if stale.startswith(f"{name}-") and stale.endswith(('.parquet', '.pkl')) and stale_path != cache_path:
+                try:
+                    os.remove(stale_path)
+                except FileNotFoundError:
+                    pass  # removed by a concurrent load
+        
+        df = df[columns] if columns is not None else df
         logger.info(f"Loaded data from {path}. Shape: {df.shape}")
         return df
     except Exception as e:
@@ -4,21 +4,31 @@ from sklearn.ensemble import RandomForestRegressor
 from sklearn.neural_network import MLPRegressor
 from sklearn.metrics import mean_squared_error, mean_absolute_error
 import joblib
+import json
 import logging
 import os
+from datetime import datetime, timezone
+import sklearn
 
 logger = logging.getLogger(__name__)
 
-def train_model(X_train, y_train, config: dict, model_type='random_forest'):
+def train_model(X_train, y_train, config: dict, model_type='random_forest', params: dict = None):
     """
     Trains a model based on config.
+    params overrides the config's parameters for this model type (used by tuning).
+    'xgboost' needs the optional xgboost package.
     """
+    params = {**config.get('models', {}).get(model_type, {}), **(params or {})}
     if model_type == 'random_forest':
-        params = config.get('models', {}).get('random_forest', {})
         model = RandomForestRegressor(**params)
     elif model_type == 'mlp':
-        params = config.get('models', {}).get('mlp', {})
         model = MLPRegressor(**params)
+    elif model_type == 'xgboost':
+        try:
+            from xgboost import XGBRegressor
+        except ImportError as err:
+            raise ValueError("model_type 'xgboost' requires the xgboost package (pip install xgboost).") from err
+        model = XGBRegressor(**params)
     else:
         raise ValueError(f"Unknown model type: {model_type}")
     
@@ -26,6 +36,33 @@ def train_model(X_train, y_train, config: dict, model_type='random_forest'):
     logger.info(f"Trained {model_type} model.")
     return model
 
+def refit_model(model, X_new, y_new, config: dict):
+    """
+    Updates a trained model with a new batch instead of retraining it from scratch
+    (config['retraining']):
+    - RandomForest: warm_start adds `extra_trees` trees fitted on the new batch.
+    - XGBoost: `extra_rounds` more boosting rounds on the new batch, continuing the booster.
+    - MLP: `partial_fit_epochs` passes of partial_fit over the new batch.
+    Other models raise ValueError: retraining them on one batch would silently change
+    what the model was trained on.
+    """
+    retrain_config = config.get('retraining', {})
+    if isinstance(model, RandomForestRegressor):
+        model.set_params(warm_start=True, n_estimators=len(model.estimators_) + retrain_config.get('extra_trees', 20))
+        model.fit(X_new, y_new)
+    elif isinstance(model, MLPRegressor):
+        for _ in range(retrain_config.get('partial_fit_epochs', 5)):
+            model.partial_fit(X_new, y_new)
+    elif type(model).__name__ == 'XGBRegressor':
+        booster = model.get_booster()
+        model.set_params(n_estimators=retrain_config.get('extra_rounds', 20))
+        model.fit(X_new, y_new, xgb_model=booster)
+    else:
+        raise ValueError(f"Cannot incrementally refit a {type(model).__name__}; "
+                         "supported models are RandomForestRegressor, XGBRegressor and MLPRegressor.")
+    logger.info(f"Incrementally refit {type(model).__name__} on {len(X_new)} new rows.")
+    return model
+
 def evaluate_model(model, X_test, y_test):
     """
     Evaluates the model.
@@ -41,10 +78,40 @@ def evaluate_model(model, X_test, y_test):
     logger.info(f"Evaluation metrics: {metrics}")
     return metrics, predictions
 
-def save_model(model, path: str):
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    joblib.dump(model, path)
+def save_model(model, path: str, compress=0, metadata: dict = None):
+    """
+    Saves the model with joblib plus a `<path>.json` manifest (model class, feature
+    names, library versions, compression, metadata).
+    compress=0 keeps the file loadable with load_model(path, mmap_mode='r');
+    compress=1..9 gives smaller files that are always read fully into memory.
+    """
+    dirname = os.path.dirname(path)
+    if dirname:
+        os.makedirs(dirname, exist_ok=True)
+    joblib.dump(model, path, compress=compress)
+
+    feature_names = getattr(model, 'feature_names_in_', None)
+    manifest = {
+        'model_class': type(model).__name__,
+        'feature_names': [str(f) for f in feature_names] if feature_names is not None else None,
+        'compress': compress,
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'sklearn': sklearn.__version__,
+        'metadata': metadata or {},
+    }
+    with open(path + '.json', 'w') as f:
+        json.dump(manifest, f, indent=2, default=str)
     logger.info(f"Model saved to {path}")
 
-def load_model(path: str):
-    return joblib.load(path)
+def load_model_manifest(path: str):
+    with open(path + '.json') as f:
+        return json.load(f)
+
+def load_model(path: str, mmap_mode=None):
+    """
+    mmap_mode='r' memory-maps the numpy arrays of an uncompressed model file
+    instead of reading them (ignored for compressed files).
+    """
+    if mmap_mode and os.path.exists(path + '.json') and load_model_manifest(path)['compress']:
+        mmap_mode = None
+    return joblib.load(path, mmap_mode=mmap_mode)
@@ -1,22 +1,674 @@
+import cProfile
+import csv
+import json
 import logging
-import pandas as pd
+import multiprocessing
 import os
-from datetime import datetime
+import platform
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+from functools import wraps
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ['timestamp', 'metric_name', 'value', 'notes']
+
+# Default histogram buckets: powers of ten on both sides of zero
+DEFAULT_EDGES = np.concatenate([-np.logspace(6, -6, 13), [0.0], np.logspace(-6, 6, 13)])
+
+class CSVBackend:
+    extension = 'csv'
+
+    def __init__(self, path):
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self.file = open(path, 'a', newline='')
+        # Quoted as needed, so commas or newlines in notes cannot break the columns
+        self.writer = csv.DictWriter(self.file, fieldnames=FIELDS)
+        if new_file:
+            self.writer.writeheader()
+            self.file.flush()
+
+    def write(self, records):
+        self.writer.writerows(records)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+class JSONLBackend:
+    extension = 'jsonl'
+
+    def __init__(self, path):
+        self.file = open(path, 'a')
+
+    def write(self, records):
+        self.file.write(''.join(json.dumps(record, default=str) + '\n' for record in records))
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+class ParquetBackend:
+    """
+    A Parquet dataset directory (read it with pd.read_parquet(path)); every flush
+    writes one part file. Parts are written under a dot-prefixed name, which readers
+    skip, and renamed into place, so each flushed batch survives a crash. Reopening
+    a run adds parts next to the existing ones, and concurrent writers never share
+    a file name. Part names start with the write time, so the rows read back in order.
+    """
+    extension = 'parquet'
+
+    def __init__(self, path):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        self.pa = pa
+        self.pq = pq
+        self.path = path
+        self.writer_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.parts = 0
+        self.schema = pa.schema([('timestamp', pa.string()), ('metric_name', pa.string()),
+                                 ('value', pa.float64()), ('notes', pa.string())])
+        os.makedirs(path, exist_ok=True)
+
+    def write(self, records):
+        columns = {
+            'timestamp': [r['timestamp'] for r in records],
+            'metric_name': [r['metric_name'] for r in records],
+            'value': [float(r['value']) if r['value'] is not None else None for r in records],
+            'notes': [str(r['notes']) for r in records],
+        }
+        name = f"part-{time.time_ns():020d}-{self.writer_id}-{self.parts:06d}.parquet"
+        tmp_path = os.path.join(self.path, f".{name}.tmp")
+        self.pq.write_table(self.pa.Table.from_pydict(columns, schema=self.schema), tmp_path)
+        os.replace(tmp_path, os.path.join(self.path, name))
+        self.parts += 1
+
+    def close(self):
+        pass
+
+BACKENDS = {'csv': CSVBackend, 'jsonl': JSONLBackend, 'parquet': ParquetBackend}
+
+class _FlushTimer:
+    """
+    Daemon thread that calls `flush_if_due` every `interval` seconds, so buffered
+    records are written on time even when nothing else is logged.
+    """
+    def __init__(self, flush_if_due, interval):
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, args=(flush_if_due, interval), daemon=True)
+        self.thread.start()
+
+    def _run(self, flush_if_due, interval):
+        while not self.stopped.wait(interval):
+            try:
+                flush_if_due()
+            except Exception:
+                logger.exception("Scheduled metrics flush failed.")
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread is not threading.current_thread():
+            self.thread.join()
+
+class Histogram:
+    """
+    Streaming summary of a numeric metric: count, sum, min, max and counts per bucket.
+    """
+    def __init__(self, edges=DEFAULT_EDGES):
+        self.edges = np.asarray(edges, dtype=float)
+        self.bucket_counts = np.zeros(len(self.edges) + 1, dtype=np.int64)
+        self.count = 0
+        self.total = 0.0
+        self.sum_squares = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def add(self, values):
+        values = np.asarray(values, dtype=float)
+        if not len(values):
+            return
+        self.bucket_counts += np.bincount(np.searchsorted(self.edges, values, side='right'),
+                                          minlength=len(self.bucket_counts))
+        self.count += len(values)
+        self.total += float(values.sum())
+        self.sum_squares += float((values ** 2).sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    def summary(self):
+        mean = self.total / self.count if self.count else None
+        variance = self.sum_squares / self.count - mean ** 2 if self.count else None
+        return {'count': self.count, 'mean': mean, 'std': float(np.sqrt(max(variance, 0.0))) if self.count else None,
+                'min': self.min if self.count else None, 'max': self.max if self.count else None,
+                'edges': self.edges.tolist(), 'bucket_counts': self.bucket_counts.tolist()}
 
 class SimulationLogger:
-    def __init__(self, log_dir):
+    def __init__(self, log_dir, backend='csv', flush_every=1000, flush_interval=5.0, name="simulation_metrics"):
+        """
+        Buffered metrics sink. log_metric only appends to an in-memory buffer, which is
+        written to `<name>.<csv|jsonl|parquet>` in one batch when it holds flush_every
+        records or flush_interval seconds after the previous flush (and on flush/close).
+        For Parquet, `<name>.parquet` is a directory with one part file per batch.
+        A background timer enforces flush_interval while no metrics arrive; None or 0
+        disables it.
+        increment() and observe() keep counters and numeric histograms in memory; their
+        totals go to `<name>_summary.json` on every flush.
+        Use as a context manager, or call close(), so the last batch is written.
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown metrics backend: {backend}. Choose from {sorted(BACKENDS)}.")
         self.log_dir = log_dir
         os.makedirs(log_dir, exist_ok=True)
-        self.log_file = os.path.join(log_dir, "simulation_metrics.csv")
-        
-        if not os.path.exists(self.log_file):
-            with open(self.log_file, 'w') as f:
-                f.write("timestamp,metric_name,value,notes\n")
+        self.log_file = os.path.join(log_dir, f"{name}.{BACKENDS[backend].extension}")
+        self.summary_file = os.path.join(log_dir, f"{name}_summary.json")
+        self.backend = BACKENDS[backend](self.log_file)
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.buffer = []
+        self.counters = {}
+        self.histograms = {}
+        self.last_flush = time.monotonic()
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.summary_changed = False
+        self.closed = False
+        self.timer = _FlushTimer(self._flush_if_due, flush_interval) if flush_interval else None
 
     def log_metric(self, name, value, notes=""):
-        timestamp = datetime.now().isoformat()
-        with open(self.log_file, 'a') as f:
-            f.write(f"{timestamp},{name},{value},{notes}\n")
+        self.log_records([{'timestamp': datetime.now().isoformat(), 'metric_name': name,
+                           'value': value, 'notes': notes}])
+
+    def log_records(self, records):
+        with self.lock:
+            self.buffer.extend(records)
+            due = (len(self.buffer) >= self.flush_every or
+                   time.monotonic() - self.last_flush >= (self.flush_interval or 0))
+        if due:
+            self.flush()
+
+    def _flush_if_due(self):
+        with self.lock:
+            due = ((self.buffer or self.summary_changed) and
+                   time.monotonic() - self.last_flush >= self.flush_interval)
+        if due:
+            self.flush()
+
+    def increment(self, name, amount=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+            self.summary_changed = True
+
+    def observe(self, name, values, edges=None):
+        """
+        Adds one value or an array of values to the histogram `name`.
+        """
+        with self.lock:
+            if name not in self.histograms:
+                self.histograms[name] = Histogram(edges if edges is not None else DEFAULT_EDGES)
+            self.histograms[name].add(np.atleast_1d(values))
+            self.summary_changed = True
+
+    def summary(self):
+        with self.lock:
+            return {'counters': dict(self.counters),
+                    'histograms': {name: h.summary() for name, h in self.histograms.items()}}
+
+    def flush(self):
+        # flush_lock keeps the timer thread and callers from writing the summary at once
+        with self.flush_lock:
+            with self.lock:
+                records, self.buffer = self.buffer, []
+                self.last_flush = time.monotonic()
+                self.summary_changed = False
+                if records:
+                    self.backend.write(records)
+            if self.counters or self.histograms:
+                tmp_path = self.summary_file + ".tmp"
+                with open(tmp_path, 'w') as f:
+                    json.dump(self.summary(), f, indent=2)
+                os.replace(tmp_path, self.summary_file)
+
+    def close(self):
+        if not self.closed:
+            if self.timer is not None:
+                self.timer.stop()
+            self.flush()
+            self.backend.close()
+            self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class QueueLogger:
+    """
+    SimulationLogger stand-in for worker processes: records, counter increments and
+    observations are batched locally and sent to a MetricsWriter's queue in one
+    message per flush, so workers never touch the metrics files themselves.
+    Like SimulationLogger, a background timer sends pending data every flush_interval
+    seconds while nothing is logged.
+    """
+    def __init__(self, queue, flush_every=1000, flush_interval=5.0):
+        self.queue = queue
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.records = []
+        self.counters = {}
+        self.observations = {}
+        self.last_flush = time.monotonic()
+        self.lock = threading.Lock()
+        self.timer = _FlushTimer(self._flush_if_due, flush_interval) if flush_interval else None
+
+    def _due(self):
+        return time.monotonic() - self.last_flush >= (self.flush_interval or 0)
+
+    def _flush_if_due(self):
+        if self._due():
+            self.flush()
+
+    def log_metric(self, name, value, notes=""):
+        with self.lock:
+            self.records.append({'timestamp': datetime.now().isoformat(), 'metric_name': name,
+                                 'value': value, 'notes': notes})
+            due = len(self.records) >= self.flush_every or self._due()
+        if due:
+            self.flush()
+
+    def increment(self, name, amount=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def observe(self, name, values):
+        with self.lock:
+            self.observations.setdefault(name, []).extend(np.atleast_1d(values).tolist())
+
+    def flush(self):
+        with self.lock:
+            message = (self.records, self.counters, self.observations)
+            self.records, self.counters, self.observations = [], {}, {}
+            self.last_flush = time.monotonic()
+            if any(message):
+                self.queue.put(message)
+
+    def close(self):
+        if self.timer is not None:
+            self.timer.stop()
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class MetricsWriter:
+    """
+    Single writer for metrics logged by many processes. A manager queue (picklable,
+    so it can be passed to process pool tasks) carries QueueLogger batches to a
+    background thread that merges them into one SimulationLogger.
+
+        with MetricsWriter(log_dir, backend='parquet') as writer:
+            executor.submit(task, writer.queue)   # task: with QueueLogger(queue) as metrics: ...
+    """
+    def __init__(self, log_dir, **logger_kwargs):
+        self.logger = SimulationLogger(log_dir, **logger_kwargs)
+        self.manager = multiprocessing.Manager()
+        self.queue = self.manager.Queue()
+        self.thread = threading.Thread(target=self._drain, daemon=True)
+        self.thread.start()
+
+    def _drain(self):
+        while True:
+            message = self.queue.get()
+            if message is None:
+                break
+            records, counters, observations = message
+            for name, amount in counters.items():
+                self.logger.increment(name, amount)
+            for name, values in observations.items():
+                self.logger.observe(name, values)
+            if records:
+                self.logger.log_records(records)
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+        self.logger.close()
+        self.manager.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+PROFILE_MODES = (None, 'cprofile', 'sample')
+
+def current_rss_mb():
+    """
+    Resident set size of this process in MB (Linux /proc), falling back to the
+    peak RSS from getrusage where /proc is not available.
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1e6
+    except (OSError, ValueError, AttributeError):
+        return max_rss_mb()
+
+def max_rss_mb():
+    """
+    Peak RSS of this process so far (getrusage high-water mark), in MB.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1e6 if sys.platform == 'darwin' else peak / 1e3
+
+class _StackSampler:
+    """
+    Sampling profiler for one thread: every `interval` seconds records the thread's
+    current call stack. stop() returns the counts per collapsed ("folded") stack, the
+    input format of flamegraph.pl and speedscope.
+    """
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        self.thread.join()
+        return self.stacks
+
+class Profiler:
+    def __init__(self, trace_memory=False, mode=None, stages=None, output_dir='outputs/profiles',
+                 sample_interval=0.005, max_calls=200):
+        """
+        Collects wall time, thread CPU time and RSS for every instrumented call, plus:
+        - trace_memory: peak Python heap growth per call via tracemalloc (slows code down;
+          calls that overlap in time share the peaks seen while they ran).
+        - mode='cprofile': a cProfile .prof file per call of the stages in `stages`
+          (default: all), in output_dir.
+        - mode='sample': sampled call stacks of those stages, added up over all their
+          calls (worker processes included) and written by save() as one
+          <stage>.folded file per stage, in output_dir.
+        Per-stage totals always cover every call; the raw call list keeps the first
+        max_calls calls of each stage (None: all).
+        """
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode: {mode}. Choose from {PROFILE_MODES}.")
+        self.trace_memory = trace_memory
+        self.mode = mode
+        self.stages = set(stages) if stages else None
+        self.output_dir = output_dir
+        self.sample_interval = sample_interval
+        self.max_calls = max_calls
+        self.started = datetime.now(timezone.utc)
+        self.start_time = time.perf_counter()
+        self.calls = []
+        self.totals = {}
+        self.lock = threading.Lock()
+        self.open_peaks = {}   # call id -> highest traced memory seen while the call was open
+        self.samples = {}      # stage -> Counter of folded stacks (mode='sample')
+        self.local = threading.local()
+        self.sequence = 0
+
+    def settings(self):
+        """
+        Constructor arguments, to start an equivalent profiler in a worker process.
+        """
+        return {'trace_memory': self.trace_memory, 'mode': self.mode, 'stages': sorted(self.stages or []),
+                'output_dir': self.output_dir, 'sample_interval': self.sample_interval, 'max_calls': self.max_calls}
+
+    def _update_peaks(self):
+        # Credit the heap peak since the last reset to every open call, then reset it
+        _, peak = tracemalloc.get_traced_memory()
+        for call_id in self.open_peaks:
+            self.open_peaks[call_id] = max(self.open_peaks[call_id], peak)
+        tracemalloc.reset_peak()
+
+    def _start_dump(self, name, call_id):
+        if self.mode is None or (self.stages is not None and name not in self.stages):
+            return None
+        # One dump per thread at a time: nested stages are covered by the outer dump
+        if getattr(self.local, 'dumping', False):
+            return None
+        if self.mode == 'cprofile':
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError as err:  # another profiler is active in this thread
+                logger.warning(f"cProfile unavailable for stage '{name}': {err}")
+                return None
+            dump = ('cprofile', profile, os.path.join(self.output_dir, f"{name}.{os.getpid()}.{call_id}.prof"))
+        else:
+            sampler = _StackSampler(threading.get_ident(), self.sample_interval)
+            sampler.start()
+            dump = ('sample', sampler, self._samples_path(name))
+        self.local.dumping = True
+        return dump
+
+    def _finish_dump(self, name, dump):
+        kind, profiler, path = dump
+        if kind == 'cprofile':
+            profiler.disable()
+            os.makedirs(self.output_dir, exist_ok=True)
+            profiler.dump_stats(path)
+        else:
+            stacks = profiler.stop()
+            with self.lock:
+                self.samples.setdefault(name, Counter()).update(stacks)
+        self.local.dumping = False
+        return path
+
+    def _samples_path(self, name):
+        return os.path.join(self.output_dir, f"{name}.folded")
+
+    def write_samples(self):
+        """
+        Writes the sampled stacks of every stage as <stage>.folded in output_dir;
+        returns the paths. Stages that were never sampled get no file.
+        """
+        with self.lock:
+            samples = {name: Counter(stacks) for name, stacks in self.samples.items() if stacks}
+        if samples:
+            os.makedirs(self.output_dir, exist_ok=True)
+        for name, stacks in samples.items():
+            with open(self._samples_path(name), 'w') as f:
+                for stack, count in stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+        return [self._samples_path(name) for name in samples]
+
+    @contextmanager
+    def stage(self, name):
+        with self.lock:
+            self.sequence += 1
+            call_id = self.sequence
+            traced_start = None
+            if self.trace_memory and tracemalloc.is_tracing():
+                self._update_peaks()
+                traced_start = tracemalloc.get_traced_memory()[0]
+                self.open_peaks[call_id] = traced_start
+        rss_start = current_rss_mb()
+        dump = self._start_dump(name, call_id)
+        wall_start, cpu_start, started_at = time.perf_counter(), time.thread_time(), time.time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.thread_time() - cpu_start
+            dump_path = self._finish_dump(name, dump) if dump else None
+            record = {'stage': name, 'pid': os.getpid(), 'thread': threading.current_thread().name,
+                      'started_at': started_at, 'wall_seconds': wall, 'cpu_seconds': cpu,
+                      'rss_start_mb': rss_start, 'rss_end_mb': current_rss_mb(), 'profile': dump_path}
+            with self.lock:
+                if call_id in self.open_peaks:
+                    self._update_peaks()
+                    record['peak_traced_mb'] = (self.open_peaks.pop(call_id) - traced_start) / 1e6
+            self.merge([record])
+
+    def collected(self):
+        """
+        Call records and sampled stacks, to be merged into another profiler.
+        """
+        with self.lock:
+            return {'records': list(self.calls),
+                    'samples': {name: dict(stacks) for name, stacks in self.samples.items()}}
+
+    def merge(self, records, samples=None):
+        """
+        Adds call records and sampled stacks (e.g. collected by a worker process's profiler).
+        """
+        with self.lock:
+            for name, stacks in (samples or {}).items():
+                self.samples.setdefault(name, Counter()).update(stacks)
+            for record in records:
+                totals = self.totals.setdefault(record['stage'], {
+                    'stage': record['stage'], 'calls': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0,
+                    'max_wall_seconds': 0.0, 'max_rss_mb': 0.0, 'peak_traced_mb': None})
+                totals['calls'] += 1
+                totals['wall_seconds'] += record['wall_seconds']
+                totals['cpu_seconds'] += record['cpu_seconds']
+                totals['max_wall_seconds'] = max(totals['max_wall_seconds'], record['wall_seconds'])
+                totals['max_rss_mb'] = max(totals['max_rss_mb'], record['rss_end_mb'], record['rss_start_mb'])
+                if record.get('peak_traced_mb') is not None:
+                    totals['peak_traced_mb'] = max(totals['peak_traced_mb'] or 0.0, record['peak_traced_mb'])
+                if self.max_calls is None or totals['calls'] <= self.max_calls:
+                    self.calls.append(record)
+
+    def summary(self):
+        """
+        Per-stage totals, slowest first.
+        """
+        with self.lock:
+            rows = [dict(t, mean_wall_seconds=t['wall_seconds'] / t['calls']) for t in self.totals.values()]
+        return sorted(rows, key=lambda row: row['wall_seconds'], reverse=True)
+
+    def report(self, **extra):
+        return {
+            'run': {
+                'started': self.started.isoformat(timespec='seconds'),
+                'wall_seconds': time.perf_counter() - self.start_time,
+                'max_rss_mb': max_rss_mb(),
+                'pid': os.getpid(),
+                'argv': sys.argv,
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpu_count': os.cpu_count(),
+                'profiler': self.settings(),
+            },
+            'stages': self.summary(),
+            'calls': sorted(self.calls, key=lambda call: call['started_at']),
+            **extra,
+        }
+
+    def save(self, path, **extra):
+        """
+        Writes the run report (run metadata, per-stage totals, calls, extra sections) as JSON,
+        and the sampled stacks per stage in mode='sample'.
+        """
+        self.write_samples()
+        dirname = os.path.dirname(path)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(self.report(**extra), f, indent=2, default=str)
+        logger.info(f"Run report saved to {path}")
+
+_active = None
+
+def active_profiler():
+    return _active
+
+@contextmanager
+def activated(profiler):
+    """
+    Makes `profiler` the target of @timed / profile_stage (process-wide) while the
+    block runs, starting tracemalloc if it needs it.
+    """
+    global _active
+    previous = _active
+    started_tracing = profiler.trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    _active = profiler
+    try:
+        yield profiler
+    finally:
+        _active = previous
+        if started_tracing:
+            tracemalloc.stop()
+
+def profile_stage(name):
+    """
+    Context manager timing a block as stage `name` on the active profiler (if any).
+    """
+    return _active.stage(name) if _active is not None else nullcontext()
+
+def timed(name=None):
+    """
+    Decorator timing every call of a function as stage `name` (default: its qualified name).
+    """
+    def decorator(func):
+        stage_name = name or func.__qualname__
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _active is None:
+                return func(*args, **kwargs)
+            with _active.stage(stage_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def call_profiled(settings, func, *args):
+    """
+    Runs func(*args) under a fresh profiler built from `settings` (see Profiler.settings);
+    returns (result, Profiler.collected()), for the parent's `merge(**collected)`. Used
+    to bring back timings and samples from worker processes.
+    """
+    profiler = Profiler(**{**settings, 'max_calls': None})
+    with activated(profiler):
+        result = func(*args)
+    return result, profiler.collected()
+
+def profiler_from_config(output_dir, config):
+    """
+    Profiler for the `profiling:` config section: memory (bool), mode (cprofile or
+    sample), stages (list, default all) and dir (default <output_dir>/profiles), the
+    same settings as the Final Project's PROFILE_* keys.
+    """
+    profiling_config = config.get('profiling', {}) or {}
+    return Profiler(trace_memory=profiling_config.get('memory', False), mode=profiling_config.get('mode'),
+                    stages=profiling_config.get('stages'),
+                    output_dir=profiling_config.get('dir') or os.path.join(output_dir, 'profiles'))
 
 def setup_logging(log_dir):
     logging.basicConfig(
@@ -0,0 +1,170 @@
+import copy
+import itertools
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from .ca_sim import CellularAutomata
+from .history import ReductionHistory
+from .monitoring import MetricsWriter, QueueLogger
+
+logger = logging.getLogger(__name__)
+
+def grid_points(parameters, levels=3):
+    """
+    Full factorial design: `levels` evenly spaced values between each [low, high] range.
+    """
+    names = list(parameters)
+    axes = [np.linspace(low, high, levels) for low, high in parameters.values()]
+    return [dict(zip(names, map(float, values))) for values in itertools.product(*axes)]
+
+def latin_hypercube(parameters, n_samples, seed=None):
+    """
+    Latin hypercube design: every [low, high] range is split into `n_samples` strata
+    and each stratum is used exactly once per parameter.
+    """
+    rng = np.random.default_rng(seed)
+    names = list(parameters)
+    points = np.empty((n_samples, len(names)))
+    for j, (low, high) in enumerate(parameters.values()):
+        strata = (rng.permutation(n_samples) + rng.random(n_samples)) / n_samples
+        points[:, j] = low + strata * (high - low)
+    return [dict(zip(names, map(float, row))) for row in points]
+
+def build_tasks(config):
+    """
+    Expands the `sweep:` config section into one task per (parameter point, replicate).
+    Task ids are stable, so seeds and checkpoint names do not depend on scheduling order.
+    """
+    sweep_config = config['sweep']
+    parameters = sweep_config['parameters']
+    method = sweep_config.get('method', 'grid')
+    if method == 'grid':
+        points = grid_points(parameters, sweep_config.get('levels', 3))
+    elif method == 'lhs':
+        points = latin_hypercube(parameters, sweep_config.get('samples', 10), config.get('random_seed'))
+    else:
+        raise ValueError(f"Unknown sweep method: {method}")
+
+    replicates = sweep_config.get('replicates', 1)
+    tasks = []
+    for point_id, point in enumerate(points):
+        for replicate in range(replicates):
+            tasks.append({'task_id': len(tasks), 'point_id': point_id, 'replicate': replicate, **point})
+    return tasks
+
+def run_task(task, config, steps, grid_shape):
+    """
+    Runs one CA realization with the task's parameters and returns its activity curve.
+    The initial grid is shared by all tasks (seeded by random_seed) so only the
+    parameters and the per-task dynamics seed differ between runs.
+    """
+    task_config = copy.deepcopy(config)
+    for name in config['sweep']['parameters']:
+        task_config.setdefault('simulation', {})[name] = task[name]
+
+    base_seed = config.get('random_seed')
+    init_rng = np.random.default_rng(base_seed)
+    init_data = pd.DataFrame(init_rng.random((int(np.prod(grid_shape)), 1)), columns=['val'])
+
+    task_seed = np.random.SeedSequence(base_seed, spawn_key=(task['task_id'],))
+    ca = CellularAutomata(grid_shape, task_config, rng=np.random.default_rng(task_seed))
+    ca.initialize_from_data(init_data)
+    activity = ca.run(steps, sink=ReductionHistory())
+
+    for key, value in task.items():
+        activity[key] = value
+    return activity
+
+def run_settings(config, steps, grid_shape):
+    """
+    Every setting that changes a task's result besides its swept values: steps, grid
+    shape and dtype, random_seed, the whole `simulation:` section and the sweep design.
+    Pool size and output paths are left out, so they can change between resumes.
+    """
+    sweep_config = {k: v for k, v in config['sweep'].items() if k not in ('max_workers', 'output_dir')}
+    return {'steps': steps, 'grid_shape': list(grid_shape), 'grid': config.get('grid', {}),
+            'random_seed': config.get('random_seed'), 'simulation': config.get('simulation', {}),
+            'sweep': sweep_config}
+
+def _check_manifest(output_dir, manifest):
+    """
+    Writes the sweep manifest, or raises ValueError if output_dir already holds one
+    for different settings or tasks (its checkpoints would not belong to this sweep).
+    """
+    manifest = json.loads(json.dumps(manifest, default=str))
+    manifest_path = os.path.join(output_dir, "manifest.json")
+    if not os.path.exists(manifest_path):
+        with open(manifest_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        return
+    with open(manifest_path) as f:
+        previous = json.load(f)
+    changed = sorted(k for k in manifest['settings'] if previous['settings'].get(k) != manifest['settings'][k])
+    if changed or previous['tasks'] != manifest['tasks']:
+        raise ValueError(f"{output_dir} holds a sweep with different {', '.join(changed) or 'tasks'}; "
+                         f"use a new output directory.")
+
+def _checkpoint_path(checkpoint_dir, task_id):
+    return os.path.join(checkpoint_dir, f"task_{task_id:05d}.csv")
+
+def _run_and_checkpoint(task, config, steps, grid_shape, checkpoint_dir, metrics_queue=None):
+    start = time.perf_counter()
+    activity = run_task(task, config, steps, grid_shape)
+    path = _checkpoint_path(checkpoint_dir, task['task_id'])
+    tmp_path = path + ".tmp"
+    activity.to_csv(tmp_path, index=False)
+    # Atomic rename: an interrupted write never leaves a half-written checkpoint
+    os.replace(tmp_path, path)
+    if metrics_queue is not None:
+        with QueueLogger(metrics_queue) as metrics:
+            metrics.log_metric("final_activity", float(activity['total_activity'].iloc[-1]), f"task {task['task_id']}")
+            metrics.observe("task_seconds", time.perf_counter() - start)
+            metrics.increment("tasks_completed")
+    return task['task_id']
+
+def run_sweep(config, output_dir, max_workers=None):
+    """
+    Runs every sweep task over a process pool, checkpointing each finished task to
+    `output_dir/runs/`. Re-running with the same config skips finished tasks, so an
+    interrupted sweep resumes where it stopped; output_dir/manifest.json records the
+    settings and tasks, and a config that changes either raises ValueError. Returns the tidy results table
+    (one row per task and step) and writes it to `output_dir/sweep_results.csv`.
+    Per-task metrics (final activity, runtime histogram, completed-task counter) are
+    sent to a MetricsWriter and written to `output_dir/sweep_metrics.*`.
+    """
+    checkpoint_dir = os.path.join(output_dir, "runs")
+    os.makedirs(checkpoint_dir, exist_ok=True)
+
+    tasks = build_tasks(config)
+    steps = config['sweep'].get('steps', config.get('simulation', {}).get('steps', 100))
+    grid_shape = (config['grid']['height'], config['grid']['width'])
+    # Checkpoints are only reusable if they were produced by the same settings and tasks
+    _check_manifest(output_dir, {'settings': run_settings(config, steps, grid_shape), 'tasks': tasks})
+    max_workers = max_workers or config['sweep'].get('max_workers')
+
+    pending = [t for t in tasks if not os.path.exists(_checkpoint_path(checkpoint_dir, t['task_id']))]
+    logger.info(f"Sweep: {len(tasks)} tasks, {len(tasks) - len(pending)} already checkpointed.")
+
+    if pending:
+        # Workers send their metrics to one writer instead of appending to the files themselves
+        with MetricsWriter(output_dir, name="sweep_metrics", **config.get('monitoring', {})) as writer, \
+                ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(_run_and_checkpoint, task, config, steps, grid_shape, checkpoint_dir,
+                                       writer.queue)
+                       for task in pending]
+            for done, future in enumerate(as_completed(futures), start=1):
+                task_id = future.result()
+                logger.info(f"Sweep task {task_id} finished ({done}/{len(pending)}).")
+
+    results = pd.concat([pd.read_csv(_checkpoint_path(checkpoint_dir, t['task_id'])) for t in tasks],
+                        ignore_index=True)
+    results_path = os.path.join(output_dir, "sweep_results.csv")
+    results.to_csv(results_path, index=False)
+    logger.info(f"Sweep results saved to {results_path}")
+    return results
@@ -0,0 +1,181 @@
+import json
+import logging
+import math
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+import yaml
+from sklearn.exceptions import ConvergenceWarning
+from sklearn.metrics import mean_squared_error
+
+from .models import train_model
+
+logger = logging.getLogger(__name__)
+
+# Parameter that sets each model's training budget; it is scaled down on the early rungs
+BUDGET_PARAMS = {'random_forest': 'n_estimators', 'xgboost': 'n_estimators', 'mlp': 'max_iter'}
+
+def sample_params(space, rng):
+    """
+    Draws one configuration from a search space. Each entry is either
+    a fixed value, a list of choices, or a {low, high[, log][, type: int]} range.
+    """
+    params = {}
+    for name, spec in space.items():
+        if isinstance(spec, list):
+            value = spec[rng.integers(len(spec))]
+        elif isinstance(spec, dict):
+            low, high = spec['low'], spec['high']
+            if spec.get('log', False):
+                value = float(np.exp(rng.uniform(np.log(low), np.log(high))))
+            else:
+                value = float(rng.uniform(low, high))
+            if spec.get('type') == 'int':
+                value = int(round(value))
+        else:
+            value = spec
+        params[name] = value
+    return params
+
+def rung_fractions(min_fraction, eta=3):
+    """
+    Budget fractions of the successive-halving rungs: min_fraction * eta**r, up to 1.
+    """
+    if not 0 < min_fraction <= 1:
+        raise ValueError(f"min_fraction must be in (0, 1], got {min_fraction}")
+    n_rungs = int(round(math.log(1 / min_fraction, eta))) + 1
+    return [min(1.0, min_fraction * eta ** r) for r in range(n_rungs - 1)] + [1.0]
+
+def sample_candidates(spaces, n_candidates, rng, first_id=0):
+    """
+    n_candidates trials spread round-robin over the model types in `spaces`.
+    """
+    model_types = list(spaces)
+    for model_type in model_types:
+        if model_type not in BUDGET_PARAMS:
+            raise ValueError(f"Unknown model type in tuning spaces: {model_type}")
+    return [{'trial_id': first_id + i, 'model_type': model_types[i % len(model_types)],
+             'params': sample_params(spaces[model_types[i % len(model_types)]], rng)}
+            for i in range(n_candidates)]
+
+def _rung_params(trial, fraction, seed):
+    """
+    The trial's parameters at a budget fraction; single-threaded so parallel trials
+    do not oversubscribe the cores.
+    """
+    params = dict(trial['params'])
+    budget_param = BUDGET_PARAMS[trial['model_type']]
+    if budget_param in params:
+        params[budget_param] = max(1, int(round(params[budget_param] * fraction)))
+    params.setdefault('random_state', seed)
+    if trial['model_type'] != 'mlp':
+        params.setdefault('n_jobs', 1)
+    return params
+
+def _run_trial(data_path, trial, fraction, n_rows, config):
+    """
+    Trains one trial on the first n_rows of the (shuffled) training rows and scores
+    it on the validation rows. The data is memory-mapped, not pickled per trial.
+    """
+    # Copy-on-write mapping: pages are shared between workers, and sklearn's Cython
+    # validation (which needs a writable buffer) still accepts the arrays
+    X_train, y_train, X_val, y_val = joblib.load(data_path, mmap_mode='c')
+    params = _rung_params(trial, fraction, config.get('random_seed'))
+
+    start = time.perf_counter()
+    with warnings.catch_warnings():
+        # Early rungs cut max_iter on purpose
+        warnings.simplefilter('ignore', ConvergenceWarning)
+        model = train_model(X_train[:n_rows], y_train[:n_rows], config, trial['model_type'], params=params)
+    fit_seconds = time.perf_counter() - start
+    val_rmse = float(np.sqrt(mean_squared_error(y_val, model.predict(X_val))))
+    return {'trial_id': trial['trial_id'], 'model_type': trial['model_type'], 'fraction': fraction,
+            'rows': n_rows, 'budget': params.get(BUDGET_PARAMS[trial['model_type']]),
+            'params': json.dumps(trial['params'], default=str), 'val_rmse': val_rmse,
+            'fit_seconds': fit_seconds}
+
+def successive_halving(candidates, fractions, data_path, n_rows, config, eta=3, max_workers=None, bracket=0):
+    """
+    Trains every candidate on the smallest budget, keeps the best 1/eta by validation
+    RMSE, and repeats on the next budget until the full budget.
+    A budget fraction f uses f of the training rows and f of the model's budget
+    parameter (trees or epochs). Returns one result row per trial and rung.
+    """
+    results = []
+    survivors = list(candidates)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for rung, fraction in enumerate(fractions):
+            rows = max(1, int(n_rows * fraction))
+            futures = [executor.submit(_run_trial, data_path, trial, fraction, rows, config) for trial in survivors]
+            rung_results = sorted((f.result() for f in futures), key=lambda r: r['val_rmse'])
+
+            n_keep = max(1, len(rung_results) // eta) if rung < len(fractions) - 1 else 0
+            kept = {r['trial_id'] for r in rung_results[:n_keep]}
+            for r in rung_results:
+                results.append({'bracket': bracket, 'rung': rung, **r, 'promoted': r['trial_id'] in kept})
+            logger.info(f"Bracket {bracket} rung {rung}: {len(rung_results)} trials on {rows} rows, "
+                        f"best val RMSE {rung_results[0]['val_rmse']:.4f}, {n_keep} promoted.")
+            survivors = [t for t in survivors if t['trial_id'] in kept]
+    return results
+
+def hyperband_brackets(n_fractions, eta=3):
+    """
+    (number of candidates, first rung) per Hyperband bracket, from the most
+    exploratory bracket (many candidates, smallest budget) to plain full-budget search.
+    """
+    max_rung = n_fractions - 1
+    return [(int(math.ceil((max_rung + 1) / (s + 1) * eta ** s)), max_rung - s) for s in range(max_rung, -1, -1)]
+
+def run_search(X_train, y_train, X_val, y_val, config, output_dir, max_workers=None):
+    """
+    Runs the `tuning:` config section: successive halving (or Hyperband, which runs
+    several halving brackets with different trade-offs) over the model spaces.
+    Features are dumped once to output_dir/features.joblib and shared by all trial
+    processes. Writes leaderboard.csv (one row per trial and rung) and best_config.yaml
+    (a `models:` section with the best full-budget trial). Returns the leaderboard.
+    """
+    tuning_config = config['tuning']
+    eta = tuning_config.get('eta', 3)
+    fractions = rung_fractions(tuning_config.get('min_fraction', 1 / 9), eta)
+    method = tuning_config.get('method', 'successive_halving')
+    max_workers = max_workers or tuning_config.get('max_workers')
+    rng = np.random.default_rng(config.get('random_seed'))
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Fixed row order: the row subsample of every rung is a prefix of the next one's
+    order = rng.permutation(len(X_train))
+    data_path = os.path.join(output_dir, "features.joblib")
+    joblib.dump((np.asarray(X_train, dtype=np.float64)[order], np.asarray(y_train, dtype=np.float64)[order],
+                 np.asarray(X_val, dtype=np.float64), np.asarray(y_val, dtype=np.float64)), data_path)
+
+    spaces = tuning_config['spaces']
+    if method == 'successive_halving':
+        plan = [(tuning_config.get('n_candidates', 27), 0)]
+    elif method == 'hyperband':
+        plan = hyperband_brackets(len(fractions), eta)
+    else:
+        raise ValueError(f"Unknown tuning method: {method}")
+
+    results = []
+    for bracket, (n_candidates, first_rung) in enumerate(plan):
+        candidates = sample_candidates(spaces, n_candidates, rng, first_id=len({r['trial_id'] for r in results}))
+        results += successive_halving(candidates, fractions[first_rung:], data_path, len(order), config,
+                                      eta, max_workers, bracket)
+
+    leaderboard = pd.DataFrame(results).sort_values(['fraction', 'val_rmse'], ascending=[False, True],
+                                                    ignore_index=True)
+    leaderboard.to_csv(os.path.join(output_dir, "leaderboard.csv"), index=False)
+
+    best = leaderboard.iloc[0]
+    best_config = {'models': {best['model_type']: json.loads(best['params'])},
+                   'tuning_result': {'trial_id': int(best['trial_id']), 'val_rmse': float(best['val_rmse'])}}
+    with open(os.path.join(output_dir, "best_config.yaml"), 'w') as f:
+        yaml.safe_dump(best_config, f, sort_keys=False)
+    logger.info(f"Best trial {best['trial_id']} ({best['model_type']}): val RMSE {best['val_rmse']:.4f}. "
+                f"Leaderboard saved to {output_dir}")
+    return leaderboard
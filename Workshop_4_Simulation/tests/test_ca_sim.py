@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+from src.ca_sim import CellularAutomata, CellularAutomataEnsemble, decode_grid, encode_grid
+from src.history import MemmapHistory, ReductionHistory, TeeHistory
+
+def make_config(seed=7):
+    return {
+        'random_seed': seed,
+        'simulation': {'perturbation_sigma': 0.05, 'decay_probability': 0.02}
+    }
+
+def test_ensemble_summary_shape_and_bounds():
+    data = pd.DataFrame(np.linspace(0, 1, 100), columns=['val'])
+    ensemble = CellularAutomataEnsemble(8, (10, 10), make_config())
+    ensemble.initialize_from_data(data)
+    summary = ensemble.run(5, quantiles=(0.1, 0.9))
+
+    assert list(summary.columns) == ['step', 'mean', 'std', 'q0.1', 'q0.9']
+    assert len(summary) == 6
+    assert ensemble.activity.shape == (6, 8)
+    assert (ensemble.grids >= 0).all() and (ensemble.grids <= 1).all()
+    # All replicates share the initial state
+    assert summary.loc[0, 'std'] == 0
+
+def test_ensemble_is_reproducible():
+    data = pd.DataFrame(np.random.rand(100, 1), columns=['val'])
+    runs = []
+    for _ in range(2):
+        ensemble = CellularAutomataEnsemble(4, (10, 10), make_config(seed=3))
+        ensemble.initialize_from_data(data)
+        ensemble.run(3)
+        runs.append(ensemble.activity)
+    np.testing.assert_array_equal(runs[0], runs[1])
+
+def test_single_run_history_matches_steps():
+    data = pd.DataFrame(np.random.rand(100, 1), columns=['val'])
+    ca = CellularAutomata((10, 10), make_config())
+    ca.initialize_from_data(data)
+    history = ca.run(4)
+    assert history.shape == (5, 10, 10)
+
+def test_compact_dtypes_preallocate_history():
+    data = pd.DataFrame(np.random.rand(100, 1), columns=['val'])
+    for dtype in ['float32', 'uint16']:
+        config = make_config()
+        config['grid'] = {'dtype': dtype}
+        ca = CellularAutomata((10, 10), config)
+        ca.initialize_from_data(data)
+        history = ca.run(3)
+
+        assert history.dtype == np.dtype(dtype)
+        assert history.shape == (4, 10, 10)
+        values = decode_grid(history)
+        assert values.min() >= 0 and values.max() <= 1
+
+def test_uint16_roundtrip_precision():
+    values = np.random.rand(20, 20)
+    restored = decode_grid(encode_grid(values, np.uint16))
+    assert np.abs(restored - values).max() <= 0.5 / 65535 + 1e-7
+
+def test_memmap_and_reduction_sinks(tmp_path):
+    data = pd.DataFrame(np.random.rand(100, 1), columns=['val'])
+    ca = CellularAutomata((10, 10), make_config())
+    ca.initialize_from_data(data)
+    frames_path = tmp_path / "history.npy"
+    reductions = ReductionHistory()
+    frames, activity = ca.run(10, sink=TeeHistory(MemmapHistory(str(frames_path), every=5), reductions))
+
+    assert isinstance(frames, np.memmap)
+    assert frames.shape == (3, 10, 10)  # steps 0, 5, 10
+    np.testing.assert_array_equal(frames[-1], ca.grid)
+    assert len(activity) == 11
+    assert activity['total_activity'].iloc[-1] == np.sum(ca.grid)
+    assert len(ca.history) == 1
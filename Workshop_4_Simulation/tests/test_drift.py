@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import ks_2samp, wasserstein_distance
+from src.drift import ADWIN, CUSUM, DriftMonitor, PageHinkley, benjamini_hochberg, make_detectors
+
+def make_frames(shift=0.0, n_ref=20000, n_new=5000):
+    rng = np.random.default_rng(0)
+    reference = pd.DataFrame({'a': rng.normal(size=n_ref), 'b': rng.exponential(size=n_ref)})
+    new = pd.DataFrame({'a': rng.normal(shift, 1, n_new), 'b': rng.exponential(size=n_new)})
+    return reference, new
+
+def test_sketch_statistics_match_exact_two_sample_values():
+    reference, new = make_frames(shift=0.1)
+    report = DriftMonitor(n_bins=100).fit(reference).check(new).set_index('feature')
+    for column in reference:
+        assert report.loc[column, 'ks_statistic'] == pytest.approx(ks_2samp(reference[column], new[column]).statistic, abs=0.01)
+        assert report.loc[column, 'wasserstein'] == pytest.approx(wasserstein_distance(reference[column], new[column]), abs=0.01)
+    assert report['drift_detected'].tolist() == [True, False]
+
+def test_incremental_updates_equal_one_batch():
+    reference, new = make_frames(shift=0.2)
+    monitor = DriftMonitor().fit(reference)
+    whole = monitor.check(new)
+    monitor.reset()
+    for batch in np.array_split(new, 5):
+        monitor.update(batch)
+    pd.testing.assert_frame_equal(monitor.compare(), whole)
+
+def test_saved_monitor_reproduces_checks(tmp_path):
+    reference, new = make_frames(shift=0.2)
+    monitor = DriftMonitor().fit(reference)
+    monitor.save(tmp_path / 'monitor.npz')
+    loaded = DriftMonitor.load(tmp_path / 'monitor.npz')
+    pd.testing.assert_frame_equal(loaded.check(new), monitor.check(new))
+
+def test_benjamini_hochberg():
+    np.testing.assert_allclose(benjamini_hochberg([0.01, 0.04, 0.03, 0.5]), [0.04, 0.04 * 4 / 3, 0.04 * 4 / 3, 0.5])
+    with pytest.raises(ValueError):
+        DriftMonitor().update(np.zeros((3, 2)))
+
+def _alarms(detector, stream):
+    return [i for i, x in enumerate(stream) if detector.update(x)]
+
+@pytest.mark.parametrize('detector', [ADWIN(), PageHinkley(threshold=5.0), CUSUM(k=1.0, h=8.0)])
+def test_detectors_flag_a_mean_shift_soon_after_it_happens(detector):
+    rng = np.random.default_rng(1)
+    stream = np.r_[rng.normal(0, 0.1, 1000), rng.normal(0.3, 0.1, 500)]
+    alarms = _alarms(detector, stream)
+    assert alarms and 1000 <= alarms[0] < 1100
+
+@pytest.mark.parametrize('detector', [ADWIN(), PageHinkley(threshold=5.0)])
+def test_detectors_stay_quiet_on_a_stationary_stream(detector):
+    assert _alarms(detector, np.random.default_rng(2).normal(0, 0.1, 3000)) == []
+
+def test_adwin_window_is_logarithmic_and_shrinks_after_change():
+    detector = ADWIN(max_buckets=5)
+    _alarms(detector, np.random.default_rng(3).normal(0, 1, 4000))
+    assert detector.n == 4000
+    assert sum(len(level) for level in detector.levels) <= 5 * 12
+    _alarms(detector, np.random.default_rng(4).normal(3, 1, 300))
+    assert detector.n < 1000 and detector.mean > 2
+
+def test_make_detectors_rejects_unknown_names():
+    assert set(make_detectors({'adwin': {'delta': 0.01}, 'cusum': None})) == {'adwin', 'cusum'}
+    with pytest.raises(ValueError):
+        make_detectors({'ddm': {}})
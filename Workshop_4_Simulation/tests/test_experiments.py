@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+from src.experiments import simulate_drift_and_retrain
+from src.models import train_model
+
+class MetricRecorder:
+    def __init__(self):
+        self.metrics = []
+
+    def log_metric(self, name, value, notes=""):
+        self.metrics.append((name, value, notes))
+
+def test_monthly_stream_refits_after_the_drift():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(1200, 3)), columns=['a', 'b', 'c'])
+    y = X['a'] + rng.normal(0, 0.05, 1200)
+    config = {'random_seed': 0,
+              'models': {'random_forest': {'n_estimators': 10, 'random_state': 0}},
+              'drift_simulation': {'months': 12, 'drift_start': 6, 'noise_level': 0.1, 'shift': 2.0,
+                                   'detectors': {'page_hinkley': {'threshold': 5.0}}},
+              'retraining': {'extra_trees': 5}}
+    model = train_model(X[:600], y[:600], config)
+    recorder = MetricRecorder()
+
+    model, metrics = simulate_drift_and_retrain(model, X[:600], X[600:], y[600:], config, recorder)
+    alarm_months = [int(notes.split()[1].rstrip(':')) for name, _, notes in recorder.metrics if name == 'drift_alarm']
+    assert alarm_months and alarm_months[0] == 6
+    assert len(model.estimators_) == 10 + 5 * len(alarm_months)
+    assert metrics is not None
+    # Each refit is scored on the month after it, never on the rows it was refit on
+    retrained = [notes for name, _, notes in recorder.metrics if name == 'retrained_rmse']
+    assert retrained and retrained[0].startswith(f"month {alarm_months[0] + 1} ")
+    # Pre-drift months match the training reference
+    drifted = [value for name, value, _ in recorder.metrics if name == 'drifted_features']
+    assert drifted[:6] == [0] * 6 and all(value == 3 for value in drifted[6:])
+    assert sum(name == 'month_rmse' for name, _, _ in recorder.metrics) == 12
@@ -0,0 +1,46 @@
+import json
+import pandas as pd
+import numpy as np
+import os
+from src.ingestion import load_data
+
+def test_load_data_caches_with_schema(tmp_path):
+    csv_path = tmp_path / "census.csv"
+    pd.DataFrame({
+        'cfips': [1001, 1003],
+        'pct_bb_2021': [85.5, 87.9],
+        'median_hh_inc_2021': [62660.0, 64346],
+    }).to_csv(csv_path, index=False)
+    cache_dir = tmp_path / "cache"
+
+    first = load_data(str(csv_path), cache_dir=str(cache_dir))
+    assert first['cfips'].dtype == np.int32
+    assert first['pct_bb_2021'].dtype == np.float32
+    cached = [f for f in os.listdir(cache_dir) if f.startswith("census-")]
+    assert len(cached) == 1
+
+    # Second load comes from the cache and honours column projection
+    second = load_data(str(csv_path), columns=['cfips'], cache_dir=str(cache_dir))
+    assert list(second.columns) == ['cfips']
+    assert second['cfips'].tolist() == [1001, 1003]
+
+    # Changing the CSV invalidates the cache entry
+    pd.DataFrame({'cfips': [1005], 'pct_bb_2021': [70.0], 'median_hh_inc_2021': [50000]}).to_csv(csv_path, index=False)
+    third = load_data(str(csv_path), cache_dir=str(cache_dir))
+    assert third['cfips'].tolist() == [1005]
+    assert len([f for f in os.listdir(cache_dir) if f.startswith("census-")]) == 1
+
+def test_concurrent_loads_share_one_cache_file(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+    csv_path = tmp_path / "train.csv"
+    pd.DataFrame({'cfips': np.arange(1000), 'microbusiness_density': np.linspace(0, 1, 1000)}).to_csv(csv_path, index=False)
+    cache_dir = tmp_path / "cache"
+
+    with ThreadPoolExecutor(8) as pool:
+        frames = list(pool.map(lambda _: load_data(str(csv_path), cache_dir=str(cache_dir)), range(16)))
+
+    assert all(len(df) == 1000 for df in frames)
+    files = sorted(os.listdir(cache_dir))
+    assert len([f for f in files if f.startswith("train-")]) == 1
+    assert not [f for f in files if f.endswith(".tmp")]
+    assert json.load(open(cache_dir / "digests.json"))
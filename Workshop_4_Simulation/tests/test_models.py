@@ -0,0 +1,49 @@
+import pytest
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression
+from src.models import train_model, refit_model, save_model, load_model, load_model_manifest
+
+def _fitted_model():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.random((50, 3)), columns=['a', 'b', 'c'])
+    y = X['a'] * 2 + rng.normal(0, 0.01, 50)
+    config = {'models': {'random_forest': {'n_estimators': 5, 'random_state': 0}}}
+    return train_model(X, y, config), X
+
+def test_save_load_roundtrip_with_manifest(tmp_path):
+    model, X = _fitted_model()
+    path = str(tmp_path / "model.joblib")
+    save_model(model, path, metadata={'run': 'test'})
+
+    manifest = load_model_manifest(path)
+    assert manifest['feature_names'] == ['a', 'b', 'c']
+    assert manifest['metadata'] == {'run': 'test'}
+
+    loaded = load_model(path, mmap_mode='r')
+    np.testing.assert_allclose(loaded.predict(X), model.predict(X))
+
+def test_compressed_model_loads_without_mmap(tmp_path):
+    model, X = _fitted_model()
+    plain, packed = str(tmp_path / "plain.joblib"), str(tmp_path / "packed.joblib")
+    save_model(model, plain)
+    save_model(model, packed, compress=3)
+
+    assert load_model_manifest(packed)['compress'] == 3
+    loaded = load_model(packed, mmap_mode='r')
+    np.testing.assert_allclose(loaded.predict(X), model.predict(X))
+
+def test_refit_model_warm_starts_instead_of_retraining():
+    model, X = _fitted_model()
+    first_trees = list(model.estimators_)
+    refit = refit_model(model, X + 0.5, X['a'] * 2, {'retraining': {'extra_trees': 3}})
+    assert len(refit.estimators_) == 8
+    assert refit.estimators_[:5] == first_trees
+
+    mlp = train_model(X, X['a'], {'models': {'mlp': {'hidden_layer_sizes': [4], 'max_iter': 5, 'random_state': 0}}}, 'mlp')
+    samples_seen = mlp.t_
+    refit_model(mlp, X, X['a'], {'retraining': {'partial_fit_epochs': 2}})
+    assert mlp.t_ == samples_seen + 2 * len(X)
+
+    with pytest.raises(ValueError):
+        refit_model(LinearRegression().fit(X, X['a']), X, X['a'], {})
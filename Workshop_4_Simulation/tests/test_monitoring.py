@@ -0,0 +1,125 @@
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import pytest
+import numpy as np
+from src.ca_sim import CellularAutomata
+from src.monitoring import MetricsWriter, Profiler, QueueLogger, SimulationLogger, activated
+
+def _log_from_worker(queue, worker):
+    with QueueLogger(queue, flush_every=4) as metrics:
+        for i in range(10):
+            metrics.log_metric("value", worker * 100 + i, f"worker {worker}, step {i}")
+            metrics.observe("seconds", 0.5)
+        metrics.increment("tasks")
+    return worker
+
+def test_buffered_csv_quotes_notes_and_flushes_by_size(tmp_path):
+    sim_logger = SimulationLogger(str(tmp_path), flush_every=3, flush_interval=3600)
+    sim_logger.log_metric("a", 1.0, "note, with comma")
+    sim_logger.log_metric("b", 2.0, 'quoted "text"\nand a newline')
+    assert len(pd.read_csv(sim_logger.log_file)) == 0
+
+    sim_logger.log_metric("c", 3.0)
+    written = pd.read_csv(sim_logger.log_file, keep_default_na=False)
+    assert written['metric_name'].tolist() == ['a', 'b', 'c']
+    assert written['notes'].tolist() == ["note, with comma", 'quoted "text"\nand a newline', ""]
+
+    sim_logger.log_metric("d", 4.0)
+    sim_logger.close()
+    assert len(pd.read_csv(sim_logger.log_file)) == 4
+
+@pytest.mark.parametrize('backend, reader', [('jsonl', lambda p: pd.read_json(p, lines=True)),
+                                             ('parquet', pd.read_parquet)])
+def test_columnar_backends(tmp_path, backend, reader):
+    with SimulationLogger(str(tmp_path), backend=backend, flush_every=2) as sim_logger:
+        for i in range(5):
+            sim_logger.log_metric("rmse", i / 10, f"run {i}")
+    written = reader(sim_logger.log_file)
+    assert written['value'].tolist() == pytest.approx([0.0, 0.1, 0.2, 0.3, 0.4])
+    assert written['notes'].iloc[-1] == "run 4"
+
+@pytest.mark.parametrize('backend, reader', [('csv', pd.read_csv),
+                                             ('jsonl', lambda p: pd.read_json(p, lines=True)),
+                                             ('parquet', pd.read_parquet)])
+def test_reopened_logger_appends(tmp_path, backend, reader):
+    for run in range(2):
+        with SimulationLogger(str(tmp_path), backend=backend) as sim_logger:
+            sim_logger.log_metric("rmse", run, f"run {run}")
+    assert reader(sim_logger.log_file)['value'].tolist() == [0, 1]
+
+def test_parquet_batches_are_readable_before_close(tmp_path):
+    sim_logger = SimulationLogger(str(tmp_path), backend='parquet', flush_every=2, flush_interval=None)
+    other = SimulationLogger(str(tmp_path), backend='parquet', flush_every=1, flush_interval=None)
+    for i in range(4):
+        sim_logger.log_metric("rmse", i)
+    other.log_metric("other", 9)
+    # Nothing is closed: every flushed batch is already a part file of the dataset
+    assert sorted(pd.read_parquet(sim_logger.log_file)['value']) == [0, 1, 2, 3, 9]
+    sim_logger.close()
+    other.close()
+
+def test_idle_logger_flushes_on_interval(tmp_path):
+    with SimulationLogger(str(tmp_path), flush_interval=0.05) as sim_logger:
+        sim_logger.log_metric("a", 1.0)
+        time.sleep(0.1)  # log_metric above was not due, so only the timer can write it
+        deadline = time.monotonic() + 5
+        while len(pd.read_csv(sim_logger.log_file)) == 0 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert pd.read_csv(sim_logger.log_file)['metric_name'].tolist() == ['a']
+
+def test_counters_and_histograms_summary(tmp_path):
+    with SimulationLogger(str(tmp_path)) as sim_logger:
+        sim_logger.increment("runs")
+        sim_logger.increment("runs", 2)
+        sim_logger.observe("latency", [0.5, 2.0, 20.0], edges=[1.0, 10.0])
+    summary = json.loads((tmp_path / "simulation_metrics_summary.json").read_text())
+    assert summary['counters'] == {'runs': 3}
+    assert summary['histograms']['latency']['bucket_counts'] == [1, 1, 1]
+    assert summary['histograms']['latency']['max'] == 20.0
+    with pytest.raises(ValueError):
+        SimulationLogger(str(tmp_path), backend='xml')
+
+def test_metrics_writer_collects_from_worker_processes(tmp_path):
+    with MetricsWriter(str(tmp_path), name="workers") as writer:
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            list(executor.map(_log_from_worker, [writer.queue] * 3, range(3)))
+    written = pd.read_csv(tmp_path / "workers.csv")
+    assert sorted(written['value']) == sorted(w * 100 + i for w in range(3) for i in range(10))
+    summary = json.loads((tmp_path / "workers_summary.json").read_text())
+    assert summary['counters'] == {'tasks': 3}
+    assert summary['histograms']['seconds']['count'] == 30
+
+def test_profiler_times_stages_and_ca_steps(tmp_path):
+    config = {'random_seed': 0, 'simulation': {'perturbation_sigma': 0.05, 'growth_threshold': 0.6,
+                                               'decay_probability': 0.02}}
+    ca = CellularAutomata((10, 10), config)
+    ca.initialize_from_data(pd.DataFrame(np.random.rand(10, 1), columns=['val']))
+    profiler = Profiler(trace_memory=True, mode='cprofile', stages=['ca_run'], output_dir=tmp_path / "profiles")
+    with activated(profiler):
+        with profiler.stage('ca_run'):
+            ca.run(5)
+    ca.run(5)  # no active profiler: not recorded
+
+    profiler.save(tmp_path / "run_report.json")
+    report = json.loads((tmp_path / "run_report.json").read_text())
+    stages = {row['stage']: row for row in report['stages']}
+    assert stages['ca_step']['calls'] == 5
+    assert stages['ca_run']['wall_seconds'] >= stages['ca_step']['wall_seconds']
+    assert 'peak_traced_mb' in stages['ca_run']
+    assert (tmp_path / "profiles").is_dir() and len(list((tmp_path / "profiles").iterdir())) == 1
+
+def test_sample_mode_writes_one_folded_file_per_stage(tmp_path):
+    config = {'random_seed': 0, 'simulation': {'perturbation_sigma': 0.05, 'growth_threshold': 0.6,
+                                               'decay_probability': 0.02}}
+    ca = CellularAutomata((200, 200), config)
+    ca.initialize_from_data(pd.DataFrame(np.random.rand(10, 1), columns=['val']))
+    profiler = Profiler(mode='sample', sample_interval=0.001, output_dir=tmp_path / "profiles")
+    with activated(profiler):
+        ca.run(30)
+    profiler.save(tmp_path / "run_report.json")
+    assert [p.name for p in (tmp_path / "profiles").iterdir()] == ["ca_step.folded"]
+    lines = (tmp_path / "profiles" / "ca_step.folded").read_text().splitlines()
+    assert sum(int(line.rsplit(' ', 1)[1]) for line in lines) == sum(profiler.samples['ca_step'].values())
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.sweep import build_tasks, latin_hypercube, run_sweep
+
+def make_config(method='grid'):
+    return {
+        'random_seed': 11,
+        'grid': {'width': 8, 'height': 8},
+        'simulation': {'steps': 5, 'perturbation_sigma': 0.05, 'decay_probability': 0.02},
+        'sweep': {
+            'method': method,
+            'levels': 2,
+            'samples': 3,
+            'replicates': 2,
+            'parameters': {'perturbation_sigma': [0.01, 0.1], 'decay_probability': [0.0, 0.05]},
+        },
+    }
+
+def test_latin_hypercube_uses_every_stratum_once():
+    points = pd.DataFrame(latin_hypercube({'a': [0.0, 1.0]}, 10, seed=0))
+    strata = np.floor(points['a'] * 10).astype(int)
+    assert sorted(strata) == list(range(10))
+
+def test_build_tasks_expands_points_and_replicates():
+    assert len(build_tasks(make_config('grid'))) == 2 * 2 * 2
+    assert len(build_tasks(make_config('lhs'))) == 3 * 2
+
+def test_sweep_resumes_from_checkpoints(tmp_path):
+    config = make_config()
+    first = run_sweep(config, str(tmp_path), max_workers=2)
+    assert len(first) == 8 * 6  # tasks x (steps + 1)
+    assert len(pd.read_csv(tmp_path / "sweep_metrics.csv")) == 8
+
+    (tmp_path / "runs" / "task_00003.csv").unlink()
+    resumed = run_sweep(config, str(tmp_path), max_workers=2)
+    pd.testing.assert_frame_equal(first, resumed)
+
+    config['sweep']['levels'] = 3
+    with pytest.raises(ValueError):
+        run_sweep(config, str(tmp_path))
+
+@pytest.mark.parametrize('section, key, value', [('sweep', 'steps', 7), ('grid', 'width', 9),
+                                                 (None, 'random_seed', 12),
+                                                 ('simulation', 'growth_threshold', 0.5)])
+def test_resume_refuses_changed_settings(tmp_path, section, key, value):
+    config = make_config()
+    config['sweep']['replicates'] = 1
+    run_sweep(config, str(tmp_path), max_workers=1)
+    (config[section] if section else config)[key] = value
+    with pytest.raises(ValueError, match=key if section is None else section):
+        run_sweep(config, str(tmp_path), max_workers=1)
+
+    config = make_config()
+    config['sweep']['replicates'] = 1
+    config['sweep']['max_workers'] = 3  # pool size does not change results
+    assert len(run_sweep(config, str(tmp_path), max_workers=1)) == 4 * 6
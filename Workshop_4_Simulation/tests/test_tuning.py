@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+from src.tuning import hyperband_brackets, rung_fractions, run_search, sample_params
+
+def make_config(method='successive_halving'):
+    return {
+        'random_seed': 3,
+        'tuning': {
+            'method': method,
+            'n_candidates': 9,
+            'eta': 3,
+            'min_fraction': 1 / 9,
+            'max_workers': 2,
+            'spaces': {
+                'random_forest': {'n_estimators': 18, 'max_depth': [2, 4, None]},
+                'mlp': {'max_iter': 30, 'hidden_layer_sizes': [[8], [8, 4]],
+                        'learning_rate_init': {'low': 0.001, 'high': 0.01, 'log': True}},
+            },
+        },
+    }
+
+def make_data(n=270):
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.random((n, 3)), columns=['a', 'b', 'c'])
+    y = X['a'] * 2 + rng.normal(0, 0.05, n)
+    return X[:200], y[:200], X[200:], y[200:]
+
+def test_sample_params_respects_spec_types():
+    params = sample_params({'fixed': 5, 'choice': ['x', 'y'], 'depth': {'low': 1, 'high': 4, 'type': 'int'},
+                            'lr': {'low': 1e-4, 'high': 1e-2, 'log': True}}, np.random.default_rng(0))
+    assert params['fixed'] == 5 and params['choice'] in ('x', 'y')
+    assert isinstance(params['depth'], int) and 1 <= params['depth'] <= 4
+    assert 1e-4 <= params['lr'] <= 1e-2
+
+def test_rungs_and_brackets():
+    assert rung_fractions(1 / 9, 3) == pytest.approx([1 / 9, 1 / 3, 1.0])
+    assert hyperband_brackets(3, 3) == [(9, 0), (5, 1), (3, 2)]
+    with pytest.raises(ValueError):
+        rung_fractions(0)
+
+def test_successive_halving_promotes_survivors(tmp_path):
+    leaderboard = run_search(*make_data(), make_config(), str(tmp_path))
+    assert leaderboard.groupby('rung').size().tolist() == [9, 3, 1]
+    assert leaderboard.groupby('rung')['rows'].first().tolist() == [22, 66, 200]
+    # Every trial on a later rung was promoted from the previous one
+    for rung in (1, 2):
+        previous = leaderboard[(leaderboard['rung'] == rung - 1) & leaderboard['promoted']]
+        assert set(leaderboard.loc[leaderboard['rung'] == rung, 'trial_id']) == set(previous['trial_id'])
+
+    best = yaml.safe_load((tmp_path / "best_config.yaml").read_text())
+    assert best['tuning_result']['trial_id'] == leaderboard.iloc[0]['trial_id']
+    assert (tmp_path / "leaderboard.csv").exists()
+
+def test_hyperband_runs_every_bracket(tmp_path):
+    leaderboard = run_search(*make_data(), make_config('hyperband'), str(tmp_path))
+    assert sorted(leaderboard['bracket'].unique()) == [0, 1, 2]
+    assert leaderboard['trial_id'].nunique() == 9 + 5 + 3